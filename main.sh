@@ -1,10 +1,12 @@
 #!/bin/bash
 
-# Generate the site
+# Generate the site, then keep rebuilding affected pages as sources change
 echo "Generating static site..."
-python3 src/main.py
+python3 src/main.py --watch &
+WATCH_PID=$!
+trap 'kill $WATCH_PID 2>/dev/null' EXIT
 
 # Start a simple web server
 echo "Starting web server at http://localhost:8888"
 echo "Press Ctrl+C to stop the server"
-cd public && python3 -m http.server 8888
\ No newline at end of file
+cd docs && python3 -m http.server 8888
@@ -0,0 +1,79 @@
+import json
+import os
+
+from changes import write_if_changed
+from manifest import hash_bytes, hash_file
+
+# Hex digits of the content hash put into fingerprinted file names
+FINGERPRINT_LENGTH = 10
+
+ASSET_MANIFEST_NAME = "asset-manifest.json"
+HEADERS_NAME = "_headers"
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+def fingerprinted_name(rel_path: str, digest: str) -> str:
+    """Insert a content hash before the extension: images/a.png -> images/a.0123456789.png"""
+    root, ext = os.path.splitext(rel_path)
+    return f"{root}.{digest[:FINGERPRINT_LENGTH]}{ext}"
+
+def build_asset_map(static_dir: str) -> dict[str, str]:
+    """
+    Map every file below static_dir to its fingerprinted name.
+
+    Keys and values are "/"-separated paths relative to static_dir, as they
+    appear in root-relative URLs without the leading slash.
+    """
+    asset_map = {}
+    if not os.path.exists(static_dir):
+        return asset_map
+    for dirpath, _, filenames in os.walk(static_dir):
+        for name in filenames:
+            path = os.path.join(dirpath, name)
+            rel_path = os.path.relpath(path, static_dir).replace(os.sep, "/")
+            asset_map[rel_path] = fingerprinted_name(rel_path, hash_file(path))
+    return asset_map
+
+def asset_map_digest(asset_map: dict) -> str:
+    """One digest for the whole map, for the build fingerprint"""
+    return hash_bytes(json.dumps(asset_map, sort_keys=True).encode('utf-8'))
+
+def asset_renamer(asset_map: dict):
+    """Return a function mapping a static file's relative OS path to its fingerprinted one"""
+    def rename(rel_path: str) -> str:
+        return asset_map[rel_path.replace(os.sep, "/")].replace("/", os.sep)
+    return rename
+
+def write_asset_manifest(dest_dir: str, asset_map: dict, changes=None) -> str:
+    """Write the original-to-fingerprinted name map as JSON into dest_dir"""
+    path = os.path.join(dest_dir, ASSET_MANIFEST_NAME)
+    data = json.dumps(asset_map, indent=2, sort_keys=True) + "\n"
+    status = write_if_changed(path, data.encode('utf-8'))
+    if changes is not None:
+        changes.record(path, status)
+    return path
+
+def write_headers(dest_dir: str, asset_map: dict, basepath: str, changes=None) -> str:
+    """
+    Write a _headers file (the format read by Netlify and Cloudflare Pages)
+    marking every fingerprinted asset as immutable.
+    """
+    path = os.path.join(dest_dir, HEADERS_NAME)
+    lines = []
+    for hashed in sorted(asset_map.values()):
+        lines.append(f"{basepath}{hashed}")
+        lines.append(f"  Cache-Control: {IMMUTABLE_CACHE_CONTROL}")
+    status = write_if_changed(path, ("\n".join(lines) + "\n").encode('utf-8'))
+    if changes is not None:
+        changes.record(path, status)
+    return path
+
+def remove_asset_metadata(dest_dir: str, synced: dict, changes=None):
+    """Delete the asset manifest and headers file of an earlier fingerprinted build, unless they are synced static files"""
+    for name in (ASSET_MANIFEST_NAME, HEADERS_NAME):
+        path = os.path.join(dest_dir, name)
+        if path in synced or not os.path.exists(path):
+            continue
+        if changes is not None:
+            changes.remove(path)
+        else:
+            os.remove(path)
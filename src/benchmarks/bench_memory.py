@@ -0,0 +1,133 @@
+"""
+Peak memory used while parsing a large page into a node tree.
+
+Usage: python3 src/benchmarks/bench_memory.py [--paragraphs N]
+
+The "dict nodes" line is the baseline from before the node classes got
+__slots__: the same parse through TextNodes, into nodes that keep their
+attributes in a per-instance dict and give every leaf its own children list.
+"""
+import argparse
+import contextlib
+import os
+import sys
+import time
+import tracemalloc
+
+# Add the src directory to the path so we can import our modules
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import inline_parser
+import main as main_module
+import markdown_html
+import split_nodes
+from markdown_html import markdown_to_html_node
+
+PARAGRAPH = (
+    "In the vast and **intricate** weave of _the legendarium_, amidst heroes of renown, "
+    "there exists a `curious` anomaly: [Tom Bombadil](/blog/tom). He is **merry** and _bright_, "
+    "with ![a jacket](/images/tom.png) of blue and boots of **yellow**."
+)
+
+def build_page(paragraphs: int) -> str:
+    """A page mixing headings, paragraphs, lists and quotes"""
+    blocks = ["# Memory benchmark"]
+    for i in range(paragraphs):
+        blocks.append(PARAGRAPH)
+        if i % 5 == 0:
+            blocks.append(f"## Section {i}")
+            blocks.append("- item with **bold**\n- item with _italic_\n- item with `code`")
+            blocks.append("> a quote with a [link](/x)\n> over two lines")
+    return "\n\n".join(blocks)
+
+class DictTextNode:
+    """TextNode without __slots__"""
+    def __init__(self, text: str, text_type, url: str = None, children: list = None):
+        self.text = text
+        self.type = text_type
+        self.url = url
+        self.children = children
+
+class DictLeafNode:
+    """LeafNode without __slots__ and with a fresh empty children list"""
+    def __init__(self, tag: str, value: str, props: dict = None):
+        self.tag = tag
+        self.value = value
+        self.children = []
+        self.props = props
+
+class DictParentNode:
+    """ParentNode without __slots__"""
+    def __init__(self, tag: str, children: list, props: dict = None):
+        self.tag = tag
+        self.value = None
+        self.children = children
+        self.props = props
+
+@contextlib.contextmanager
+def dict_nodes():
+    """Build node trees from the dict-backed classes above while active"""
+    replacements = {
+        inline_parser: {"TextNode": DictTextNode, "LeafNode": DictLeafNode, "ParentNode": DictParentNode},
+        split_nodes: {"TextNode": DictTextNode},
+        markdown_html: {"LeafNode": DictLeafNode, "ParentNode": DictParentNode},
+        main_module: {"LeafNode": DictLeafNode, "ParentNode": DictParentNode},
+    }
+    saved = {module: {name: getattr(module, name) for name in names} for module, names in replacements.items()}
+    try:
+        for module, names in replacements.items():
+            for name, value in names.items():
+                setattr(module, name, value)
+        yield
+    finally:
+        for module, names in saved.items():
+            for name, value in names.items():
+                setattr(module, name, value)
+
+def count_nodes(node) -> int:
+    stack, count = [node], 0
+    while stack:
+        current = stack.pop()
+        count += 1
+        if current.children:
+            stack.extend(current.children)
+    return count
+
+def measure(markdown: str, use_text_nodes: bool) -> dict:
+    """Peak traced allocation while the page's node tree is alive"""
+    previous = getattr(markdown_html, "USE_TEXT_NODES", True)
+    markdown_html.USE_TEXT_NODES = use_text_nodes
+    try:
+        tracemalloc.start()
+        started = time.perf_counter()
+        root = markdown_to_html_node(markdown)
+        elapsed = time.perf_counter() - started
+        current, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+    finally:
+        markdown_html.USE_TEXT_NODES = previous
+    nodes = count_nodes(root)
+    return {
+        "nodes": nodes,
+        "retained_bytes": current,
+        "peak_bytes": peak,
+        "bytes_per_node": round(current / nodes, 1),
+        "seconds": round(elapsed, 4),
+    }
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--paragraphs", type=int, default=2000)
+    args = parser.parse_args(argv)
+
+    markdown = build_page(args.paragraphs)
+    print(f"page: {len(markdown)} characters")
+    with dict_nodes():
+        result = measure(markdown, True)
+    print(f"{'dict nodes':>13}: " + ", ".join(f"{key}={value}" for key, value in result.items()))
+    for label, use_text_nodes in (("via TextNode", True), ("direct", False)):
+        result = measure(markdown, use_text_nodes)
+        print(f"{label:>13}: " + ", ".join(f"{key}={value}" for key, value in result.items()))
+
+if __name__ == "__main__":
+    main()
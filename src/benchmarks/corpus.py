@@ -0,0 +1,170 @@
+"""
+Deterministic synthetic site generator for benchmarks.
+
+Usage: python3 src/benchmarks/corpus.py OUTPUT_DIR [--pages N] [--depth D] ...
+"""
+import argparse
+import os
+import random
+
+WORDS = (
+    "the ring of power was forged in the fires of mount doom by sauron and "
+    "carried by frodo through the dead marshes while gandalf fought the balrog "
+    "in moria and aragorn rode to minas tirith with legolas and gimli at his side"
+).split()
+
+DEFAULT_MIX = {
+    "paragraph": 6,
+    "heading": 2,
+    "unordered_list": 1,
+    "ordered_list": 1,
+    "quote": 1,
+    "code": 1,
+}
+
+TEMPLATE = """<!DOCTYPE html>
+<html>
+  <head>
+    <meta charset="utf-8" />
+    <title>{{ Title }}</title>
+    <link href="/index.css" rel="stylesheet" />
+  </head>
+
+  <body>
+    <article>{{ Content }}</article>
+  </body>
+</html>
+"""
+
+class CorpusOptions:
+    """
+    Knobs for the generated corpus.
+
+    Args:
+        pages: Number of markdown pages
+        depth: Maximum directory nesting below content/
+        blocks_per_page: Number of blocks in each page
+        block_mix: Relative weights of block types (see DEFAULT_MIX)
+        inline_density: Probability that a word carries inline markup
+        code_lines: Number of lines in each code block
+        seed: Random seed; the same options always produce the same corpus
+    """
+    def __init__(self, pages: int = 100, depth: int = 3, blocks_per_page: int = 40, block_mix: dict = None,
+                 inline_density: float = 0.15, code_lines: int = 12, seed: int = 0):
+        self.pages = pages
+        self.depth = depth
+        self.blocks_per_page = blocks_per_page
+        self.block_mix = dict(block_mix or DEFAULT_MIX)
+        self.inline_density = inline_density
+        self.code_lines = code_lines
+        self.seed = seed
+
+    def to_dict(self) -> dict:
+        return dict(vars(self))
+
+def _sentence(rng: random.Random, options: CorpusOptions, words: int) -> str:
+    parts = []
+    for _ in range(words):
+        word = rng.choice(WORDS)
+        if rng.random() < options.inline_density:
+            markup = rng.randrange(5)
+            if markup == 0:
+                word = f"**{word}**"
+            elif markup == 1:
+                word = f"_{word}_"
+            elif markup == 2:
+                word = f"`{word}`"
+            elif markup == 3:
+                word = f"[{word}](/{rng.choice(WORDS)})"
+            else:
+                word = f"![{word}](/images/{rng.choice(WORDS)}.png)"
+        parts.append(word)
+    return " ".join(parts).capitalize()
+
+def _block(rng: random.Random, options: CorpusOptions, block_type: str) -> str:
+    if block_type == "heading":
+        return "#" * rng.randint(2, 6) + " " + _sentence(rng, options, rng.randint(2, 6))
+    if block_type == "unordered_list":
+        return "\n".join("- " + _sentence(rng, options, rng.randint(3, 10)) for _ in range(rng.randint(2, 6)))
+    if block_type == "ordered_list":
+        return "\n".join(f"{i}. " + _sentence(rng, options, rng.randint(3, 10)) for i in range(1, rng.randint(3, 7)))
+    if block_type == "quote":
+        return "\n".join("> " + _sentence(rng, options, rng.randint(5, 12)) for _ in range(rng.randint(1, 4)))
+    if block_type == "code":
+        lines = [f"    {rng.choice(WORDS)} = {rng.choice(WORDS)}({rng.randint(0, 99)})" for _ in range(options.code_lines)]
+        return "```\n" + "\n".join(lines) + "\n```"
+    return "\n".join(_sentence(rng, options, rng.randint(8, 20)) + "." for _ in range(rng.randint(1, 4)))
+
+def generate_markdown(rng: random.Random, options: CorpusOptions, title: str) -> str:
+    """One page: an h1 title followed by blocks drawn from the block mix"""
+    kinds = list(options.block_mix)
+    weights = [options.block_mix[kind] for kind in kinds]
+    blocks = [f"# {title}"]
+    for kind in rng.choices(kinds, weights, k=options.blocks_per_page):
+        blocks.append(_block(rng, options, kind))
+    return "\n\n".join(blocks) + "\n"
+
+def page_paths(rng: random.Random, options: CorpusOptions) -> list[str]:
+    """Relative markdown paths, nested up to options.depth directories deep"""
+    paths = ["index.md"]
+    for i in range(1, options.pages):
+        parts = [f"{rng.choice(WORDS)}-{rng.randrange(8)}" for _ in range(rng.randint(0, options.depth))]
+        paths.append(os.path.join(*parts, f"page-{i}", "index.md"))
+    return paths
+
+def generate_corpus(root: str, options: CorpusOptions = None) -> list[str]:
+    """
+    Write content/, static/ and template.html for a synthetic site below root.
+
+    Returns:
+        The paths of the generated markdown files
+    """
+    options = options or CorpusOptions()
+    rng = random.Random(options.seed)
+    written = []
+    for index, relpath in enumerate(page_paths(rng, options)):
+        path = os.path.join(root, "content", relpath)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(generate_markdown(rng, options, f"Page {index}"))
+        written.append(path)
+
+    os.makedirs(os.path.join(root, "static", "images"), exist_ok=True)
+    with open(os.path.join(root, "static", "index.css"), 'w', encoding='utf-8') as f:
+        f.write("body {\n  margin: 0;\n}\n")
+    with open(os.path.join(root, "template.html"), 'w', encoding='utf-8') as f:
+        f.write(TEMPLATE)
+    return written
+
+def parse_mix(text: str) -> dict:
+    """Parse "paragraph=6,code=2" into a block mix"""
+    mix = {}
+    for item in text.split(","):
+        name, _, weight = item.partition("=")
+        if name.strip() not in DEFAULT_MIX:
+            raise ValueError(f"Unknown block type in mix: {name}")
+        mix[name.strip()] = float(weight)
+    return mix
+
+def add_corpus_arguments(parser: argparse.ArgumentParser):
+    parser.add_argument("--pages", type=int, default=100)
+    parser.add_argument("--depth", type=int, default=3)
+    parser.add_argument("--blocks-per-page", type=int, default=40)
+    parser.add_argument("--mix", type=parse_mix, default=None, help='block weights, e.g. "paragraph=6,code=2"')
+    parser.add_argument("--inline-density", type=float, default=0.15)
+    parser.add_argument("--code-lines", type=int, default=12)
+    parser.add_argument("--seed", type=int, default=0)
+
+def corpus_options_from_args(args) -> CorpusOptions:
+    return CorpusOptions(args.pages, args.depth, args.blocks_per_page, args.mix, args.inline_density, args.code_lines, args.seed)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("output")
+    add_corpus_arguments(parser)
+    args = parser.parse_args(argv)
+    written = generate_corpus(args.output, corpus_options_from_args(args))
+    print(f"Wrote {len(written)} pages to {args.output}")
+
+if __name__ == "__main__":
+    main()
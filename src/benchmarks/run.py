@@ -0,0 +1,169 @@
+"""
+Benchmark the hot paths of the generator on a synthetic corpus.
+
+Usage:
+    python3 src/benchmarks/run.py [--pages N ...] [--output results.json]
+                                  [--baseline baseline.json] [--save-baseline baseline.json]
+
+Results are printed as JSON on stdout; a readable summary goes to stderr.
+With --baseline, any benchmark slower than the baseline by more than
+--tolerance is reported as a regression and the exit status is 1.
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+
+# Add the src directory to the path so we can import our modules
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from benchmarks.corpus import add_corpus_arguments, corpus_options_from_args, generate_corpus
+
+def time_call(func, repeat: int, setup=None, warmup: int = 0) -> dict:
+    """
+    Run func repeat times and summarize the wall-clock durations.
+
+    setup, if given, runs untimed before every repeat (e.g. to empty a cache
+    so each repeat starts cold); warmup untimed calls of func come first.
+    """
+    for _ in range(warmup):
+        func()
+    durations = []
+    for _ in range(repeat):
+        if setup is not None:
+            setup()
+        started = time.perf_counter()
+        func()
+        durations.append(time.perf_counter() - started)
+    return {
+        "min": min(durations),
+        "median": statistics.median(durations),
+        "repeat": repeat,
+    }
+
+def run_benchmarks(root: str, repeat: int) -> dict:
+    """Time every stage of the pipeline on the corpus below root"""
+    # Import here so the modules are loaded from src/ after the path tweak above
+    from block_parser import parse_blocks
+    from main import generate_page, main as build_main, text_to_textnodes
+    from markdown_html import BLOCK_CACHE, markdown_to_html_node
+    from markdown_utils import markdown_to_blocks
+
+    sources = []
+    for dirpath, _, filenames in os.walk(os.path.join(root, "content")):
+        for name in sorted(filenames):
+            if name.endswith(".md"):
+                sources.append(os.path.join(dirpath, name))
+    sources.sort()
+    documents = []
+    for path in sources:
+        with open(path, 'r', encoding='utf-8') as f:
+            documents.append(f.read())
+    inline_texts = [block.content for document in documents for block in parse_blocks(document) if block.type.value in ("paragraph", "heading")]
+    trees = [markdown_to_html_node(document) for document in documents]
+    template_path = os.path.join(root, "template.html")
+    page_dest = os.path.join(root, "bench-pages")
+
+    def generate_pages():
+        for index, path in enumerate(sources):
+            generate_page(path, template_path, os.path.join(page_dest, f"{index}.html"))
+
+    # The rendered-block cache lives as long as the process: page generation
+    # starts every repeat with it empty, as a fresh build would, unless the
+    # benchmark is the _warm variant that measures reuse across builds
+    cold = {"setup": BLOCK_CACHE.clear}
+    warm = {"setup": None, "warmup": 1}
+    benchmarks = {
+        "markdown_to_blocks": (lambda: [markdown_to_blocks(document) for document in documents], {}),
+        "parse_blocks": (lambda: [parse_blocks(document) for document in documents], {}),
+        "text_to_textnodes": (lambda: [text_to_textnodes(text) for text in inline_texts], {}),
+        "markdown_to_html_node": (lambda: [markdown_to_html_node(document) for document in documents], {}),
+        "to_html": (lambda: [tree.to_html() for tree in trees], {}),
+        "generate_page": (generate_pages, cold),
+        "generate_page_warm": (generate_pages, warm),
+        # --clean keeps the on-disk parse cache, so the full build turns it off
+        # and build_warm times a clean build that starts from a primed one
+        "build_full": (lambda: build_main(["--clean", "--parse-cache-mb", "0"]), cold),
+        "build_warm": (lambda: build_main(["--clean"]), dict(cold, warmup=1)),
+        "build_noop": (lambda: build_main([]), cold),
+    }
+
+    results = {}
+    previous_cwd = os.getcwd()
+    os.chdir(root)
+    try:
+        for name, (func, options) in benchmarks.items():
+            # The generator prints progress for every page; keep it out of the report
+            with contextlib.redirect_stdout(io.StringIO()):
+                results[name] = time_call(func, repeat, **options)
+            print(f"{name:>22}: {results[name]['min'] * 1000:9.2f} ms (min of {repeat})", file=sys.stderr)
+    finally:
+        os.chdir(previous_cwd)
+    return results
+
+def compare(results: dict, baseline: dict, tolerance: float) -> dict:
+    """
+    Compare minimum timings with a baseline.
+
+    Returns:
+        Per-benchmark ratios (current / baseline) and the names that regressed
+    """
+    ratios = {}
+    regressions = []
+    for name, result in results.items():
+        base = baseline.get("results", {}).get(name)
+        if not base or not base.get("min"):
+            continue
+        ratio = result["min"] / base["min"]
+        ratios[name] = round(ratio, 3)
+        if ratio > 1 + tolerance:
+            regressions.append(name)
+    return {"ratios": ratios, "regressions": regressions, "tolerance": tolerance}
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    add_corpus_arguments(parser)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--output", help="also write the JSON report to this file")
+    parser.add_argument("--baseline", help="JSON report to compare against")
+    parser.add_argument("--save-baseline", help="write this run as the new baseline")
+    parser.add_argument("--tolerance", type=float, default=0.10, help="allowed slowdown before a benchmark counts as a regression")
+    args = parser.parse_args(argv)
+
+    options = corpus_options_from_args(args)
+    report = {
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "corpus": options.to_dict(),
+    }
+    with tempfile.TemporaryDirectory() as root:
+        generate_corpus(root, options)
+        report["results"] = run_benchmarks(root, args.repeat)
+
+    status = 0
+    if args.baseline:
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+        if baseline.get("corpus") != report["corpus"]:
+            print("warning: baseline was recorded with a different corpus", file=sys.stderr)
+        report["comparison"] = compare(report["results"], baseline, args.tolerance)
+        for name in report["comparison"]["regressions"]:
+            print(f"REGRESSION {name}: {report['comparison']['ratios'][name]}x baseline", file=sys.stderr)
+            status = 1
+
+    text = json.dumps(report, indent=2, sort_keys=True)
+    print(text)
+    for path in (args.output, args.save_baseline):
+        if path:
+            with open(path, 'w', encoding='utf-8') as f:
+                f.write(text + "\n")
+    return status
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,104 @@
+import re
+
+from blocknode import Block, BlockType
+
+_HEADING_RE = re.compile(r"#{1,6} .")
+_ORDERED_ITEM_RE = re.compile(r"\d+\. ")
+
+def _is_fence_block(text: str) -> bool:
+    return text.startswith("```") and text.endswith("```")
+
+def _line_type(line: str) -> BlockType:
+    """Classify a block made of a single stripped line"""
+    if _HEADING_RE.match(line):
+        return BlockType.HEADING
+    if line.startswith("- "):
+        return BlockType.UNORDERED_LIST
+    if _ORDERED_ITEM_RE.match(line):
+        return BlockType.ORDERED_LIST
+    if _is_fence_block(line):
+        return BlockType.CODE
+    if line.startswith(">"):
+        return BlockType.QUOTE
+    return BlockType.PARAGRAPH
+
+def _group_blocks(lines: list[str], start: int, end: int) -> list[Block]:
+    """Type a run of non-blank lines, with the same rules as markdown_to_blocks and block_to_block_type"""
+    raw = "\n".join(lines[start:end]).strip()
+    if _is_fence_block(raw):
+        return [Block(BlockType.CODE, start + 1, end, raw)]
+
+    clean_lines = [line.strip() for line in lines[start:end]]
+    if len(clean_lines) == 1:
+        return [Block(_line_type(clean_lines[0]), start + 1, end, clean_lines[0])]
+
+    if all(line.startswith("- ") for line in clean_lines):
+        block_type = BlockType.UNORDERED_LIST
+    elif all(_ORDERED_ITEM_RE.match(line) for line in clean_lines):
+        block_type = BlockType.ORDERED_LIST
+    elif all(line.startswith(">") for line in clean_lines):
+        block_type = BlockType.QUOTE
+    elif any(line.startswith("#") for line in clean_lines):
+        # A heading mixed with other lines: every line is a block of its own
+        return [Block(_line_type(line), start + 1 + offset, start + 1 + offset, line) for offset, line in enumerate(clean_lines)]
+    else:
+        block_type = BlockType.PARAGRAPH
+    return [Block(block_type, start + 1, end, "\n".join(clean_lines))]
+
+def parse_blocks(markdown: str) -> list[Block]:
+    """
+    Split markdown into typed blocks in one pass over its lines.
+
+    Blocks are separated by blank lines and typed as they are collected, so
+    callers never need block_to_block_type. The blocks and types are those
+    of markdown_to_blocks plus block_to_block_type, with one exception: a
+    group of lines that starts with an opening fence and has no closing
+    fence after it runs on, across blank lines, up to and including the
+    next line that ends with a fence. That line ends the code block even
+    if more lines follow it before the next blank line; they start a new
+    group.
+
+    Returns:
+        Blocks with their type, 1-based inclusive line range and content
+    """
+    lines = markdown.split("\n")
+    count = len(lines)
+    blocks = []
+    closing_fences = None
+    i = 0
+    while i < count:
+        if not lines[i].strip():
+            i += 1
+            continue
+
+        start = i
+        while i < count and lines[i].strip():
+            i += 1
+
+        # An opening fence that no later line of its group closes runs on, across blank lines,
+        # to the next closing fence; a fence closed within its group leaves the group as it is,
+        # and a line that opens and closes its own fence ("``` x ```") opens nothing
+        first = lines[start].strip()
+        opens_fence = first.startswith("```") and not (len(first) >= 6 and first.endswith("```"))
+        if opens_fence:
+            if closing_fences is None:
+                closing_fences = _closing_fence_index(lines)
+            close = closing_fences[start + 1]
+            if close is not None and close >= i:
+                content = "\n".join(lines[start:close + 1]).strip()
+                blocks.append(Block(BlockType.CODE, start + 1, close + 1, content))
+                i = close + 1
+                continue
+
+        blocks.extend(_group_blocks(lines, start, i))
+    return blocks
+
+def _closing_fence_index(lines: list[str]) -> list:
+    """For every line, the index of the first line at or after it that ends a fence"""
+    result = [None] * (len(lines) + 1)
+    next_close = None
+    for index in range(len(lines) - 1, -1, -1):
+        if lines[index].rstrip().endswith("```"):
+            next_close = index
+        result[index] = next_close
+    return result
@@ -6,4 +6,18 @@ class BlockType(Enum):
   CODE = "code"
   QUOTE = "quote"
   UNORDERED_LIST = "unordered_list"
-  ORDERED_LIST = "ordered_list"
\ No newline at end of file
+  ORDERED_LIST = "ordered_list"
+
+class Block:
+  def __init__(self, block_type: BlockType, start_line: int, end_line: int, content: str):
+    self.type = block_type
+    # 1-based, inclusive line numbers of the block in the source document
+    self.start_line = start_line
+    self.end_line = end_line
+    self.content = content
+
+  def __repr__(self):
+    return f"Block({self.type.value}, {self.start_line}-{self.end_line}, {self.content!r})"
+
+  def __eq__(self, other):
+    return self.type == other.type and self.start_line == other.start_line and self.end_line == other.end_line and self.content == other.content
\ No newline at end of file
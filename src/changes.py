@@ -0,0 +1,133 @@
+import contextlib
+import json
+import os
+import threading
+
+ADDED = "added"
+CHANGED = "changed"
+UNCHANGED = "unchanged"
+REMOVED = "removed"
+STATUSES = (ADDED, CHANGED, UNCHANGED, REMOVED)
+
+_COMPARE_CHUNK = 1 << 16
+
+def _same_contents(path_a: str, path_b: str) -> bool:
+    """Byte-compare two files of equal size"""
+    with open(path_a, 'rb') as a, open(path_b, 'rb') as b:
+        while True:
+            chunk = a.read(_COMPARE_CHUNK)
+            if chunk != b.read(_COMPARE_CHUNK):
+                return False
+            if not chunk:
+                return True
+
+def replace_if_changed(tmp_path: str, dest_path: str) -> str:
+    """
+    Move a finished temporary file over dest_path, unless dest_path already
+    holds the same bytes; then the temporary file is dropped and dest_path
+    keeps its mtime.
+
+    Returns:
+        ADDED, CHANGED or UNCHANGED
+    """
+    try:
+        dest_size = os.path.getsize(dest_path)
+    except FileNotFoundError:
+        os.replace(tmp_path, dest_path)
+        return ADDED
+    if dest_size == os.path.getsize(tmp_path) and _same_contents(tmp_path, dest_path):
+        os.remove(tmp_path)
+        return UNCHANGED
+    os.replace(tmp_path, dest_path)
+    return CHANGED
+
+def write_atomic(path: str, write, binary: bool = False, replace=os.replace, unique: bool = False):
+    """
+    Stream a file through write(f) into a temporary file next to path, then
+    move it into place with replace(tmp_path, path), so readers never see a
+    partial file.
+
+    Args:
+        path: The file to write
+        write: Called with the open temporary file
+        binary: Open the temporary file in binary mode instead of UTF-8 text
+        replace: Moves the finished file over path; replace_if_changed keeps an identical file
+        unique: Name the temporary file after this process, for files several processes may write at once
+
+    Returns:
+        Whatever replace returns
+    """
+    tmp_path = f"{path}.{os.getpid()}.tmp" if unique else path + ".tmp"
+    try:
+        with (open(tmp_path, 'wb') if binary else open(tmp_path, 'w', encoding='utf-8')) as f:
+            write(f)
+    except BaseException:
+        # A failed write leaves no temporary file behind; cleaning up must not hide the original error
+        with contextlib.suppress(OSError):
+            os.remove(tmp_path)
+        raise
+    return replace(tmp_path, path)
+
+def write_if_changed(dest_path: str, data: bytes) -> str:
+    """
+    Atomically write data to dest_path, unless it already holds exactly data.
+
+    Returns:
+        ADDED, CHANGED or UNCHANGED
+    """
+    try:
+        dest_size = os.path.getsize(dest_path)
+    except FileNotFoundError:
+        dest_size = None
+    if dest_size == len(data):
+        with open(dest_path, 'rb') as f:
+            if f.read() == data:
+                return UNCHANGED
+    write_atomic(dest_path, lambda f: f.write(data), binary=True)
+    return ADDED if dest_size is None else CHANGED
+
+class ChangeReport:
+    """
+    Every output file a build wrote, kept or deleted, by outcome, with its size.
+
+    Safe to record into from several threads.
+    """
+    def __init__(self):
+        self.files = {status: {} for status in STATUSES}
+        self._lock = threading.Lock()
+
+    def record(self, path: str, status: str, size: int = None):
+        """Record an output file; the size is read from disk when not given"""
+        if size is None:
+            size = os.path.getsize(path)
+        with self._lock:
+            self.files[status][path] = size
+
+    def remove(self, path: str):
+        """Delete an output file, recording it as removed with the size it had"""
+        size = os.path.getsize(path)
+        os.remove(path)
+        self.record(path, REMOVED, size)
+
+    def summary(self) -> dict:
+        return {status: {"files": len(files), "bytes": sum(files.values())} for status, files in self.files.items()}
+
+    def to_dict(self) -> dict:
+        return {
+            "summary": self.summary(),
+            "files": {status: [{"path": path, "bytes": files[path]} for path in sorted(files)] for status, files in self.files.items()},
+        }
+
+    def save(self, path: str):
+        """Write the report as JSON, e.g. for a deploy step that uploads only what changed"""
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.to_dict(), f, indent=2)
+            f.write("\n")
+
+    def __str__(self):
+        summary = self.summary()
+        parts = [f"{summary[status]['files']} {status} ({summary[status]['bytes']} bytes)" for status in STATUSES]
+        return "Build changes: " + ", ".join(parts)
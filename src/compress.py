@@ -0,0 +1,145 @@
+import gzip
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+from changes import UNCHANGED, write_if_changed
+
+# Text formats worth precompressing; images and fonts are already compressed
+COMPRESSIBLE_EXTENSIONS = (".html", ".css", ".js", ".mjs", ".json", ".xml", ".svg", ".txt", ".map")
+
+# Files smaller than this gain too little from compression to be worth a sibling
+MIN_COMPRESS_SIZE = 1024
+
+def _zstd_compress():
+    """Return a zstd compress function from the runtime, or None if it has none"""
+    try:
+        from compression import zstd
+        return lambda data: zstd.compress(data, level=19)
+    except ImportError:
+        pass
+    try:
+        import zstandard
+        return zstandard.ZstdCompressor(level=19).compress
+    except ImportError:
+        return None
+
+def _gzip_compress(data: bytes) -> bytes:
+    # A fixed timestamp keeps the output reproducible, so unchanged files stay byte-identical
+    return gzip.compress(data, compresslevel=9, mtime=0)
+
+def available_encodings() -> dict:
+    """Map of sibling suffix to compress function for every encoding this runtime supports"""
+    encodings = {".gz": _gzip_compress}
+    zstd_compress = _zstd_compress()
+    if zstd_compress is not None:
+        encodings[".zst"] = zstd_compress
+    return encodings
+
+def _is_fresh(variant_path: str, source_stat: os.stat_result) -> bool:
+    """A variant is fresh when it carries its source's mtime, which compress_file sets"""
+    try:
+        return os.stat(variant_path).st_mtime_ns == source_stat.st_mtime_ns
+    except FileNotFoundError:
+        return False
+
+def compress_file(path: str, encodings: dict) -> list[tuple[str, str]]:
+    """
+    Write a precompressed sibling of path for every encoding that is missing or stale.
+
+    Returns:
+        (variant path, ADDED/CHANGED/UNCHANGED) for every variant
+    """
+    source_stat = os.stat(path)
+    results = []
+    data = None
+    for suffix, compress in encodings.items():
+        variant_path = path + suffix
+        if _is_fresh(variant_path, source_stat):
+            results.append((variant_path, UNCHANGED))
+            continue
+        if data is None:
+            with open(path, 'rb') as f:
+                data = f.read()
+        status = write_if_changed(variant_path, compress(data))
+        os.utime(variant_path, ns=(source_stat.st_atime_ns, source_stat.st_mtime_ns))
+        results.append((variant_path, status))
+    return results
+
+def precompress_directory(root: str, min_size: int = MIN_COMPRESS_SIZE, workers: int = None, changes=None, encodings: dict = None) -> dict:
+    """
+    Keep .gz (and .zst, where available) siblings of every compressible file below root up to date.
+
+    Only files whose variant is missing or older than the file itself are
+    compressed, on a thread pool (zlib and zstd release the GIL). Variants
+    whose source is gone or has fallen under min_size are deleted.
+
+    Args:
+        root: The output directory
+        min_size: Files smaller than this many bytes are not compressed
+        workers: Number of compression threads (default: one per CPU core)
+        changes: Optional ChangeReport that records every variant
+        encodings: Suffix to compress function mapping (default: available_encodings())
+
+    Returns:
+        Counts of "compressed", "unchanged" and "removed" variants
+    """
+    if encodings is None:
+        encodings = available_encodings()
+    candidates = []
+    stale_variants = []
+    for dirpath, _, filenames in os.walk(root):
+        names = set(filenames)
+        for name in filenames:
+            path = os.path.join(dirpath, name)
+            base, suffix = os.path.splitext(name)
+            if suffix in encodings and base.endswith(COMPRESSIBLE_EXTENSIONS):
+                # A variant is stale once its source is gone or no longer compressed
+                source = os.path.join(dirpath, base)
+                if base not in names or not _wants_compression(source, min_size):
+                    stale_variants.append(path)
+            elif _wants_compression(path, min_size):
+                candidates.append(path)
+
+    counts = {"compressed": 0, "unchanged": 0, "removed": 0}
+    with ThreadPoolExecutor(max_workers=workers or os.cpu_count() or 1) as executor:
+        for results in executor.map(lambda path: compress_file(path, encodings), candidates):
+            for variant_path, status in results:
+                counts["unchanged" if status == UNCHANGED else "compressed"] += 1
+                if changes is not None:
+                    changes.record(variant_path, status)
+
+    for path in stale_variants:
+        if changes is not None:
+            changes.remove(path)
+        else:
+            os.remove(path)
+        counts["removed"] += 1
+    return counts
+
+def refresh_variants(paths: list[str], encodings: dict, min_size: int = MIN_COMPRESS_SIZE) -> int:
+    """
+    Bring the variants of just the given output files up to date, e.g. the files one rebuild rewrote.
+
+    Files that are gone or have fallen under min_size lose their variants.
+
+    Returns:
+        The number of variants written or removed
+    """
+    count = 0
+    for path in paths:
+        if _wants_compression(path, min_size):
+            count += sum(status != UNCHANGED for _, status in compress_file(path, encodings))
+        elif path.endswith(COMPRESSIBLE_EXTENSIONS):
+            for suffix in encodings:
+                if os.path.exists(path + suffix):
+                    os.remove(path + suffix)
+                    count += 1
+    return count
+
+def _wants_compression(path: str, min_size: int) -> bool:
+    if not path.endswith(COMPRESSIBLE_EXTENSIONS):
+        return False
+    try:
+        return os.path.getsize(path) >= min_size
+    except FileNotFoundError:
+        return False
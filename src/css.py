@@ -0,0 +1,183 @@
+import os
+import posixpath
+import re
+
+from changes import write_atomic
+from manifest import hash_bytes, hash_file
+
+# Stylesheets up to this size (after minification) are inlined whole
+INLINE_CSS_MAX_BYTES = 8192
+
+# Strings, comments, whitespace, and runs of anything else
+_CSS_TOKEN_RE = re.compile(r"""("(?:[^"\\\n]|\\.)*"|'(?:[^'\\\n]|\\.)*')|(/\*.*?\*/)|(\s+)|([^"'/\s]+|.)""", re.S)
+
+# Whitespace is dropped after and before these characters
+_NO_SPACE_AFTER = "{};,:>~(/"
+_NO_SPACE_BEFORE = "{};,>~)!"
+
+_URL_RE = re.compile(r"""url\(\s*(["']?)([^"')]*)\1\s*\)""")
+_ABSOLUTE_URL_RE = re.compile(r"(?:[A-Za-z][A-Za-z0-9+.-]*:|//|#)")
+
+_LINK_RE = re.compile(r"<link\b[^>]*>")
+_STYLESHEET_RE = re.compile(r"""\srel=["']?stylesheet\b""")
+_HREF_RE = re.compile(r"""\shref=["']?/([^"'?#\s>]*)""")
+
+def minify_css(css: str) -> str:
+    """
+    Drop comments and insignificant whitespace from a stylesheet.
+
+    Strings and /*! comments (licenses) are kept exactly, and the last
+    semicolon of every block is dropped.
+    """
+    out = []
+    space = False
+    for match in _CSS_TOKEN_RE.finditer(css):
+        string, comment, whitespace, other = match.groups()
+        if whitespace is not None or (comment is not None and not comment.startswith("/*!")):
+            # A comment still separates the tokens around it
+            space = True
+            continue
+        token = string or comment or other
+        if space and out and out[-1][-1] not in _NO_SPACE_AFTER and token[0] not in _NO_SPACE_BEFORE:
+            out.append(" ")
+        space = False
+        if other is not None:
+            token = token.replace(";}", "}")
+            if token[0] == "}" and out and out[-1].endswith(";"):
+                out[-1] = out[-1][:-1]
+        out.append(token)
+    return "".join(out)
+
+def rebase_css_urls(css: str, stylesheet_path: str, basepath: str = "/", assets: dict = None) -> str:
+    """
+    Make the url() references of a stylesheet work from any page it is inlined into.
+
+    Args:
+        css: The stylesheet
+        stylesheet_path: Path of the stylesheet relative to the site root (e.g. "css/site.css")
+        basepath: Base path for the site
+        assets: Optional map of asset path to fingerprinted path
+    """
+    directory = posixpath.dirname(stylesheet_path)
+    def replace(match):
+        url = match.group(2)
+        if not url or _ABSOLUTE_URL_RE.match(url):
+            return match.group()
+        path, query = re.match(r"([^?#]*)(.*)", url).groups()
+        if path.startswith("/"):
+            path = path[1:]
+        else:
+            path = posixpath.normpath(posixpath.join(directory, path))
+        if assets:
+            path = assets.get(path, path)
+        return f'url("{basepath}{path}{query}")'
+    return _URL_RE.sub(replace, css)
+
+class CssCache:
+    """
+    Minified stylesheets kept on disk between builds.
+
+    Entries are keyed by a hash of the source and of this module, so a
+    stylesheet is only minified again when it or the minifier changes.
+    """
+    def __init__(self, directory: str):
+        self.directory = directory
+        self.hits = 0
+        self.misses = 0
+        self._version = hash_file(os.path.abspath(__file__))
+        self._used = set()
+
+    def minify(self, source: bytes) -> bytes:
+        key = hash_bytes(self._version.encode('ascii') + b"\0" + source)
+        path = os.path.join(self.directory, key + ".css")
+        self._used.add(path)
+        try:
+            with open(path, 'rb') as f:
+                data = f.read()
+            self.hits += 1
+            return data
+        except FileNotFoundError:
+            pass
+        self.misses += 1
+        data = minify_css(source.decode('utf-8')).encode('utf-8')
+        os.makedirs(self.directory, exist_ok=True)
+        write_atomic(path, lambda f: f.write(data), binary=True, unique=True)
+        return data
+
+    def minify_file(self, path: str) -> bytes:
+        with open(path, 'rb') as f:
+            return self.minify(f.read())
+
+    def prune(self):
+        """Delete the entries this build did not use"""
+        if not os.path.isdir(self.directory):
+            return
+        for name in os.listdir(self.directory):
+            path = os.path.join(self.directory, name)
+            if path not in self._used:
+                os.remove(path)
+
+def css_transform(static_dir: str, cache: CssCache):
+    """Return a sync transform that writes every .css file below static_dir minified"""
+    def transform(rel_path: str) -> bytes:
+        if not rel_path.endswith(".css"):
+            return None
+        return cache.minify_file(os.path.join(static_dir, rel_path))
+    return transform
+
+def _style_tag(css: str) -> str:
+    # A literal end tag inside the stylesheet would close the element early
+    return "<style>" + css.replace("</style", "<\\/style") + "</style>"
+
+def inline_stylesheets(template: str, static_dir: str, basepath: str = "/", assets: dict = None, cache: CssCache = None,
+                       max_bytes: int = INLINE_CSS_MAX_BYTES, critical: str = None) -> str:
+    """
+    Replace the template's render-blocking stylesheet links with inline CSS.
+
+    A linked stylesheet from static_dir that is at most max_bytes once
+    minified is inlined whole. A larger one is inlined as the critical CSS
+    given (once, at the first such link) and then loaded without blocking
+    rendering; without critical CSS it is left as it is.
+
+    Args:
+        template: The template text
+        static_dir: Directory the stylesheets are served from
+        basepath: Base path for the site, for the url() references of inlined CSS
+        assets: Optional map of asset path to fingerprinted path
+        cache: Optional CssCache for the minified stylesheets
+        max_bytes: Largest stylesheet that is inlined whole
+        critical: Optional CSS needed for the first paint of every page; its
+            relative url() references are taken to be relative to the site root
+
+    Returns:
+        The new template text
+    """
+    critical_written = False
+    def replace(match):
+        nonlocal critical_written
+        tag = match.group()
+        href = _HREF_RE.search(tag)
+        if not _STYLESHEET_RE.search(tag) or href is None:
+            return tag
+        path = os.path.join(static_dir, *href.group(1).split("/"))
+        if not os.path.isfile(path):
+            return tag
+        if cache is not None:
+            css = cache.minify_file(path).decode('utf-8')
+        else:
+            with open(path, 'r', encoding='utf-8') as f:
+                css = minify_css(f.read())
+        if len(css.encode('utf-8')) <= max_bytes:
+            return _style_tag(rebase_css_urls(css, href.group(1), basepath, assets))
+        if critical is None:
+            return tag
+        url = f"/{href.group(1)}"
+        deferred = (
+            f'<link rel="preload" href="{url}" as="style" onload="this.onload=null;this.rel=\'stylesheet\'">'
+            f'<noscript><link rel="stylesheet" href="{url}"></noscript>'
+        )
+        if critical_written:
+            return deferred
+        critical_written = True
+        return _style_tag(rebase_css_urls(critical, "", basepath, assets)) + deferred
+    return _LINK_RE.sub(replace, template)
@@ -0,0 +1,140 @@
+import argparse
+import io
+import mimetypes
+import os
+import posixpath
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import unquote, urlsplit
+
+from cache import LRUCache
+from template import load_template
+
+class DevSite:
+    """
+    Renders pages on request instead of building the whole site up front.
+
+    Rendered pages are kept in a size-bounded LRU cache and reused for as
+    long as the source file and the template are unchanged.
+    """
+    def __init__(self, content_dir: str, static_dir: str, template_path: str, basepath: str = "/", cache_bytes: int = 64 << 20):
+        self.content_dir = content_dir
+        self.static_dir = static_dir
+        self.template_path = template_path
+        self.basepath = basepath
+        self.cache = LRUCache(max_bytes=cache_bytes, sizeof=lambda entry: len(entry[1]))
+
+    def resolve(self, url_path: str) -> tuple[str, str]:
+        """
+        Map a request path to ("page", markdown path), ("static", file path) or (None, None).
+
+        "/blog/tom", "/blog/tom/" and "/blog/tom/index.html" all map to
+        content/blog/tom/index.md; "/about.html" maps to content/about.md.
+        """
+        path = posixpath.normpath(unquote(url_path))
+        base = self.basepath.rstrip("/")
+        if base:
+            if path != base and not path.startswith(base + "/"):
+                return None, None
+            path = path[len(base):] or "/"
+        relative = path.lstrip("/")
+        if relative.startswith(".."):
+            return None, None
+
+        static_path = os.path.join(self.static_dir, relative)
+        if relative and os.path.isfile(static_path):
+            return "static", static_path
+
+        if relative.endswith(".html"):
+            candidates = [relative[:-len(".html")] + ".md"]
+        else:
+            candidates = [os.path.join(relative, "index.md"), relative + ".md"]
+        for candidate in candidates:
+            md_path = os.path.join(self.content_dir, candidate)
+            if os.path.isfile(md_path):
+                return "page", md_path
+        return None, None
+
+    def render(self, md_path: str) -> bytes:
+        """Return the rendered page for a markdown file, from the cache when it is still fresh"""
+        # Import here to avoid circular imports
+        from main import write_page
+
+        # Keyed on the template file, not the compiled object, whose id can be reused once it is recompiled
+        stat = os.stat(md_path)
+        template_stat = os.stat(self.template_path)
+        version = (stat.st_mtime_ns, stat.st_size, template_stat.st_mtime_ns, template_stat.st_size)
+        template = load_template(self.template_path, self.basepath)
+        cached = self.cache.get(md_path)
+        if cached is not None and cached[0] == version:
+            return cached[1]
+
+        with open(md_path, 'r', encoding='utf-8') as f:
+            markdown_content = f.read()
+        out = io.StringIO()
+        write_page(markdown_content, template, self.basepath, out)
+        body = out.getvalue().encode('utf-8')
+        self.cache.put(md_path, (version, body))
+        return body
+
+class DevRequestHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        self._respond(send_body=True)
+
+    def do_HEAD(self):
+        self._respond(send_body=False)
+
+    def _respond(self, send_body: bool):
+        site = self.server.site
+        kind, path = site.resolve(urlsplit(self.path).path)
+        try:
+            if kind == "page":
+                body = site.render(path)
+                content_type = "text/html; charset=utf-8"
+            elif kind == "static":
+                with open(path, 'rb') as f:
+                    body = f.read()
+                content_type = mimetypes.guess_type(path)[0] or "application/octet-stream"
+            else:
+                self.send_error(404, "Not Found")
+                return
+        except Exception as e:
+            self.send_error(500, f"{type(e).__name__}: {e}")
+            return
+
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("Cache-Control", "no-cache")
+        self.end_headers()
+        if send_body:
+            self.wfile.write(body)
+
+class DevServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address: tuple, site: DevSite):
+        super().__init__(address, DevRequestHandler)
+        self.site = site
+
+def serve_main(argv=None) -> int:
+    # Import here to avoid circular imports
+    from main import CONTENT_PATH, STATIC_PATH, TEMPLATE_PATH
+
+    parser = argparse.ArgumentParser(prog="main.py serve", description="Serve the site, rendering pages on request")
+    parser.add_argument("basepath", nargs="?", default="/", help='base path for the site (e.g. "/" or "/website/")')
+    parser.add_argument("--host", default="localhost")
+    parser.add_argument("--port", type=int, default=8888)
+    parser.add_argument("--cache-mb", type=float, default=64, help="upper bound for the rendered-page cache in megabytes")
+    args = parser.parse_args(argv)
+
+    basepath = "/" + args.basepath.strip("/") + "/" if args.basepath.strip("/") else "/"
+    site = DevSite(CONTENT_PATH, STATIC_PATH, TEMPLATE_PATH, basepath, int(args.cache_mb * (1 << 20)))
+    server = DevServer((args.host, args.port), site)
+    print(f"Serving on http://{args.host}:{server.server_address[1]}{basepath} (Ctrl+C to stop)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print(f"Stopped; page cache {site.cache.stats()}")
+    finally:
+        server.server_close()
+    return 0
@@ -0,0 +1,181 @@
+import datetime
+import json
+import os
+from email.utils import format_datetime
+from xml.sax.saxutils import escape, quoteattr
+
+from changes import replace_if_changed, write_atomic
+from manifest import hash_bytes, hash_file
+
+SITEMAP_NAME = "sitemap.xml"
+FEED_NAME = "feed.xml"
+
+# The sitemaps.org limit of URLs per sitemap file; larger sites get a sitemap index
+SITEMAP_MAX_URLS = 50000
+
+# Newest pages listed in the feed
+FEED_ENTRIES = 20
+
+# The content directory whose pages make up the feed
+FEED_SECTION = "blog"
+
+_SITEMAP_NS = "http://www.sitemaps.org/schemas/sitemap/0.9"
+
+def _parse_date(date: str):
+    """An ISO 8601 date or datetime as a timezone-aware datetime (UTC when unspecified), or None"""
+    if not date:
+        return None
+    try:
+        parsed = datetime.datetime.fromisoformat(date)
+    except ValueError:
+        return None
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=datetime.timezone.utc)
+    return parsed
+
+def absolute_url(site_url: str, basepath: str, url: str) -> str:
+    """Join the site's origin, the basepath and a root-relative page URL"""
+    return site_url.rstrip("/") + basepath + url[1:]
+
+def _write_streamed(path: str, write) -> str:
+    """Stream a file through write(f) into a temporary file, then replace path only if the bytes differ"""
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    return write_atomic(path, write, replace=replace_if_changed)
+
+def sitemap_entries(pages: list, site_url: str, basepath: str) -> list[tuple[str, str]]:
+    """(absolute URL, lastmod date or None) of every page, in URL order"""
+    entries = []
+    for page in pages:
+        date = _parse_date(page.date)
+        entries.append((absolute_url(site_url, basepath, page.url), date.date().isoformat() if date else None))
+    entries.sort()
+    return entries
+
+def feed_entries(pages: list, section: str = FEED_SECTION, limit: int = FEED_ENTRIES) -> list:
+    """The newest limit pages below a section, given pages ordered newest first (see PageIndex.pages)"""
+    prefix = f"/{section}/"
+    return [page for page in pages if page.url.startswith(prefix) and page.url != prefix][:limit]
+
+def channel_link(pages: list, section: str = FEED_SECTION) -> str:
+    """The page a feed's channel links to: the section's own index page if the site has one, else the home page"""
+    index_url = f"/{section}/"
+    return index_url if any(page.url == index_url for page in pages) else "/"
+
+def write_sitemaps(dest_dir: str, entries: list[tuple[str, str]], site_url: str, basepath: str, max_urls: int = SITEMAP_MAX_URLS) -> dict[str, str]:
+    """
+    Write sitemap.xml for the entries from sitemap_entries.
+
+    Past max_urls, the URLs are split over sitemap-1.xml, sitemap-2.xml, ...
+    and sitemap.xml becomes the index of those files.
+
+    Returns:
+        Path -> ADDED, CHANGED or UNCHANGED for every file written
+    """
+    def write_urlset(chunk):
+        def write(f):
+            f.write(f'<?xml version="1.0" encoding="UTF-8"?>\n<urlset xmlns="{_SITEMAP_NS}">\n')
+            for loc, lastmod in chunk:
+                f.write(f"<url><loc>{escape(loc)}</loc>")
+                if lastmod:
+                    f.write(f"<lastmod>{lastmod}</lastmod>")
+                f.write("</url>\n")
+            f.write("</urlset>\n")
+        return write
+
+    written = {}
+    if len(entries) <= max_urls:
+        path = os.path.join(dest_dir, SITEMAP_NAME)
+        written[path] = _write_streamed(path, write_urlset(entries))
+        return written
+
+    root, ext = os.path.splitext(SITEMAP_NAME)
+    names = []
+    for number, start in enumerate(range(0, len(entries), max_urls), 1):
+        name = f"{root}-{number}{ext}"
+        path = os.path.join(dest_dir, name)
+        written[path] = _write_streamed(path, write_urlset(entries[start:start + max_urls]))
+        names.append(name)
+
+    def write_index(f):
+        f.write(f'<?xml version="1.0" encoding="UTF-8"?>\n<sitemapindex xmlns="{_SITEMAP_NS}">\n')
+        for name in names:
+            f.write(f"<sitemap><loc>{escape(absolute_url(site_url, basepath, '/' + name))}</loc></sitemap>\n")
+        f.write("</sitemapindex>\n")
+    path = os.path.join(dest_dir, SITEMAP_NAME)
+    written[path] = _write_streamed(path, write_index)
+    return written
+
+def write_feed(path: str, entries: list, site_url: str, basepath: str, title: str, link: str = "/") -> str:
+    """
+    Write an RSS 2.0 feed of the entries from feed_entries.
+
+    Items get a pubDate only when their page has a date, which RSS (unlike
+    Atom) allows, so undated pages can still be listed. The channel links
+    to link, a root-relative page URL such as channel_link returns.
+
+    Returns:
+        ADDED, CHANGED or UNCHANGED
+    """
+    channel_url = absolute_url(site_url, basepath, link)
+    feed_url = absolute_url(site_url, basepath, "/" + os.path.basename(path))
+
+    def write(f):
+        f.write('<?xml version="1.0" encoding="UTF-8"?>\n<rss version="2.0" xmlns:atom="http://www.w3.org/2005/Atom">\n<channel>\n')
+        f.write(f"<title>{escape(title)}</title>\n<link>{escape(channel_url)}</link>\n<description>{escape(title)}</description>\n")
+        f.write(f'<atom:link href={quoteattr(feed_url)} rel="self" type="application/rss+xml"/>\n')
+        for page in entries:
+            link = escape(absolute_url(site_url, basepath, page.url))
+            f.write(f"<item><title>{escape(page.title or page.url)}</title><link>{link}</link><guid>{link}</guid>")
+            date = _parse_date(page.date)
+            if date is not None:
+                f.write(f"<pubDate>{format_datetime(date)}</pubDate>")
+            f.write("</item>\n")
+        f.write("</channel>\n</rss>\n")
+    return _write_streamed(path, write)
+
+def feed_digest(*parts) -> str:
+    """Digest of everything a feed or sitemap is written from, including this module's code"""
+    code = hash_file(os.path.abspath(__file__))
+    return hash_bytes(json.dumps([code, *parts], default=lambda page: [page.url, page.title, page.date]).encode('utf-8'))
+
+class FeedState:
+    """
+    The input digest of every generated feed and sitemap, and the files written from it.
+
+    A feed whose digest is unchanged and whose files all exist is skipped
+    without being written; one that is no longer generated has its files
+    removed.
+    """
+    def __init__(self, path: str):
+        self.path = path
+        self.feeds = {}
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                self.feeds = json.load(f)
+        except (OSError, ValueError):
+            pass
+
+    def outputs(self, name: str) -> list[str]:
+        return self.feeds.get(name, {}).get("outputs", [])
+
+    def is_current(self, name: str, digest: str) -> bool:
+        entry = self.feeds.get(name)
+        return entry is not None and entry["digest"] == digest and all(os.path.exists(path) for path in entry["outputs"])
+
+    def record(self, name: str, digest: str, outputs: list[str]) -> list[str]:
+        """Remember the files a feed was written to, and return the ones an earlier build wrote but this one did not"""
+        stale = [path for path in self.outputs(name) if path not in outputs]
+        self.feeds[name] = {"digest": digest, "outputs": sorted(outputs)}
+        return stale
+
+    def forget(self, name: str) -> list[str]:
+        """Drop a feed that is no longer generated, returning the files it was written to"""
+        return self.feeds.pop(name, {}).get("outputs", [])
+
+    def save(self):
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        write_atomic(self.path, lambda f: json.dump(self.feeds, f, indent=1, sort_keys=True))
@@ -1,13 +1,54 @@
 class HTMLNode:
+  __slots__ = ("tag", "value", "children", "props")
+
   def __init__(self, tag: str = None, value: str = None, children: list = None, props: dict = None):
     self.tag = tag
     self.value = value
     self.children = children
     self.props = props
     
-  def to_html(self) -> str:
+  def to_html(self, urls=None) -> str:
+    chunks = []
+    self._render(chunks.append, urls)
+    return "".join(chunks)
+
+  def write_html(self, out, urls=None):
+    """
+    Stream the HTML for this node and its descendants into a file-like object.
+
+    urls is an optional UrlResolver applied to every href and src attribute.
+    """
+    self._render(out.write, urls)
+
+  def _render(self, write, urls=None):
+    # Walk the tree with an explicit stack so deep documents can't hit the recursion limit
+    stack = [self]
+    while stack:
+      item = stack.pop()
+      if isinstance(item, str):
+        write(item)
+        continue
+      opening, children, closing = item._html_parts(urls)
+      write(opening)
+      if children:
+        stack.append(closing)
+        stack.extend(reversed(children))
+      elif closing:
+        write(closing)
+
+  def _html_parts(self, urls=None) -> tuple:
+    """Return (opening html, children to render, closing html) for this node"""
+    # Subclasses that only override to_html are rendered as a single chunk
+    if type(self).to_html is not HTMLNode.to_html:
+      return self.to_html(), None, ""
     raise NotImplementedError("to_html is not implemented")
 
+  def props_to_html(self, urls=None) -> str:
+    if not self.props:
+      return ""
+    props = self.props if urls is None else urls.resolve_props(self.props, self.tag)
+    return "".join(f' {key}="{value}"' for key, value in props.items())
+
   def __repr__(self):
     return f"HTMLNode({self.tag}, {self.value}, {self.children}, {self.props})"
 
@@ -0,0 +1,175 @@
+import json
+import os
+import struct
+
+from changes import write_atomic
+from manifest import hash_bytes, hash_file
+
+IMAGE_EXTENSIONS = (".png", ".jpg", ".jpeg", ".gif", ".webp")
+
+# JPEG start-of-frame markers, which carry the image dimensions (DHT, JPG and DAC excluded)
+_JPEG_SOF_MARKERS = frozenset(range(0xC0, 0xD0)) - {0xC4, 0xC8, 0xCC}
+
+# How much of a file is read first; only JPEGs with large metadata need more
+_HEADER_SIZE = 1 << 16
+
+def image_size(data: bytes) -> tuple[int, int]:
+    """
+    Read (width, height) from the header of a PNG, GIF, WebP or JPEG image.
+
+    Returns:
+        The dimensions, or None for an unknown format or a truncated header
+    """
+    if data.startswith(b"\x89PNG\r\n\x1a\n") and data[12:16] == b"IHDR" and len(data) >= 24:
+        return struct.unpack(">II", data[16:24])
+    if data[:6] in (b"GIF87a", b"GIF89a") and len(data) >= 10:
+        return struct.unpack("<HH", data[6:10])
+    if data[:4] == b"RIFF" and data[8:12] == b"WEBP":
+        return _webp_size(data)
+    if data[:2] == b"\xff\xd8":
+        return _jpeg_size(data)
+    return None
+
+def _webp_size(data: bytes) -> tuple[int, int]:
+    chunk = data[12:16]
+    if chunk == b"VP8 " and len(data) >= 30:
+        width, height = struct.unpack("<HH", data[26:30])
+        return width & 0x3FFF, height & 0x3FFF
+    if chunk == b"VP8L" and len(data) >= 25 and data[20] == 0x2F:
+        bits = int.from_bytes(data[21:25], "little")
+        return (bits & 0x3FFF) + 1, ((bits >> 14) & 0x3FFF) + 1
+    if chunk == b"VP8X" and len(data) >= 30:
+        return int.from_bytes(data[24:27], "little") + 1, int.from_bytes(data[27:30], "little") + 1
+    return None
+
+def _jpeg_size(data: bytes) -> tuple[int, int]:
+    # Walk the marker segments up to the first start-of-frame
+    position = 2
+    while position + 4 <= len(data):
+        if data[position] != 0xFF:
+            return None
+        marker = data[position + 1]
+        if marker == 0xFF:
+            # Fill byte
+            position += 1
+            continue
+        if marker == 0x01 or 0xD0 <= marker <= 0xD9:
+            # Markers without a payload
+            position += 2
+            continue
+        length = struct.unpack(">H", data[position + 2:position + 4])[0]
+        if marker in _JPEG_SOF_MARKERS:
+            if position + 9 > len(data):
+                return None
+            height, width = struct.unpack(">HH", data[position + 5:position + 9])
+            return width, height
+        position += 2 + length
+    return None
+
+def read_image_size(path: str) -> tuple[int, int]:
+    """Dimensions of an image file, reading past the first 64 KiB only for JPEGs that need it"""
+    with open(path, 'rb') as f:
+        data = f.read(_HEADER_SIZE)
+        size = image_size(data)
+        if size is None and data[:2] == b"\xff\xd8" and len(data) == _HEADER_SIZE:
+            size = image_size(data + f.read())
+    return size
+
+class ImageSizeCache:
+    """
+    Image dimensions persisted across builds, keyed by file content hash.
+
+    A file whose size and mtime are unchanged is not even re-hashed.
+    """
+    def __init__(self, path: str):
+        self.path = path
+        self.sizes = {}
+        self.files = {}
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            self.sizes = data.get("sizes", {})
+            self.files = data.get("files", {})
+        except (OSError, ValueError, AttributeError):
+            pass
+
+    def size_of(self, path: str) -> tuple[int, int]:
+        stat = os.stat(path)
+        known = self.files.get(path)
+        if known is not None and known[:2] == [stat.st_size, stat.st_mtime_ns]:
+            digest = known[2]
+        else:
+            digest = hash_file(path)
+            self.files[path] = [stat.st_size, stat.st_mtime_ns, digest]
+        if digest not in self.sizes:
+            self.sizes[digest] = read_image_size(path)
+        size = self.sizes[digest]
+        return tuple(size) if size is not None else None
+
+    def save(self):
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        # Drop entries for files that no longer exist
+        live = {entry[2] for entry in self.files.values()}
+        data = {"files": self.files, "sizes": {digest: size for digest, size in self.sizes.items() if digest in live}}
+        write_atomic(self.path, lambda f: json.dump(data, f, indent=1, sort_keys=True))
+
+def scan_image_sizes(static_dir: str, cache: ImageSizeCache = None) -> dict[str, tuple[int, int]]:
+    """
+    Map every image below static_dir to its (width, height).
+
+    Keys are "/"-separated paths relative to static_dir, as they appear in
+    root-relative URLs without the leading slash.
+    """
+    sizes = {}
+    if cache is not None:
+        cache.files = {path: entry for path, entry in cache.files.items() if os.path.exists(path)}
+    for dirpath, _, filenames in os.walk(static_dir):
+        for name in filenames:
+            if not name.lower().endswith(IMAGE_EXTENSIONS):
+                continue
+            path = os.path.join(dirpath, name)
+            size = cache.size_of(path) if cache is not None else read_image_size(path)
+            if size is not None:
+                sizes[os.path.relpath(path, static_dir).replace(os.sep, "/")] = size
+    return sizes
+
+def image_sizes_digest(sizes: dict) -> str:
+    """One digest for all known dimensions, for the build fingerprint"""
+    return hash_bytes(json.dumps(sizes, sort_keys=True).encode('utf-8'))
+
+class ImageAttributes:
+    """
+    Resolves the URLs of one page like its UrlResolver, and gives every <img>
+    node width/height (when known) and loading/decoding hints as it renders.
+
+    sizes maps image URLs, as the resolver resolves src attributes, to
+    dimensions (UrlResolver.by_url re-keys the result of scan_image_sizes
+    that way). The first `eager` images are left to load eagerly, as they
+    are likely above the fold; the rest get loading="lazy". Attributes
+    already present are kept.
+    """
+    def __init__(self, resolver, sizes: dict, eager: int = 1):
+        self.resolver = resolver
+        self.sizes = sizes
+        self.eager = eager
+
+    def resolve(self, url: str) -> str:
+        return self.resolver.resolve(url)
+
+    def resolve_props(self, props: dict, tag: str = None) -> dict:
+        props = self.resolver.resolve_props(props, tag)
+        if tag != "img":
+            return props
+        props = dict(props)
+        size = self.sizes.get(props.get("src"))
+        if size is not None and "width" not in props and "height" not in props:
+            props["width"], props["height"] = size
+        if "loading" not in props:
+            if self.eager > 0:
+                self.eager -= 1
+            else:
+                props["loading"] = "lazy"
+        props.setdefault("decoding", "async")
+        return props
@@ -0,0 +1,186 @@
+import re
+
+from leafnode import LeafNode
+from parentnode import ParentNode
+from textnode import TextNode, TextType
+
+# One alternation for every inline construct, so the text is scanned left to right exactly once.
+# Images and links use the same patterns as extract_markdown_images / extract_markdown_links.
+_INLINE_RE = re.compile(
+    r"!\[(?P<alt>[^\[\]]*)\]\((?P<src>[^\(\)]*)\)"
+    r"|(?<!!)\[(?P<label>[^\[\]]*)\]\((?P<href>[^\(\)]*)\)"
+    r"|`(?P<code>[^`]*)`"
+    r"|(?P<delim>\*\*|_)"
+)
+
+_SPECIAL_CHARS = re.compile(r"[\[`*_]")
+
+_EMPHASIS_TYPES = {"**": TextType.BOLD, "_": TextType.ITALIC}
+
+class TextNodeBuilder:
+    """Builds the TextNode stream returned by text_to_textnodes"""
+    def text(self, text: str) -> TextNode:
+        return TextNode(text, TextType.TEXT)
+
+    def text_of(self, node: TextNode) -> str:
+        """The literal text of a plain text node, or None for any other node"""
+        return node.text if node.type == TextType.TEXT else None
+
+    def image(self, alt: str, src: str) -> TextNode:
+        return TextNode(alt, TextType.IMAGE, src)
+
+    def link(self, label: str, href: str) -> TextNode:
+        return TextNode(label, TextType.LINK, href)
+
+    def code(self, code: str) -> TextNode:
+        return TextNode(code, TextType.CODE)
+
+    def emphasis(self, text_type: TextType, text: str, children: list) -> TextNode:
+        """A bold or italic span; children is None when its content is plain text"""
+        return TextNode(text, text_type, children=children)
+
+class HTMLNodeBuilder:
+    """Builds HTML nodes directly, skipping the intermediate TextNode layer"""
+    _TAGS = {TextType.BOLD: "b", TextType.ITALIC: "i"}
+
+    def text(self, text: str) -> LeafNode:
+        return LeafNode(None, text)
+
+    def text_of(self, node) -> str:
+        return node.value if node.tag is None else None
+
+    def image(self, alt: str, src: str) -> LeafNode:
+        return LeafNode("img", "", {"src": src, "alt": alt})
+
+    def link(self, label: str, href: str) -> LeafNode:
+        return LeafNode("a", label, {"href": href})
+
+    def code(self, code: str) -> LeafNode:
+        return LeafNode("code", code)
+
+    def emphasis(self, text_type: TextType, text: str, children: list):
+        if children is None:
+            return LeafNode(self._TAGS[text_type], text)
+        return ParentNode(self._TAGS[text_type], children)
+
+class _Frame:
+    """An open emphasis span (or the top level) collecting its child nodes"""
+    __slots__ = ("builder", "delimiter", "start", "nodes", "buffer")
+
+    def __init__(self, builder, delimiter: str = None, start: int = 0):
+        self.builder = builder
+        self.delimiter = delimiter
+        self.start = start
+        self.nodes = []
+        self.buffer = []
+
+    def add_text(self, text: str):
+        self.buffer.append(text)
+
+    def add_node(self, node):
+        self.flush()
+        self.nodes.append(node)
+
+    def flush(self):
+        # Adjacent literal text is merged into one text node, and empty text is dropped
+        if self.buffer:
+            text = "".join(self.buffer)
+            self.buffer = []
+            if text:
+                self.nodes.append(self.builder.text(text))
+
+    def dissolve_into(self, parent: "_Frame"):
+        """Give up on this span: its delimiter and contents become part of parent"""
+        parent.add_text(self.delimiter)
+        for node in self.nodes:
+            text = self.builder.text_of(node)
+            if text is not None:
+                parent.add_text(text)
+            else:
+                parent.add_node(node)
+        parent.buffer.extend(self.buffer)
+
+_TEXT_NODE_BUILDER = TextNodeBuilder()
+_HTML_NODE_BUILDER = HTMLNodeBuilder()
+
+def parse_inline(text: str, builder=_TEXT_NODE_BUILDER) -> list:
+    """
+    Convert inline markdown to a list of TextNodes in a single left-to-right scan.
+
+    Produces the same nodes as the split_nodes_* pipeline for flat markup.
+    Emphasis may nest (e.g. bold containing italic or a link); the outer node
+    then carries its parsed contents in `children`. Code spans are literal,
+    and an unmatched delimiter or an empty code span is kept as plain text.
+
+    Args:
+        text: The inline markdown
+        builder: Node factory; pass an HTMLNodeBuilder to get HTML nodes instead
+    """
+    if not _SPECIAL_CHARS.search(text):
+        return [builder.text(text)] if text else []
+
+    stack = [_Frame(builder)]
+    frame = stack[0]
+    position = 0
+    for match in _INLINE_RE.finditer(text):
+        start = match.start()
+        if start > position:
+            frame.buffer.append(text[position:start])
+        position = match.end()
+
+        kind = match.lastgroup
+        if kind == "src":
+            frame.add_node(builder.image(match.group("alt"), match.group("src")))
+            continue
+        if kind == "href":
+            frame.add_node(builder.link(match.group("label"), match.group("href")))
+            continue
+        if kind == "code":
+            code = match.group("code")
+            if code:
+                frame.add_node(builder.code(code))
+            else:
+                # An empty code span is no span: its backticks stay literal text
+                frame.add_text(match.group())
+            continue
+
+        # Close the innermost open span with this delimiter, dissolving anything left open inside it
+        delimiter = match.group("delim")
+        depth = len(stack) - 1
+        while depth > 0 and stack[depth].delimiter != delimiter:
+            depth -= 1
+        if depth == 0:
+            frame = _Frame(builder, delimiter, position)
+            stack.append(frame)
+            continue
+        while len(stack) - 1 > depth:
+            stack.pop().dissolve_into(stack[-1])
+        closed = stack.pop()
+        closed.flush()
+        frame = stack[-1]
+        node = _emphasis_node(closed, text[closed.start:start])
+        if node is not None:
+            frame.add_node(node)
+        else:
+            frame.flush()
+
+    frame.buffer.append(text[position:])
+    while len(stack) > 1:
+        stack.pop().dissolve_into(stack[-1])
+    stack[0].flush()
+    return stack[0].nodes
+
+def parse_inline_html(text: str) -> list:
+    """Convert inline markdown straight to HTML nodes, without building TextNodes"""
+    return parse_inline(text, _HTML_NODE_BUILDER)
+
+def _emphasis_node(frame: _Frame, raw: str):
+    """Build the node for a closed emphasis span, or None if it is empty"""
+    text_type = _EMPHASIS_TYPES[frame.delimiter]
+    if not frame.nodes:
+        return None
+    if len(frame.nodes) == 1:
+        text = frame.builder.text_of(frame.nodes[0])
+        if text is not None:
+            return frame.builder.emphasis(text_type, text, None)
+    return frame.builder.emphasis(text_type, raw, frame.nodes)
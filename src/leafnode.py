@@ -1,28 +1,34 @@
 from htmlnode import HTMLNode
 
+# Leaves never have children, so they all share one immutable empty sequence
+_NO_CHILDREN = ()
+
 class LeafNode(HTMLNode):
+  __slots__ = ()
+
   def __init__(self, tag: str, value: str, props: dict = None):
-    super().__init__(tag, value, [], props)
+    self.tag = tag
+    self.value = value
+    self.children = _NO_CHILDREN
+    self.props = props
 
-  def to_html(self) -> str:
+  def _html_parts(self, urls=None) -> tuple:
     if self.value is None:
       raise ValueError("value is required")
     
     if self.tag is None:
-      return self.value
+      return self.value, None, ""
     
     if self.props is None:
-      return f"<{self.tag}>{self.value}</{self.tag}>"
+      return f"<{self.tag}>{self.value}</{self.tag}>", None, ""
     
-    props_str = ""
-    for key, value in self.props.items():
-      props_str += f' {key}="{value}"'
+    props_str = self.props_to_html(urls)
     
     # Handle self-closing tags like img
     if self.tag == "img":
-      return f"<{self.tag}{props_str}>"
+      return f"<{self.tag}{props_str}>", None, ""
     
-    return f"<{self.tag}{props_str}>{self.value}</{self.tag}>"
+    return f"<{self.tag}{props_str}>{self.value}</{self.tag}>", None, ""
   
   def __repr__(self):
     return f"LeafNode({self.tag}, {self.value}, {self.props})"
@@ -0,0 +1,175 @@
+import json
+import os
+import posixpath
+import re
+from collections import Counter
+
+from changes import write_atomic
+from manifest import hash_file
+from urls import page_url
+
+LINK = "link"
+IMAGE = "image"
+
+# Prefetch hints emitted per page by default
+PREFETCH_LIMIT = 3
+
+# URLs with a scheme, protocol-relative URLs and bare fragments point outside the site's files
+_EXTERNAL_URL_RE = re.compile(r"(?:[A-Za-z][A-Za-z0-9+.-]*:|//|#)")
+
+def collect_links(node) -> list[tuple[str, str]]:
+    """Return (LINK or IMAGE, url) for every link and image in a node tree, in document order"""
+    # Import here to avoid circular imports
+    from markdown_html import RenderedBlockNode
+
+    links = []
+    stack = [node]
+    while stack:
+        item = stack.pop()
+        if isinstance(item, RenderedBlockNode):
+            item = item.node
+        props = item.props
+        if props:
+            if item.tag == "a" and "href" in props:
+                links.append((LINK, props["href"]))
+            elif item.tag == "img" and "src" in props:
+                links.append((IMAGE, props["src"]))
+        if item.children:
+            stack.extend(reversed(item.children))
+    return links
+
+def target_key(url: str, page_dir: str = "") -> str:
+    """
+    Normalize an internal URL to the site path it points at, or None for an external one.
+
+    Keys are "/"-separated and relative to the site root, without any query,
+    fragment, trailing slash, index.html or .html extension, so every way of
+    linking to a page maps to the same key.
+
+    Args:
+        url: The href or src as written in the markdown
+        page_dir: Directory of the linking page's URL, for relative links
+    """
+    if not url or _EXTERNAL_URL_RE.match(url):
+        return None
+    path = page_url(re.split(r"[?#]", url, 1)[0])
+    if path.startswith("/"):
+        path = path[1:]
+    else:
+        path = posixpath.join(page_dir, path)
+    path = posixpath.normpath(path)
+    if path == "index.html" or path.endswith("/index.html"):
+        path = posixpath.dirname(path)
+    elif path.endswith(".html"):
+        path = path[:-len(".html")]
+    return "" if path == "." else path
+
+class LinkIndex:
+    """
+    The links and images of every page of the site, as a graph.
+
+    Every page's links are kept by source hash in a JSON file, so only pages
+    whose source changed are parsed again. Targets (pages and static files)
+    live in a dict by target_key, so checking a link is one lookup.
+    """
+    def __init__(self, path: str):
+        self.path = path
+        self.pages = {}
+        # target key -> root-relative URL of every page and static file
+        self.targets = {}
+        self.page_keys = set()
+        # target key -> number of pages linking to it
+        self.inbound = Counter()
+        self.parsed = 0
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                self.pages = json.load(f).get("pages", {})
+        except (OSError, ValueError, AttributeError):
+            pass
+
+    def update(self, pages: list[tuple[str, str]], dest_dir: str, static_dir: str = None, parse=None, source_hashes: dict = None):
+        """
+        Bring the index up to date with the site's pages and static files.
+
+        Args:
+            pages: (markdown path, html path) pairs of every page
+            dest_dir: Output directory the html paths are below
+            static_dir: Optional static directory whose files are link targets
+            parse: Function turning markdown text into a node tree
+            source_hashes: Optional map of markdown path to the hash_file digest of its
+                source, so that the build hashes every source once and unchanged pages
+                are not read at all
+        """
+        live = {}
+        self.targets = {}
+        self.page_keys = set()
+        for from_path, dest_path in pages:
+            source_hash = source_hashes[from_path] if source_hashes is not None else hash_file(from_path)
+            entry = self.pages.get(from_path)
+            if entry is None or entry["hash"] != source_hash:
+                with open(from_path, 'r', encoding='utf-8') as f:
+                    links = collect_links(parse(f.read()))
+                entry = {"hash": source_hash, "links": [list(link) for link in links]}
+                self.parsed += 1
+            rel_path = os.path.relpath(dest_path, dest_dir).replace(os.sep, "/")
+            key = target_key("/" + rel_path)
+            entry["dir"] = posixpath.dirname(rel_path)
+            entry["key"] = key
+            live[from_path] = entry
+            if posixpath.basename(rel_path) == "index.html":
+                self.targets[key] = f"/{key}/" if key else "/"
+            else:
+                self.targets[key] = f"/{rel_path}"
+            self.page_keys.add(key)
+        self.pages = live
+
+        if static_dir is not None and os.path.isdir(static_dir):
+            for dirpath, _, filenames in os.walk(static_dir):
+                for name in filenames:
+                    rel_path = os.path.relpath(os.path.join(dirpath, name), static_dir).replace(os.sep, "/")
+                    self.targets.setdefault(target_key("/" + rel_path), "/" + rel_path)
+
+        self.inbound = Counter()
+        for entry in self.pages.values():
+            linked = {target_key(url, entry["dir"]) for kind, url in entry["links"] if kind == LINK}
+            self.inbound.update(key for key in linked if key in self.targets)
+
+    def broken(self) -> list[tuple[str, str, str]]:
+        """Return (markdown path, LINK or IMAGE, url) for every internal reference with no target"""
+        broken = []
+        for from_path, entry in sorted(self.pages.items()):
+            for kind, url in entry["links"]:
+                key = target_key(url, entry["dir"])
+                if key is not None and key not in self.targets:
+                    broken.append((from_path, kind, url))
+        return broken
+
+    def prefetch_hints(self, limit: int = PREFETCH_LIMIT) -> dict[str, list[str]]:
+        """
+        Pick, for every page, the pages it links to that the rest of the site links to most.
+
+        Each URL is written the way the page's first link to it is, without
+        its fragment, so it resolves to the very URL the link is followed to
+        and the browser reuses the prefetched response.
+
+        Returns:
+            Markdown path -> URLs of up to limit pages, most linked first
+        """
+        hints = {}
+        for from_path, entry in self.pages.items():
+            candidates = {}
+            for kind, url in entry["links"]:
+                key = target_key(url, entry["dir"])
+                if kind == LINK and key in self.page_keys and key != entry["key"] and key not in candidates:
+                    candidates[key] = url.split("#", 1)[0]
+            # Stable sort: equally linked targets keep their order on the page
+            ranked = sorted(candidates, key=lambda key: -self.inbound[key])
+            hints[from_path] = [candidates[key] for key in ranked[:limit]]
+        return hints
+
+    def save(self):
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        data = {"pages": self.pages, "broken": self.broken()}
+        write_atomic(self.path, lambda f: json.dump(data, f, indent=1, sort_keys=True))
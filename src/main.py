@@ -1,76 +1,62 @@
+from htmlnode import HTMLNode
 from leafnode import LeafNode
+from parentnode import ParentNode
 from textnode import TextNode, TextType
+from assets import asset_map_digest, asset_renamer, build_asset_map, remove_asset_metadata, write_asset_manifest, write_headers
 from blocknode import BlockType
-from split_nodes import split_nodes_image, split_nodes_link, split_nodes_delimiter
-from title_extractor import extract_title
+from changes import UNCHANGED, ChangeReport, replace_if_changed, write_atomic, write_if_changed
+from compress import MIN_COMPRESS_SIZE, available_encodings, precompress_directory
+from css import INLINE_CSS_MAX_BYTES, CssCache, css_transform, inline_stylesheets
+from feeds import FEED_ENTRIES, FEED_NAME, FeedState, channel_link, feed_digest, feed_entries, sitemap_entries, write_feed, write_sitemaps
+from images import ImageAttributes, ImageSizeCache, image_sizes_digest, scan_image_sizes
+from inline_parser import parse_inline
+from links import LINK, LinkIndex
+from manifest import BuildManifest, build_fingerprint, hash_bytes, hash_file
+from metadata import PageIndex, PageMetadata
+from minify import HtmlMinifier
+from parallel import PageBuildError, generate_pages_parallel
+from parse_cache import ParseCache
+from pipeline import IO_THREADS, PIPELINE_DEPTH, generate_pages_pipelined
+from profiling import NO_TIMER, BuildProfile, format_report
+from static_sync import sync_static_to_public
+from template import load_template
+from urls import get_resolver
+import argparse
+import io
 import re
 import os
 import shutil
 import sys
 
-def copy_static_to_public(src_path="static", dest_path="docs"):
-    """
-    Recursively copies all contents from source directory to destination directory.
-    First deletes all contents of the destination directory to ensure a clean copy.
-    """
-    print(f"Starting copy from '{src_path}' to '{dest_path}'")
-    
-    # Delete destination directory if it exists
-    if os.path.exists(dest_path):
-        print(f"Removing existing '{dest_path}' directory")
-        shutil.rmtree(dest_path)
-    
-    # Create destination directory
-    print(f"Creating '{dest_path}' directory")
-    os.mkdir(dest_path)
-    
-    # Check if source directory exists
-    if not os.path.exists(src_path):
-        print(f"Source directory '{src_path}' does not exist")
-        return
-    
-    # Copy contents recursively
-    _copy_directory_contents(src_path, dest_path)
-    print(f"Finished copying from '{src_path}' to '{dest_path}'")
-
-def _copy_directory_contents(src_dir, dest_dir):
-    """
-    Helper function to recursively copy directory contents.
-    """
-    # List all items in the source directory
-    for item in os.listdir(src_dir):
-        src_item_path = os.path.join(src_dir, item)
-        dest_item_path = os.path.join(dest_dir, item)
-        
-        if os.path.isfile(src_item_path):
-            # It's a file, copy it
-            print(f"Copying file: {src_item_path} -> {dest_item_path}")
-            shutil.copy(src_item_path, dest_item_path)
-        else:
-            # It's a directory, create it and recursively copy its contents
-            print(f"Creating directory: {dest_item_path}")
-            os.mkdir(dest_item_path)
-            _copy_directory_contents(src_item_path, dest_item_path)
+CONTENT_PATH = "content"
+STATIC_PATH = "static"
+TEMPLATE_PATH = "template.html"
+OUTPUT_PATH = "docs"
+MANIFEST_PATH = os.path.join(".build", "manifest.json")
+PROFILE_PATH = os.path.join(".build", "profile.json")
+PARSE_CACHE_PATH = os.path.join(".build", "parse-cache")
+CHANGES_PATH = os.path.join(".build", "changes.json")
+IMAGE_SIZES_PATH = os.path.join(".build", "image-sizes.json")
+CSS_CACHE_PATH = os.path.join(".build", "css-cache")
+INLINED_TEMPLATE_PATH = os.path.join(".build", "template.html")
+LINK_INDEX_PATH = os.path.join(".build", "link-index.json")
+PAGE_INDEX_PATH = os.path.join(".build", "pages.sqlite")
+FEEDS_PATH = os.path.join(".build", "feeds.json")
 
-def generate_pages_recursive(dir_path_content, template_path, dest_dir_path, basepath="/"):
+def collect_pages(dir_path_content, dest_dir_path):
     """
-    Recursively generate HTML pages from all markdown files in a directory structure.
+    Recursively collect the markdown files in a directory structure.
     
     Args:
         dir_path_content: Path to the content directory to crawl
-        template_path: Path to the HTML template file
         dest_dir_path: Path to the destination directory where HTML files should be written
-        basepath: Base path for the site (e.g., "/" or "/blog/")
-    """
-    # Import here to avoid circular imports
-    from markdown_html import markdown_to_html_node
     
+    Returns:
+        A list of (markdown path, html path) pairs in crawl order
+    """
     print(f"Crawling directory: {dir_path_content}")
     
-    # Ensure the destination directory exists
-    if not os.path.exists(dest_dir_path):
-        os.makedirs(dest_dir_path)
-    
+    pages = []
     # List all items in the content directory
     for item in os.listdir(dir_path_content):
         item_path = os.path.join(dir_path_content, item)
@@ -80,43 +66,526 @@ def generate_pages_recursive(dir_path_content, template_path, dest_dir_path, bas
             if item.endswith('.md'):
                 # Generate HTML file with same name but .html extension
                 html_filename = item.replace('.md', '.html')
-                dest_file_path = os.path.join(dest_dir_path, html_filename)
-                
-                # Generate the page
-                generate_page(item_path, template_path, dest_file_path, basepath)
+                pages.append((item_path, os.path.join(dest_dir_path, html_filename)))
         
         elif os.path.isdir(item_path):
-            # It's a directory, create corresponding directory in destination and recurse
+            # It's a directory, map it to the corresponding destination directory and recurse
             dest_subdir_path = os.path.join(dest_dir_path, item)
-            generate_pages_recursive(item_path, template_path, dest_subdir_path, basepath)
+            pages.extend(collect_pages(item_path, dest_subdir_path))
+    
+    return pages
+
+def page_dest_path(from_path, dir_path_content, dest_dir_path):
+    """Map a markdown file below dir_path_content to its HTML file below dest_dir_path, as collect_pages does"""
+    rel_dir, item = os.path.split(os.path.relpath(from_path, dir_path_content))
+    return os.path.join(dest_dir_path, rel_dir, item.replace('.md', '.html'))
 
-def main():
-  # Get basepath from command line arguments, default to "/"
-  basepath = "/"
-  if len(sys.argv) > 1:
-    basepath = sys.argv[1]
-    # Ensure basepath starts and ends with "/"
-    if not basepath.startswith("/"):
-      basepath = "/" + basepath
-    if not basepath.endswith("/"):
-      basepath = basepath + "/"
+def generate_pages_recursive(dir_path_content, template_path, dest_dir_path, basepath="/", manifest=None, jobs=1, profile=None, parse_cache=None, pipeline_depth=0, io_threads=IO_THREADS, changes=None, assets=None, image_sizes=None, minify=False, prefetch=None, source_hashes=None):
+    """
+    Recursively generate HTML pages from all markdown files in a directory structure.
+    
+    Args:
+        dir_path_content: Path to the content directory to crawl
+        template_path: Path to the HTML template file
+        dest_dir_path: Path to the destination directory where HTML files should be written
+        basepath: Base path for the site (e.g., "/" or "/blog/")
+        manifest: Optional BuildManifest; pages whose inputs are unchanged are skipped
+        jobs: Number of worker processes; 1 builds serially in this process
+        profile: Optional BuildProfile that receives per-stage timings of every generated page
+        parse_cache: Optional ParseCache; pages whose source was parsed before skip parsing
+        pipeline_depth: When above 0 in a serial build, overlap reads and writes with parsing
+            on background threads, with queues of this size between the stages
+        io_threads: Number of reader and of writer threads in the pipelined build
+        changes: Optional ChangeReport that records every page as added, changed or unchanged
+        assets: Optional map of static asset path to fingerprinted path, for rewriting references
+        image_sizes: Optional map of static image path to (width, height); when given, every
+            <img> gets its dimensions and lazy-loading hints
+        minify: Whether to minify the generated HTML
+        prefetch: Optional map of markdown path to the URLs that page gets prefetch hints for
+        source_hashes: Optional map of markdown path to the hash_file digest of its source,
+            computed earlier in the build; sources missing from it are hashed here
+    
+    Returns:
+        The number of pages that were generated
+    
+    Raises:
+        PageBuildError: If any page failed to generate, after all other pages were written
+    """
+    # Ensure the destination directory exists
+    if not os.path.exists(dest_dir_path):
+        os.makedirs(dest_dir_path)
+    
+    pages = collect_pages(dir_path_content, dest_dir_path)
+    
+    # Only regenerate pages whose source or the build inputs changed
+    stale_hashes = {}
+    if manifest is not None:
+        stale_pages = []
+        for from_path, dest_path in pages:
+            source_hash = source_hashes.get(from_path) if source_hashes is not None else None
+            if source_hash is None:
+                source_hash = hash_file(from_path)
+            if prefetch is not None:
+                # The hints are an input of the page too, so a page is rebuilt when they change
+                source_hash = hash_bytes("\0".join([source_hash, *prefetch.get(from_path, ())]).encode('utf-8'))
+            if not manifest.needs_build(from_path, source_hash, dest_path):
+                print(f"Skipping unchanged page {from_path}")
+                if changes is not None:
+                    changes.record(dest_path, UNCHANGED)
+                continue
+            stale_hashes[from_path] = source_hash
+            stale_pages.append((from_path, dest_path))
+        pages = stale_pages
+    
+    if jobs == 1:
+        if pipeline_depth > 0:
+            failures = generate_pages_pipelined(pages, template_path, basepath, pipeline_depth, io_threads, profile, parse_cache, changes, assets, image_sizes, minify, prefetch)
+        else:
+            failures = []
+            for from_path, dest_path in pages:
+                timer = profile.page(from_path) if profile is not None else NO_TIMER
+                try:
+                    hints = prefetch.get(from_path) if prefetch is not None else None
+                    status = generate_page(from_path, template_path, dest_path, basepath, timer, parse_cache, assets, image_sizes, minify, hints)
+                except Exception as e:
+                    failures.append((from_path, f"{type(e).__name__}: {e}"))
+                    continue
+                if changes is not None:
+                    changes.record(dest_path, status)
+        if profile is not None:
+            # Import here to avoid circular imports
+            from markdown_html import BLOCK_CACHE
+            profile.counters["block_cache"] = BLOCK_CACHE.stats()
+            if parse_cache is not None:
+                profile.counters["parse_cache"] = parse_cache.stats()
+    else:
+        failures = generate_pages_parallel(pages, template_path, basepath, jobs, profile, parse_cache, changes, assets, image_sizes, minify, prefetch)
+    
+    if manifest is not None:
+        failed = {from_path for from_path, _ in failures}
+        for from_path, dest_path in pages:
+            if from_path not in failed:
+                manifest.record(from_path, stale_hashes[from_path], dest_path)
+    
+    if failures:
+        raise PageBuildError(failures)
+    return len(pages)
+
+def parse_args(argv=None):
+  parser = argparse.ArgumentParser(description="Generate the static site from content/ into docs/")
+  parser.add_argument("basepath", nargs="?", default="/", help='base path for the site (e.g. "/" or "/website/")')
+  parser.add_argument("--clean", action="store_true", help="ignore the build manifest and rebuild everything from scratch")
+  parser.add_argument("--hash-assets", action="store_true", help="compare static files by content when their mtime differs")
+  parser.add_argument("--hardlink-assets", action="store_true", help="hard-link static files into docs/ instead of copying them")
+  parser.add_argument("-j", "--jobs", type=int, default=1, help="number of worker processes for page generation (0 = one per CPU core)")
+  parser.add_argument("--watch", action="store_true", help="after building, keep rebuilding affected pages and assets as sources change")
+  parser.add_argument("--watch-interval", type=float, default=0.05, help="seconds between polls in watch mode")
+  parser.add_argument("--pipeline", action="store_true", help="overlap reading and writing files with parsing on background threads (serial builds)")
+  parser.add_argument("--pipeline-depth", type=int, default=PIPELINE_DEPTH, help="pages queued between pipeline stages")
+  parser.add_argument("--io-threads", type=int, default=IO_THREADS, help="reader and writer threads in --pipeline mode")
+  parser.add_argument("--fingerprint-assets", action="store_true", help="copy static files under content-hashed names and point every reference at them")
+  parser.add_argument("--image-dimensions", action="store_true", help='give every <img> its width/height from static/ and loading="lazy" (except the first)')
+  parser.add_argument("--minify-css", action="store_true", help="write the stylesheets in static/ minified")
+  parser.add_argument("--inline-css", action="store_true", help="inline small stylesheets linked by the template, or --critical-css in front of a non-blocking link")
+  parser.add_argument("--inline-css-max-bytes", type=int, default=INLINE_CSS_MAX_BYTES, help="largest minified stylesheet --inline-css inlines whole")
+  parser.add_argument("--critical-css", metavar="PATH", help="CSS that --inline-css inlines in place of larger stylesheets, which then load without blocking")
+  parser.add_argument("--minify", action="store_true", help="collapse whitespace, drop comments and optional attribute quotes in the generated HTML")
+  parser.add_argument("--check-links", action="store_true", help="report links to pages and files that do not exist, and images missing from static/")
+  parser.add_argument("--prefetch", type=int, default=0, metavar="N", help="give every page prefetch hints for up to N of its linked pages, the most linked site-wide first")
+  parser.add_argument("--page-index", action="store_true", help="keep the title, date, tags and word count of every page in an SQLite index in .build/")
+  parser.add_argument("--sitemap", action="store_true", help="write sitemap.xml (split past 50,000 URLs) from the page index; needs --site-url")
+  parser.add_argument("--feed", action="store_true", help=f"write an RSS feed of the newest blog pages to {FEED_NAME} from the page index; needs --site-url")
+  parser.add_argument("--feed-entries", type=int, default=FEED_ENTRIES, help="pages listed in the --feed")
+  parser.add_argument("--site-url", metavar="URL", help='origin the site is served from (e.g. "https://example.com"), for --sitemap and --feed')
+  parser.add_argument("--precompress", action="store_true", help="write .gz (and .zst, if supported) siblings of HTML, CSS and other text files")
+  parser.add_argument("--compress-min-bytes", type=int, default=MIN_COMPRESS_SIZE, help="smallest file --precompress compresses")
+  parser.add_argument("--parse-cache-mb", type=int, default=64, help="size cap of the on-disk parse cache in .build/ (0 disables it)")
+  parser.add_argument("--profile", action="store_true", help="time every stage of every generated page, bypassing the parse cache (combine with --clean to profile all pages)")
+  parser.add_argument("--profile-output", default=PROFILE_PATH, help="where --profile writes its JSON report")
+  parser.add_argument("--profile-top", type=int, default=10, help="number of slowest pages listed in the profile report")
+  parser.add_argument("--cprofile", metavar="PATH", help="also dump cProfile stats of the build to PATH (implies -j 1)")
+  args = parser.parse_args(argv)
+  if args.fingerprint_assets and args.watch:
+    parser.error("--fingerprint-assets is for one-off builds and cannot be combined with --watch")
+  if (args.minify_css or args.inline_css) and args.watch:
+    parser.error("--minify-css and --inline-css are for one-off builds and cannot be combined with --watch")
+  if args.prefetch > 0 and args.watch:
+    parser.error("--prefetch hints come from the links of the whole site and cannot be combined with --watch")
+  if (args.page_index or args.sitemap or args.feed) and args.watch:
+    parser.error("--page-index, --sitemap and --feed list the whole site and cannot be combined with --watch")
+  if (args.sitemap or args.feed) and not args.site_url:
+    parser.error("--sitemap and --feed need --site-url for their absolute URLs")
+  
+  # Ensure basepath starts and ends with "/"
+  if not args.basepath.startswith("/"):
+    args.basepath = "/" + args.basepath
+  if not args.basepath.endswith("/"):
+    args.basepath = args.basepath + "/"
+  return args
+
+def build_site(args, profile=None) -> BuildManifest:
+  """
+  Run one incremental build of the whole site.
+  
+  Args:
+    args: Parsed command line arguments
+    profile: Optional BuildProfile that receives phase and per-page stage timings
   
-  print(f"Using basepath: {basepath}")
+  Every output file is listed as added, changed, unchanged or removed in
+  .build/changes.json, and only added or changed files are rewritten.
   
-  # Delete anything in the docs directory and copy static files
-  copy_static_to_public()
+  Returns:
+    The saved BuildManifest
+  
+  Raises:
+    PageBuildError: If any page failed; the manifest and change report are still saved
+  """
+  # The manifest lets unchanged pages be skipped; --clean throws it away
+  if args.clean and os.path.exists(MANIFEST_PATH):
+    os.remove(MANIFEST_PATH)
+  
+  assets = None
+  if args.fingerprint_assets:
+    assets = build_asset_map(STATIC_PATH)
+  
+  image_sizes = None
+  if args.image_dimensions:
+    image_cache = ImageSizeCache(IMAGE_SIZES_PATH)
+    image_sizes = scan_image_sizes(STATIC_PATH, image_cache)
+    image_cache.save()
+  
+  # Stylesheets are minified once per version of their source; inlining them gives pages their own template
+  css_cache = None
+  template_path = TEMPLATE_PATH
+  if args.minify_css or args.inline_css:
+    css_cache = CssCache(CSS_CACHE_PATH)
+  if args.inline_css:
+    template_path = write_inlined_template(args, assets, css_cache)
+  fingerprint = build_fingerprint(template_path, args.basepath, *page_fingerprint_extra(assets, image_sizes, args.minify))
+  manifest = BuildManifest(MANIFEST_PATH, fingerprint)
+  
+  # Parsed documents survive --clean, so a restored cache lets a cold build skip parsing;
+  # a profiled build goes without it, so the profile shows what every page costs to parse
+  parse_cache = None
+  if args.parse_cache_mb > 0 and profile is None:
+    parse_cache = ParseCache(PARSE_CACHE_PATH, args.parse_cache_mb * 1024 * 1024)
+  
+  # Sync static files, deleting anything in the docs directory first on a clean build
+  if args.clean and os.path.exists(OUTPUT_PATH):
+    print(f"Removing existing '{OUTPUT_PATH}' directory")
+    shutil.rmtree(OUTPUT_PATH)
+  changes = ChangeReport()
+  phase = profile.phase if profile is not None else NO_TIMER.stage
+  with phase("static"):
+    sync_static_to_public(
+      STATIC_PATH, OUTPUT_PATH, manifest, args.hash_assets, args.hardlink_assets, changes,
+      asset_renamer(assets) if assets is not None else None,
+      css_transform(STATIC_PATH, css_cache) if args.minify_css else None,
+    )
+    if assets is not None:
+      write_asset_manifest(OUTPUT_PATH, assets, changes)
+      write_headers(OUTPUT_PATH, assets, args.basepath, changes)
+    else:
+      remove_asset_metadata(OUTPUT_PATH, manifest.assets, changes)
+  
+  # The links and index phases below and the manifest share one hash of every source;
+  # the phases then read only the sources that changed since their index was saved
+  site_sources = source_hashes = None
+  if args.check_links or args.prefetch > 0 or args.page_index or args.sitemap or args.feed:
+    with phase("sources"):
+      site_sources = collect_pages(CONTENT_PATH, OUTPUT_PATH)
+      source_hashes = {from_path: hash_file(from_path) for from_path, _ in site_sources}
+  
+  # Index every page's links before generating any page, so pages can be given prefetch hints
+  prefetch = None
+  if args.check_links or args.prefetch > 0:
+    with phase("links"):
+      link_index = index_links(args.basepath, template_path, assets, parse_cache, site_sources, source_hashes)
+    if args.check_links:
+      broken = link_index.broken()
+      for from_path, kind, url in broken:
+        print(f"{'Broken link' if kind == LINK else 'Missing image'} in {from_path}: {url}")
+      print(f"Checked links of {len(link_index.pages)} pages ({link_index.parsed} parsed): {len(broken)} broken")
+    if args.prefetch > 0:
+      prefetch = link_index.prefetch_hints(args.prefetch)
+  
+  # Only pages whose source changed are parsed again, into the parse cache the page generation reads
+  site_pages = []
+  if args.page_index or args.sitemap or args.feed:
+    with phase("index"):
+      site_pages = index_pages(args.basepath, template_path, assets, parse_cache, site_sources, source_hashes)
+  
+  # The links and index phases above parse pages too, and are timed as a whole;
+  # empty the block cache they filled, so each page's own parse shows in its stages
+  if profile is not None:
+    # Import here to avoid circular imports
+    from markdown_html import BLOCK_CACHE
+    BLOCK_CACHE.clear()
   
   # Generate pages recursively from all markdown files in content directory
-  generate_pages_recursive("content", "template.html", "docs", basepath)
+  try:
+    with phase("pages"):
+      generate_pages_recursive(
+        CONTENT_PATH, template_path, OUTPUT_PATH, args.basepath, manifest, args.jobs, profile, parse_cache,
+        args.pipeline_depth if args.pipeline else 0, args.io_threads, changes, assets, image_sizes, args.minify, prefetch,
+        source_hashes,
+      )
+  except PageBuildError:
+    manifest.save()
+    changes.save(CHANGES_PATH)
+    raise
+  finally:
+    if parse_cache is not None:
+      parse_cache.prune()
+    if css_cache is not None:
+      css_cache.prune()
+  
+  # Delete pages whose markdown sources no longer exist
+  for output in manifest.remove_stale(OUTPUT_PATH, changes):
+    print(f"Removed stale page {output}")
+  
+  with phase("feeds"):
+    write_feeds(args, site_pages, manifest.assets, changes)
+  
+  # Compress only what changed since the last build, so the web server can serve the siblings directly
+  if args.precompress:
+    encodings = available_encodings()
+    with phase("compress"):
+      counts = precompress_directory(OUTPUT_PATH, args.compress_min_bytes, changes=changes, encodings=encodings)
+    print(
+      f"Precompressed ({', '.join(encodings)}): {counts['compressed']} written, "
+      f"{counts['unchanged']} unchanged, {counts['removed']} removed"
+    )
+  manifest.save()
+  changes.save(CHANGES_PATH)
+  print(changes)
+  return manifest
+
+def page_fingerprint_extra(assets=None, image_sizes=None, minify=False) -> list[str]:
+  """
+  The build options that change the output of every page, as extra inputs for build_fingerprint.
   
-  print("Site generation complete!")
+  Args:
+    assets: Optional map of static asset path to fingerprinted path
+    image_sizes: Optional map of static image path to (width, height)
+    minify: Whether pages are minified
+  """
+  extra = []
+  # Fingerprinted names change every page that references an asset, so the asset map is part of the fingerprint
+  if assets is not None:
+    extra += ["assets", asset_map_digest(assets)]
+  # Likewise the dimensions written into every page that shows an image
+  if image_sizes is not None:
+    extra += ["images", image_sizes_digest(image_sizes)]
+  if minify:
+    extra.append("minify")
+  return extra
 
-def text_node_to_html_node(text_node: TextNode) -> LeafNode:
+def index_links(basepath: str, template_path: str, assets=None, parse_cache=None, pages=None, source_hashes=None) -> LinkIndex:
+  """
+  Bring the saved link index up to date with every page in the content directory.
+  
+  Only pages whose source changed since the index was saved are parsed, with
+  the caches the page generation uses, so generating them afterwards is cheap.
+  
+  Args:
+    basepath: Base path for the site
+    template_path: Path to the HTML template file
+    assets: Optional map of static asset path to fingerprinted path
+    parse_cache: Optional ParseCache of previously parsed documents
+    pages: Optional (markdown path, html path) pairs of every page, from collect_pages
+    source_hashes: Optional map of markdown path to the hash_file digest of its source
+  
+  Returns:
+    The saved LinkIndex
+  """
+  urls = get_resolver(basepath, load_template(template_path, basepath, assets).assets)
+  link_index = LinkIndex(LINK_INDEX_PATH)
+  if pages is None:
+    pages = collect_pages(CONTENT_PATH, OUTPUT_PATH)
+  link_index.update(
+    pages, OUTPUT_PATH, STATIC_PATH,
+    lambda markdown_content: parse_page(markdown_content, parse_cache, urls=urls)[0],
+    source_hashes,
+  )
+  link_index.save()
+  return link_index
+
+def index_pages(basepath: str, template_path: str, assets=None, parse_cache=None, pages=None, source_hashes=None) -> list[PageMetadata]:
+  """
+  Bring the saved page index up to date with every page in the content directory.
+  
+  Like index_links, only pages whose source changed are parsed, by the same
+  parse_page the page generation uses, so with a parse cache every changed
+  page is still parsed just once per build.
+  
+  Args:
+    basepath: Base path for the site
+    template_path: Path to the HTML template file
+    assets: Optional map of static asset path to fingerprinted path
+    parse_cache: Optional ParseCache of previously parsed documents
+    pages: Optional (markdown path, html path) pairs of every page, from collect_pages
+    source_hashes: Optional map of markdown path to the hash_file digest of its source
+  
+  Returns:
+    PageMetadata of every page, newest first (see PageIndex.pages)
+  """
+  urls = get_resolver(basepath, load_template(template_path, basepath, assets).assets)
+  if pages is None:
+    pages = collect_pages(CONTENT_PATH, OUTPUT_PATH)
+  page_index = PageIndex(PAGE_INDEX_PATH)
+  try:
+    page_index.update(
+      pages, OUTPUT_PATH,
+      lambda markdown_content: parse_page(markdown_content, parse_cache, urls=urls)[1],
+      source_hashes,
+    )
+    print(f"Indexed {len(page_index)} pages ({page_index.parsed} parsed), {len(page_index.tags())} tags")
+    return page_index.pages()
+  finally:
+    page_index.close()
+
+def write_feeds(args, pages: list, synced: dict, changes: ChangeReport):
+  """
+  Write the sitemap and feed the arguments ask for, and delete the ones they no longer ask for.
+  
+  Each is skipped entirely while the digest of what it lists (every page's
+  URL and date for the sitemap, the newest blog pages for the feed) is the
+  same as in the last build.
+  
+  Args:
+    args: Parsed command line arguments
+    pages: PageMetadata of every page, newest first (see PageIndex.pages)
+    synced: Output paths of synced static files, which are never deleted
+    changes: ChangeReport that records every file as added, changed, unchanged or removed
+  """
+  state = FeedState(FEEDS_PATH)
+  wanted = {}
+  if args.sitemap:
+    urls = sitemap_entries(pages, args.site_url, args.basepath)
+    wanted["sitemap"] = (
+      feed_digest(urls, args.site_url, args.basepath),
+      lambda: write_sitemaps(OUTPUT_PATH, urls, args.site_url, args.basepath),
+    )
+  if args.feed:
+    entries = feed_entries(pages, limit=args.feed_entries)
+    home = next((page for page in pages if page.url == "/"), None)
+    title = home.title if home is not None and home.title else "Feed"
+    link = channel_link(pages)
+    feed_path = os.path.join(OUTPUT_PATH, FEED_NAME)
+    wanted["feed"] = (
+      feed_digest(entries, args.site_url, args.basepath, title, link),
+      lambda: {feed_path: write_feed(feed_path, entries, args.site_url, args.basepath, title, link)},
+    )
+  if not wanted and not state.feeds:
+    return
+  
+  for name in ("sitemap", "feed"):
+    if name not in wanted:
+      stale = state.forget(name)
+    else:
+      digest, write = wanted[name]
+      if state.is_current(name, digest):
+        print(f"Skipping unchanged {name}")
+        for path in state.outputs(name):
+          changes.record(path, UNCHANGED)
+        continue
+      written = write()
+      for path, status in written.items():
+        changes.record(path, status)
+      print(f"Wrote {name} to {', '.join(written)}")
+      stale = state.record(name, digest, list(written))
+    for path in stale:
+      if path not in synced and os.path.exists(path):
+        changes.remove(path)
+  state.save()
+
+def write_inlined_template(args, assets=None, css_cache=None) -> str:
+  """
+  Write the template with its stylesheets inlined (see inline_stylesheets) into .build/.
+  
+  The file is only rewritten when its contents change, so the compiled
+  template stays cached across builds.
+  
+  Args:
+    args: Parsed command line arguments
+    assets: Optional map of static asset path to fingerprinted path
+    css_cache: Optional CssCache of minified stylesheets
+  
+  Returns:
+    The path of the inlined template
+  """
+  critical = None
+  if args.critical_css:
+    with open(args.critical_css, 'rb') as f:
+      source = f.read()
+    critical = (css_cache.minify(source) if css_cache is not None else source).decode('utf-8')
+  with open(TEMPLATE_PATH, 'r', encoding='utf-8') as f:
+    template = f.read()
+  template = inline_stylesheets(template, STATIC_PATH, args.basepath, assets, css_cache, args.inline_css_max_bytes, critical)
+  os.makedirs(os.path.dirname(INLINED_TEMPLATE_PATH), exist_ok=True)
+  write_if_changed(INLINED_TEMPLATE_PATH, template.encode('utf-8'))
+  return INLINED_TEMPLATE_PATH
+
+def main(argv=None):
+  if argv is None:
+    argv = sys.argv[1:]
+  if argv and argv[0] == "serve":
+    # Import here to avoid circular imports
+    from dev_server import serve_main
+    return serve_main(argv[1:])
+  
+  args = parse_args(argv)
+  if args.jobs <= 0:
+    args.jobs = os.cpu_count() or 1
+  
+  print(f"Using basepath: {args.basepath}")
+  
+  profile = BuildProfile() if args.profile else None
+  profiler = None
+  if args.cprofile:
+    # Worker processes would be invisible to the profiler, so build in this process
+    import cProfile
+    args.jobs = 1
+    profiler = cProfile.Profile()
+    profiler.enable()
+  
+  status = 0
+  try:
+    build_site(args, profile)
+    print("Site generation complete!")
+  except PageBuildError as e:
+    print(e)
+    status = 1
+  finally:
+    if profiler is not None:
+      profiler.disable()
+      profiler.dump_stats(args.cprofile)
+      print(f"Wrote cProfile stats to {args.cprofile}")
+    if profile is not None:
+      print(format_report(profile.save(args.profile_output, args.profile_top)))
+      print(f"Wrote profile report to {args.profile_output}")
+  
+  if args.watch:
+    # Import here to avoid circular imports
+    from watch import Watcher
+    Watcher(CONTENT_PATH, STATIC_PATH, TEMPLATE_PATH, OUTPUT_PATH, MANIFEST_PATH, args.basepath, args.jobs,
+      minify=args.minify, image_sizes_path=IMAGE_SIZES_PATH if args.image_dimensions else None,
+      encodings=available_encodings() if args.precompress else None, compress_min_bytes=args.compress_min_bytes,
+    ).run(args.watch_interval)
+    return 0
+  return status
+
+def text_node_to_html_node(text_node: TextNode) -> HTMLNode:
   match text_node.type:
     case TextType.TEXT:
       return LeafNode(None, text_node.text)
+    case TextType.BOLD if text_node.children:
+      return ParentNode("b", [text_node_to_html_node(child) for child in text_node.children])
     case TextType.BOLD:
       return LeafNode("b", text_node.text)
+    case TextType.ITALIC if text_node.children:
+      return ParentNode("i", [text_node_to_html_node(child) for child in text_node.children])
     case TextType.ITALIC:
       return LeafNode("i", text_node.text)
     case TextType.CODE:
@@ -129,13 +598,7 @@ def text_node_to_html_node(text_node: TextNode) -> LeafNode:
       raise Exception(f"Unsupported text type: {text_node.type}")
     
 def text_to_textnodes(text: str) -> list[TextNode]:
-  nodes = [TextNode(text, TextType.TEXT)]
-  nodes = split_nodes_image(nodes)
-  nodes = split_nodes_link(nodes)
-  nodes = split_nodes_delimiter(nodes, "**", TextType.BOLD)
-  nodes = split_nodes_delimiter(nodes, "_", TextType.ITALIC)
-  nodes = split_nodes_delimiter(nodes, "`", TextType.CODE)
-  return nodes
+  return parse_inline(text)
 
 def block_to_block_type(block: str) -> BlockType:
   lines = block.split('\n')
@@ -153,52 +616,172 @@ def block_to_block_type(block: str) -> BlockType:
   else:
     return BlockType.PARAGRAPH
   
-def generate_page(from_path: str, template_path: str, dest_path: str, basepath: str = "/"):
+def parse_page(markdown_content: str, parse_cache=None, timer=NO_TIMER, urls=None) -> tuple[HTMLNode, PageMetadata]:
     """
-    Generate an HTML page from a markdown file using a template.
+    Convert a markdown document to its HTMLNode tree and metadata, unless this exact source was parsed by an earlier build.
+    
+    The front matter is split off first, and the title, date, tags and word
+    count are collected from the same blocks the tree is built from.
     
     Args:
-        from_path: Path to the source markdown file
-        template_path: Path to the HTML template file
-        dest_path: Path where the generated HTML file should be written
-        basepath: Base path for the site (e.g., "/" or "/blog/")
+        markdown_content: The markdown source of the page, optionally starting with front matter
+        parse_cache: Optional ParseCache consulted before parsing, and filled after
+        timer: Optional PageTimer that records the blocks and inline stages
+        urls: UrlResolver the page will be rendered with, for the shared block cache
+    
+    Raises:
+        ValueError: If the front matter's title or date is a list
     """
     # Import here to avoid circular imports
-    from markdown_html import markdown_to_html_node
+    from block_parser import parse_blocks
+    from markdown_html import BLOCK_CACHE, blocks_to_html_node
+    from metadata import blocks_metadata, split_front_matter
     
-    print(f"Generating page from {from_path} to {dest_path} using {template_path}")
+    if parse_cache is not None:
+        with timer.stage("blocks"):
+            source_hash = hash_bytes(markdown_content.encode('utf-8'))
+            cached = parse_cache.get(source_hash)
+        if cached is not None:
+            return cached
+    with timer.stage("blocks"):
+        front_matter, body = split_front_matter(markdown_content)
+        blocks = parse_blocks(body)
+        metadata = blocks_metadata(blocks, front_matter)
+    with timer.stage("inline"):
+        html_node = blocks_to_html_node(blocks, BLOCK_CACHE, urls)
+    if parse_cache is not None:
+        parse_cache.put(source_hash, html_node, metadata)
+    return html_node, metadata
+
+def write_page(markdown_content: str, template, basepath: str, out, timer=NO_TIMER, parse_cache=None, image_sizes=None, minify=False, prefetch=None):
+    """
+    Render a markdown document into a compiled template, streaming the page into out.
     
-    # Read the markdown file
+    Args:
+        markdown_content: The markdown source of the page, optionally starting with front matter
+        template: CompiledTemplate for the page layout; its asset map also applies to the content
+        basepath: Base path for the site (e.g., "/" or "/blog/")
+        out: File-like object the HTML is written to
+        timer: Optional PageTimer; when enabled, rendering is buffered so that
+            render, template and write time can be told apart
+        parse_cache: Optional ParseCache consulted before parsing the markdown
+        image_sizes: Optional map of static image path to (width, height) for <img> attributes
+        minify: Whether to pass the page through an HtmlMinifier on its way into out
+        prefetch: Optional root-relative URLs to add <link rel="prefetch"> hints for after the content
+    """
+    # Links and images are resolved for the basepath and asset map as they render
+    urls = get_resolver(basepath, template.assets)
+    
+    # The title comes from the parse: the front matter's, or else the first h1
+    html_node, metadata = parse_page(markdown_content, parse_cache, timer, urls)
+    title = metadata.title
+    if title is None:
+        raise Exception("No h1 header found in markdown")
+    
+    # Image attributes are added to the img nodes as they render, counting this page's images only;
+    # sizes are known by static path, but the page refers to images by their resolved URL
+    content_urls = urls if image_sizes is None else ImageAttributes(urls, urls.by_url(image_sizes))
+    
+    def write_content(out):
+        html_node.write_html(out, content_urls)
+        if prefetch:
+            # Prefetch links are allowed in the body, so no template slot is needed
+            out.write("".join(f'<link rel="prefetch" href="{urls.resolve(url)}">' for url in prefetch))
+    
+    # Minify last, once URLs and image attributes are final
+    sink = HtmlMinifier(out) if minify else out
+    
+    if not timer.enabled:
+        template.write(sink, {
+            "Title": title,
+            "Content": write_content,
+        })
+        if minify:
+            sink.flush()
+        return
+    
+    with timer.stage("render"):
+        content = io.StringIO()
+        write_content(content)
+    with timer.stage("template"):
+        page = io.StringIO()
+        template.write(page, {
+            "Title": title,
+            "Content": content.getvalue(),
+        })
+    with timer.stage("write"):
+        sink.write(page.getvalue())
+        if minify:
+            sink.flush()
+
+def render_page(markdown_content: str, template, basepath: str, timer=NO_TIMER, parse_cache=None, image_sizes=None, minify=False, prefetch=None) -> str:
+    """Render a markdown document into a compiled template and return the page as a string"""
+    out = io.StringIO()
+    write_page(markdown_content, template, basepath, out, timer, parse_cache, image_sizes, minify, prefetch)
+    return out.getvalue()
+
+def read_source(from_path: str) -> str:
+    """Read a markdown source file"""
     with open(from_path, 'r', encoding='utf-8') as f:
-        markdown_content = f.read()
+        return f.read()
+
+def write_output(dest_path: str, html: str) -> str:
+    """
+    Write a generated page, replacing the old page only once the new one is
+    complete, and leaving it untouched if its bytes would not change.
     
-    # Read the template file
-    with open(template_path, 'r', encoding='utf-8') as f:
-        template_content = f.read()
+    Returns:
+        ADDED, CHANGED or UNCHANGED
+    """
+    dest_dir = os.path.dirname(dest_path)
+    if dest_dir:
+        os.makedirs(dest_dir, exist_ok=True)
+    return write_if_changed(dest_path, html.encode('utf-8'))
+
+def generate_page(from_path: str, template_path: str, dest_path: str, basepath: str = "/", timer=NO_TIMER, parse_cache=None, assets=None, image_sizes=None, minify=False, prefetch=None):
+    """
+    Generate an HTML page from a markdown file using a template.
     
-    # Convert markdown to HTML
-    html_node = markdown_to_html_node(markdown_content)
-    html_content = html_node.to_html()
+    Args:
+        from_path: Path to the source markdown file
+        template_path: Path to the HTML template file
+        dest_path: Path where the generated HTML file should be written
+        basepath: Base path for the site (e.g., "/" or "/blog/")
+        timer: Optional PageTimer that records how long each stage takes
+        parse_cache: Optional ParseCache of previously parsed documents
+        assets: Optional map of static asset path to fingerprinted path
+        image_sizes: Optional map of static image path to (width, height) for <img> attributes
+        minify: Whether to minify the generated HTML
+        prefetch: Optional root-relative URLs the page gets prefetch hints for
     
-    # Extract the title
-    title = extract_title(markdown_content)
+    Returns:
+        ADDED, CHANGED, or UNCHANGED when the existing file already had the same bytes
+    """
+    print(f"Generating page from {from_path} to {dest_path} using {template_path}")
     
-    # Replace placeholders in template
-    final_html = template_content.replace("{{ Title }}", title)
-    final_html = final_html.replace("{{ Content }}", html_content)
+    # Read the markdown file
+    with timer.stage("read"):
+        markdown_content = read_source(from_path)
     
-    # Replace base path references
-    final_html = final_html.replace('href="/', f'href="{basepath}')
-    final_html = final_html.replace('src="/', f'src="{basepath}')
+    # Compile the template (cached across pages until the file changes)
+    with timer.stage("template"):
+        template = load_template(template_path, basepath, assets)
     
     # Create destination directory if it doesn't exist
-    dest_dir = os.path.dirname(dest_path)
-    if dest_dir and not os.path.exists(dest_dir):
-        os.makedirs(dest_dir)
+    with timer.stage("write"):
+        dest_dir = os.path.dirname(dest_path)
+        if dest_dir:
+            os.makedirs(dest_dir, exist_ok=True)
     
-    # Write the final HTML to the destination file
-    with open(dest_path, 'w', encoding='utf-8') as f:
-        f.write(final_html)
+    # Stream the page into a temporary file, replacing the old page only once it is complete and different
+    def replace(tmp_path, dest_path):
+        with timer.stage("write"):
+            return replace_if_changed(tmp_path, dest_path)
+    return write_atomic(
+        dest_path,
+        lambda f: write_page(markdown_content, template, basepath, f, timer, parse_cache, image_sizes, minify, prefetch),
+        replace=replace,
+    )
 
 if __name__ == "__main__":
-  main()
+  sys.exit(main())
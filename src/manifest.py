@@ -0,0 +1,164 @@
+import hashlib
+import json
+import os
+
+from changes import write_atomic
+
+MANIFEST_VERSION = 1
+
+def hash_bytes(data: bytes) -> str:
+    """Return the hex sha256 digest of a bytes object"""
+    return hashlib.sha256(data).hexdigest()
+
+def hash_file(path: str) -> str:
+    """Return the hex sha256 digest of a file's contents"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 16), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def hash_generator_code(src_dir: str = None) -> str:
+    """Hash every generator module so that a code change invalidates all pages"""
+    if src_dir is None:
+        src_dir = os.path.dirname(os.path.abspath(__file__))
+    digest = hashlib.sha256()
+    for name in sorted(os.listdir(src_dir)):
+        if name.endswith('.py'):
+            digest.update(name.encode('utf-8'))
+            digest.update(hash_file(os.path.join(src_dir, name)).encode('ascii'))
+    return digest.hexdigest()
+
+def build_fingerprint(template_path: str, basepath: str, *extra: str) -> str:
+    """
+    Combine everything that affects every page into one digest.
+
+    Args:
+        template_path: Path to the HTML template file
+        basepath: Base path for the site
+        extra: Any further build options that change the generated output
+    """
+    parts = [hash_file(template_path), hash_generator_code(), basepath, *extra]
+    return hash_bytes("\0".join(parts).encode('utf-8'))
+
+class BuildManifest:
+    """
+    Persistent record of which sources produced which outputs, and from what inputs.
+
+    A page is rebuilt when its source hash, its output path or the build
+    fingerprint (template, generator code and options) has changed since the
+    last build, or when its output file has gone missing. The manifest also
+    remembers which output files are synced static assets.
+    """
+    def __init__(self, path: str, fingerprint: str):
+        self.path = path
+        self.fingerprint = fingerprint
+        self.pages = {}
+        self.assets = {}
+        self._seen = set()
+        self._load()
+
+    def _load(self):
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return
+        if not isinstance(data, dict) or data.get("version") != MANIFEST_VERSION:
+            return
+        self.pages = data.get("pages", {})
+        self.assets = data.get("assets", {})
+        if data.get("fingerprint") != self.fingerprint:
+            self._invalidate_pages()
+
+    def _invalidate_pages(self):
+        # Keep the outputs so stale ones can still be removed, but force every page to rebuild
+        for entry in self.pages.values():
+            entry["hash"] = None
+
+    def set_fingerprint(self, fingerprint: str):
+        """Switch to a new build fingerprint, invalidating every page if it changed"""
+        if fingerprint != self.fingerprint:
+            self.fingerprint = fingerprint
+            self._invalidate_pages()
+
+    def needs_build(self, source: str, source_hash: str, output: str) -> bool:
+        """Mark source as live and report whether its output must be regenerated"""
+        self._seen.add(source)
+        entry = self.pages.get(source)
+        if entry is None:
+            return True
+        if entry["hash"] != source_hash or entry["output"] != output:
+            return True
+        return not os.path.exists(output)
+
+    def record(self, source: str, source_hash: str, output: str):
+        """Remember that source (with the given hash) was rendered to output"""
+        self._seen.add(source)
+        self.pages[source] = {"hash": source_hash, "output": output}
+
+    def forget(self, source: str) -> str:
+        """
+        Drop a source that was deleted, removing its output.
+
+        Returns:
+            The removed output path, or None if the source was unknown
+        """
+        self._seen.discard(source)
+        entry = self.pages.pop(source, None)
+        if entry is None:
+            return None
+        if os.path.exists(entry["output"]):
+            os.remove(entry["output"])
+        return entry["output"]
+
+    def remove_stale(self, root: str = None, changes=None) -> list[str]:
+        """
+        Delete outputs whose sources were not seen during this build.
+
+        Args:
+            root: Output root; directories left empty below it are removed too
+            changes: Optional ChangeReport that records each deleted file and its size
+
+        Returns:
+            The output paths that were removed
+        """
+        removed = []
+        live_outputs = {self.pages[source]["output"] for source in self._seen if source in self.pages}
+        for source in sorted(set(self.pages) - self._seen):
+            output = self.pages.pop(source)["output"]
+            if output in live_outputs:
+                continue
+            if os.path.exists(output):
+                if changes is not None:
+                    changes.remove(output)
+                else:
+                    os.remove(output)
+                if root is not None:
+                    _prune_empty_dirs(os.path.dirname(output), root)
+            removed.append(output)
+        return removed
+
+    def save(self):
+        """Write the manifest atomically"""
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        data = {
+            "version": MANIFEST_VERSION,
+            "fingerprint": self.fingerprint,
+            "pages": self.pages,
+            "assets": self.assets,
+        }
+        write_atomic(self.path, lambda f: json.dump(data, f, indent=1, sort_keys=True))
+
+def _prune_empty_dirs(directory: str, root: str):
+    """Remove directory and its parents below root for as long as they are empty"""
+    root = os.path.abspath(root)
+    directory = os.path.abspath(directory)
+    while directory != root and directory.startswith(root + os.sep):
+        try:
+            os.rmdir(directory)
+        except OSError:
+            return
+        directory = os.path.dirname(directory)
@@ -1,11 +1,53 @@
-from main import block_to_block_type, text_to_textnodes, text_node_to_html_node
+from main import text_to_textnodes, text_node_to_html_node
 from parentnode import ParentNode
 from leafnode import LeafNode
 from htmlnode import HTMLNode
-from markdown_utils import markdown_to_blocks
+from block_parser import parse_blocks
 from blocknode import BlockType
+from inline_parser import parse_inline_html
+from cache import LRUCache
 import re
 
+# Build inline HTML nodes via the TextNode stream (True) or directly from the scanner (False)
+USE_TEXT_NODES = False
+
+# Upper bound on the rendered HTML kept by the cross-page block cache, in characters
+BLOCK_CACHE_SIZE = 16 * 1024 * 1024
+
+class RenderedBlockNode(HTMLNode):
+    """
+    A block rendered once and shared, as HTML, by every page that contains it.
+
+    The HTML is rendered with the UrlResolver given; rendering with any other
+    resolver falls back to the original node, except that a block without
+    images keeps its HTML under the ImageAttributes of that same resolver.
+    """
+    __slots__ = ("node", "html", "urls")
+
+    def __init__(self, node: HTMLNode, urls=None):
+        super().__init__(node.tag, None, None, node.props)
+        self.node = node
+        self.urls = urls
+        self.html = node.to_html(urls)
+
+    def _html_parts(self, urls=None) -> tuple:
+        if urls is not self.urls and (getattr(urls, "resolver", None) is not self.urls or "<img" in self.html):
+            return self.node.to_html(urls), None, ""
+        return self.html, None, ""
+
+    def __len__(self):
+        # The size an LRUCache charges for this block
+        return len(self.html)
+
+    def __eq__(self, other):
+        if isinstance(other, RenderedBlockNode):
+            other = other.node
+        return self.node == other
+
+# Blocks render without any page context (URLs resolve the same on every page of a build),
+# so identical blocks on different pages share one entry
+BLOCK_CACHE = LRUCache(max_bytes=BLOCK_CACHE_SIZE)
+
 class EmptyDivNode(HTMLNode):
     """A special node for empty div tags"""
     def __init__(self):
@@ -16,6 +58,8 @@ class EmptyDivNode(HTMLNode):
 
 def text_to_children(text: str) -> list:
     """Convert text with inline markdown to list of HTMLNode children"""
+    if not USE_TEXT_NODES:
+        return parse_inline_html(text)
     text_nodes = text_to_textnodes(text)
     return [text_node_to_html_node(text_node) for text_node in text_nodes]
 
@@ -105,28 +149,29 @@ def ordered_list_to_html_node(block: str) -> ParentNode:
 
 def markdown_to_html_node(markdown: str) -> HTMLNode:
     """Convert full markdown document to single parent HTMLNode"""
-    blocks = markdown_to_blocks(markdown)
+    return blocks_to_html_node(parse_blocks(markdown))
+
+def blocks_to_html_node(blocks: list, cache: LRUCache = None, urls=None) -> HTMLNode:
+    """
+    Convert blocks from parse_blocks to a single parent HTMLNode.
+
+    With a cache (e.g. BLOCK_CACHE), each block is looked up by its type and
+    content first, and a block seen before is reused as a RenderedBlockNode
+    instead of being parsed and rendered again. Cached blocks are rendered
+    with urls, the UrlResolver the page will be written with.
+    """
     children = []
     
-    for block in blocks:
-        block_type = block_to_block_type(block)
-        
-        if block_type == BlockType.HEADING:
-            html_node = heading_to_html_node(block)
-        elif block_type == BlockType.PARAGRAPH:
-            html_node = paragraph_to_html_node(block)
-        elif block_type == BlockType.CODE:
-            html_node = code_block_to_html_node(block)
-        elif block_type == BlockType.QUOTE:
-            html_node = quote_to_html_node(block)
-        elif block_type == BlockType.UNORDERED_LIST:
-            html_node = unordered_list_to_html_node(block)
-        elif block_type == BlockType.ORDERED_LIST:
-            html_node = ordered_list_to_html_node(block)
-        else:
-            # Default to paragraph for unknown types
-            html_node = paragraph_to_html_node(block)
-        
+    # Blocks arrive already typed, so nothing is classified twice
+    for parsed in blocks:
+        if cache is None:
+            children.append(block_to_html_node(parsed.type, parsed.content))
+            continue
+        key = (parsed.type, parsed.content, urls)
+        html_node = cache.get(key)
+        if html_node is None:
+            html_node = RenderedBlockNode(block_to_html_node(parsed.type, parsed.content), urls)
+            cache.put(key, html_node)
         children.append(html_node)
     
     # Handle empty markdown case - return empty div
@@ -136,6 +181,24 @@ def markdown_to_html_node(markdown: str) -> HTMLNode:
     # Return parent div containing all blocks
     return ParentNode("div", children)
 
+def block_to_html_node(block_type: BlockType, block: str) -> HTMLNode:
+    """Convert a single typed block to its HTMLNode"""
+    if block_type == BlockType.HEADING:
+        return heading_to_html_node(block)
+    elif block_type == BlockType.PARAGRAPH:
+        return paragraph_to_html_node(block)
+    elif block_type == BlockType.CODE:
+        return code_block_to_html_node(block)
+    elif block_type == BlockType.QUOTE:
+        return quote_to_html_node(block)
+    elif block_type == BlockType.UNORDERED_LIST:
+        return unordered_list_to_html_node(block)
+    elif block_type == BlockType.ORDERED_LIST:
+        return ordered_list_to_html_node(block)
+    else:
+        # Default to paragraph for unknown types
+        return paragraph_to_html_node(block)
+
 def markdown_to_html(markdown: str) -> ParentNode:
     """Legacy function - use markdown_to_html_node instead"""
     return markdown_to_html_node(markdown)
\ No newline at end of file
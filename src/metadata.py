@@ -0,0 +1,283 @@
+import contextlib
+import datetime
+import email.utils
+import json
+import os
+import posixpath
+import re
+import sqlite3
+
+from blocknode import BlockType
+from manifest import hash_file
+
+# Bump when the tables below change; an index of another version is rebuilt
+INDEX_VERSION = 2
+
+_SCHEMA = """
+CREATE TABLE pages (
+    source TEXT PRIMARY KEY,
+    hash TEXT NOT NULL,
+    url TEXT NOT NULL,
+    title TEXT,
+    date TEXT,
+    words INTEGER NOT NULL,
+    front_matter TEXT NOT NULL
+);
+CREATE TABLE tags (
+    tag TEXT NOT NULL,
+    source TEXT NOT NULL REFERENCES pages (source) ON DELETE CASCADE,
+    PRIMARY KEY (tag, source)
+);
+CREATE INDEX pages_date ON pages (date);
+CREATE INDEX pages_title ON pages (title);
+CREATE INDEX tags_source ON tags (source);
+"""
+
+_FENCE = "---"
+_KEY_RE = re.compile(r"([A-Za-z_][\w-]*):(?:\s+(.*)|\s*)$")
+_LIST_ITEM_RE = re.compile(r"\s*- (.*)$")
+# Link and image targets are not words of the page
+_LINK_TARGET_RE = re.compile(r"\]\([^)]*\)")
+_WORD_RE = re.compile(r"\w[\w'’-]*")
+# Front-matter date formats other than ISO 8601 and RFC 2822, tried in order
+_DATE_FORMATS = ("%Y-%m-%d", "%Y/%m/%d", "%d %B %Y", "%d %b %Y", "%B %d, %Y", "%b %d, %Y")
+
+def _scalar(value: str):
+    """Parse a front-matter value: a quoted or bare string, or a [flow, list]"""
+    value = value.strip()
+    if len(value) >= 2 and value[0] == value[-1] and value[0] in "'\"":
+        return value[1:-1]
+    if value.startswith("[") and value.endswith("]"):
+        return [_scalar(item) for item in value[1:-1].split(",") if item.strip()]
+    return value
+
+def split_front_matter(markdown: str) -> tuple[dict, str]:
+    """
+    Split a leading front-matter block off a markdown document.
+
+    Front matter sits between two "---" lines at the very start and holds
+    "key: value" lines, where a value is a string or a [flow, list], or is
+    left empty and followed by "- item" lines. Anything else means the
+    document has no front matter and is returned whole.
+
+    Returns:
+        The front matter as a dict, and the markdown that follows it
+    """
+    if not markdown.startswith(_FENCE):
+        return {}, markdown
+    lines = markdown.split("\n")
+    if lines[0].rstrip() != _FENCE:
+        return {}, markdown
+
+    front_matter = {}
+    key = None
+    for index in range(1, len(lines)):
+        line = lines[index].rstrip()
+        if line == _FENCE:
+            return front_matter, "\n".join(lines[index + 1:])
+        if not line.strip() or line.lstrip().startswith("#"):
+            continue
+        item = _LIST_ITEM_RE.match(line)
+        if item and key is not None and isinstance(front_matter[key], list):
+            front_matter[key].append(_scalar(item.group(1)))
+            continue
+        match = _KEY_RE.match(line)
+        if match is None:
+            return {}, markdown
+        key, value = match.groups()
+        front_matter[key] = _scalar(value) if value else []
+    # No closing fence
+    return {}, markdown
+
+def _tags(value) -> list[str]:
+    """Normalize a tags value (a list, or a comma-separated string) to unique non-empty tags"""
+    if isinstance(value, str):
+        value = value.split(",")
+    tags = []
+    for tag in value or ():
+        tag = str(tag).strip()
+        if tag and tag not in tags:
+            tags.append(tag)
+    return tags
+
+class PageMetadata:
+    """The title, date, tags and word count of one page, with its root-relative URL once indexed"""
+    def __init__(self, title: str = None, date: str = None, tags: list[str] = None, words: int = 0, front_matter: dict = None, url: str = None):
+        self.title = title
+        self.date = date
+        self.tags = tags or []
+        self.words = words
+        self.front_matter = front_matter or {}
+        self.url = url
+
+    def __eq__(self, other):
+        return (
+            isinstance(other, PageMetadata) and self.title == other.title and self.date == other.date
+            and self.tags == other.tags and self.words == other.words and self.url == other.url
+        )
+
+    def __repr__(self):
+        return f"PageMetadata({self.title!r}, {self.date!r}, {self.tags!r}, {self.words} words, {self.url!r})"
+
+def normalize_date(value: str):
+    """
+    A front-matter date in ISO 8601, so that dates sort correctly as text.
+
+    A plain date becomes YYYY-MM-DD; a date with a time of day becomes
+    YYYY-MM-DDTHH:MM:SS+00:00 in UTC (assumed when it has no offset).
+
+    Returns:
+        The ISO date, or None when value is empty or not a date
+    """
+    if not value:
+        return None
+    value = value.strip()
+    with contextlib.suppress(ValueError):
+        return datetime.date.fromisoformat(value).isoformat()
+    try:
+        parsed = datetime.datetime.fromisoformat(value)
+    except ValueError:
+        parsed = None
+    if parsed is None:
+        with contextlib.suppress(TypeError, ValueError):
+            parsed = email.utils.parsedate_to_datetime(value)
+    if parsed is None:
+        for date_format in _DATE_FORMATS:
+            with contextlib.suppress(ValueError):
+                return datetime.datetime.strptime(value, date_format).date().isoformat()
+        return None
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=datetime.timezone.utc)
+    return parsed.astimezone(datetime.timezone.utc).isoformat(timespec="seconds")
+
+def blocks_metadata(blocks: list, front_matter: dict = None) -> PageMetadata:
+    """
+    Collect a page's metadata from its parsed blocks and front matter.
+
+    The front matter's title wins over the first h1 heading, and its date is
+    normalized to ISO 8601 (see normalize_date). Words are counted in every
+    block but code blocks, leaving out link targets.
+
+    Raises:
+        ValueError: If the front matter's title or date is a list
+    """
+    front_matter = front_matter or {}
+    for key in ("title", "date"):
+        if isinstance(front_matter.get(key), list) and front_matter[key]:
+            raise ValueError(f"Front matter {key} must be text, not a list: {front_matter[key]!r}")
+    title = front_matter.get("title") or None
+    words = 0
+    for block in blocks:
+        if block.type == BlockType.CODE:
+            continue
+        if title is None and block.type == BlockType.HEADING and block.content.startswith("# "):
+            title = block.content[2:].strip()
+        words += len(_WORD_RE.findall(_LINK_TARGET_RE.sub("]", block.content)))
+    return PageMetadata(
+        title,
+        normalize_date(front_matter.get("date")),
+        _tags(front_matter.get("tags")),
+        words,
+        front_matter,
+    )
+
+def read_metadata(markdown: str) -> PageMetadata:
+    """Parse a markdown document's front matter and blocks, without any inline parsing, into its metadata"""
+    # Import here to avoid circular imports
+    from block_parser import parse_blocks
+
+    front_matter, body = split_front_matter(markdown)
+    return blocks_metadata(parse_blocks(body), front_matter)
+
+class PageIndex:
+    """
+    The metadata of every page of the site, in an SQLite database.
+
+    Pages are stored by source path with the hash of their source, so an
+    update only reads the blocks of pages that changed. Dates, titles and
+    tags are indexed, so listings and tag pages are single queries instead
+    of a pass over every markdown file.
+    """
+    def __init__(self, path: str):
+        self.path = path
+        self.parsed = 0
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.db = sqlite3.connect(path)
+        self.db.execute("PRAGMA foreign_keys = ON")
+        if self.db.execute("PRAGMA user_version").fetchone()[0] != INDEX_VERSION:
+            with self.db:
+                self.db.execute("DROP TABLE IF EXISTS tags")
+                self.db.execute("DROP TABLE IF EXISTS pages")
+                for statement in _SCHEMA.split(";"):
+                    if statement.strip():
+                        self.db.execute(statement)
+                self.db.execute(f"PRAGMA user_version = {INDEX_VERSION}")
+
+    def update(self, pages: list[tuple[str, str]], dest_dir: str, parse=read_metadata, source_hashes: dict = None):
+        """
+        Bring the index up to date with the site's pages, in one transaction.
+
+        Args:
+            pages: (markdown path, html path) pairs of every page
+            dest_dir: Output directory the html paths are below
+            parse: Function turning markdown text into its PageMetadata, e.g. one
+                that shares the parse (and parse cache) the page generation uses
+            source_hashes: Optional map of markdown path to the hash_file digest of its
+                source, so that the build hashes every source once and unchanged pages
+                are not read at all
+        """
+        known = dict(self.db.execute("SELECT source, hash FROM pages"))
+        with self.db:
+            for from_path, dest_path in pages:
+                source_hash = source_hashes[from_path] if source_hashes is not None else hash_file(from_path)
+                if known.pop(from_path, None) == source_hash:
+                    continue
+                with open(from_path, 'r', encoding='utf-8') as f:
+                    metadata = parse(f.read())
+                rel_path = os.path.relpath(dest_path, dest_dir).replace(os.sep, "/")
+                if posixpath.basename(rel_path) == "index.html":
+                    directory = posixpath.dirname(rel_path)
+                    url = f"/{directory}/" if directory else "/"
+                else:
+                    url = f"/{rel_path}"
+                self.db.execute("DELETE FROM pages WHERE source = ?", (from_path,))
+                self.db.execute(
+                    "INSERT INTO pages (source, hash, url, title, date, words, front_matter) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    (from_path, source_hash, url, metadata.title, metadata.date, metadata.words,
+                     json.dumps(metadata.front_matter, sort_keys=True)),
+                )
+                self.db.executemany("INSERT INTO tags (tag, source) VALUES (?, ?)", [(tag, from_path) for tag in metadata.tags])
+                self.parsed += 1
+            # Pages whose sources are gone
+            self.db.executemany("DELETE FROM pages WHERE source = ?", [(from_path,) for from_path in known])
+
+    def pages(self, tag: str = None) -> list[PageMetadata]:
+        """Return every page, or every page with a tag: newest first, then undated pages by title"""
+        # One query for the pages and their tags; front-matter values never contain a newline
+        query = (
+            "SELECT pages.url, pages.title, pages.date, pages.words, pages.front_matter, group_concat(tags.tag, char(10))"
+            " FROM pages LEFT JOIN tags ON tags.source = pages.source"
+        )
+        params = ()
+        if tag is not None:
+            query += " WHERE pages.source IN (SELECT source FROM tags WHERE tag = ?)"
+            params = (tag,)
+        # Dates are stored in ISO 8601 (see normalize_date), so they sort as text
+        query += " GROUP BY pages.source ORDER BY pages.date IS NULL, pages.date DESC, pages.title, pages.url"
+        pages = []
+        for url, title, date, words, front_matter, tags in self.db.execute(query, params):
+            tags = sorted(tags.split("\n")) if tags else []
+            pages.append(PageMetadata(title, date, tags, words, json.loads(front_matter), url))
+        return pages
+
+    def tags(self) -> list[tuple[str, int]]:
+        """Return every tag with the number of pages that have it, most used first"""
+        return self.db.execute("SELECT tag, COUNT(*) AS n FROM tags GROUP BY tag ORDER BY n DESC, tag").fetchall()
+
+    def __len__(self):
+        return self.db.execute("SELECT COUNT(*) FROM pages").fetchone()[0]
+
+    def close(self):
+        self.db.close()
@@ -0,0 +1,192 @@
+import io
+import re
+
+# Elements whose content is written exactly as is
+RAW_ELEMENTS = frozenset({"pre", "code", "textarea", "script", "style"})
+
+# Whitespace next to these tags never renders, so it is dropped rather than collapsed
+BLOCK_ELEMENTS = frozenset({
+    "address", "article", "aside", "base", "blockquote", "body", "dd", "details", "div", "dl", "dt",
+    "fieldset", "figcaption", "figure", "footer", "form", "h1", "h2", "h3", "h4", "h5", "h6", "head",
+    "header", "hgroup", "hr", "html", "li", "link", "main", "meta", "nav", "ol", "p", "pre", "section",
+    "summary", "table", "tbody", "td", "tfoot", "th", "thead", "title", "tr", "ul",
+})
+
+# Elements without content, whose trailing "/" means nothing in HTML
+VOID_ELEMENTS = frozenset({
+    "area", "base", "br", "col", "embed", "hr", "img", "input", "link", "meta", "source", "track", "wbr",
+})
+
+# A comment, a start or end tag (quoted attribute values may contain ">"), or a declaration
+_TOKEN_RE = re.compile(r"""<!--.*?-->|</?[A-Za-z][^>"']*(?:(?:"[^"]*"|'[^']*')[^>"']*)*>|<!(?!--)[^>]*>|<\?[^>]*>""", re.S)
+
+# The start of a token that may be completed by a later chunk
+_TOKEN_START_RE = re.compile(r"<(?:[A-Za-z/!?]|\Z)")
+
+_TAG_RE = re.compile(r"<(/?)([A-Za-z][^\s/>]*)(.*?)(/?)>\Z", re.S)
+_ATTR = r"""([^\s"'>/=]+)(?:\s*=\s*("[^"]*"|'[^']*'|[^\s"'=<>`]+))?"""
+_ATTR_RE = re.compile(_ATTR)
+_ATTRS_RE = re.compile(rf"(?:\s+{_ATTR})*\s*\Z")
+
+# A value that may go without quotes
+_UNQUOTED_RE = re.compile(r"[^\s\"'=<>`]+\Z")
+
+# HTML whitespace; unlike str.isspace() this leaves &nbsp; (U+00A0) alone
+_SPACE = " \t\n\r\f"
+_SPACE_RE = re.compile(f"[{_SPACE}]+")
+
+_RAW_END_RES = {name: re.compile(rf"</{name}[{_SPACE}]*>", re.I) for name in RAW_ELEMENTS}
+
+def minify_tag(tag: str) -> str:
+    """
+    Collapse the whitespace in a start or end tag and drop quotes that are not needed.
+
+    Tags that do not parse cleanly are returned unchanged.
+    """
+    match = _TAG_RE.match(tag)
+    if match is None or not _ATTRS_RE.match(match.group(3)):
+        return tag
+    closing, name, body, slash = match.groups()
+    if name.lower() in VOID_ELEMENTS:
+        slash = ""
+    parts = [f"<{closing}{name}"]
+    for attr in _ATTR_RE.finditer(body):
+        attr_name, value = attr.groups()
+        if value is None:
+            parts.append(f" {attr_name}")
+            continue
+        if value[0] in "\"'" and not slash and _UNQUOTED_RE.match(value[1:-1]):
+            value = value[1:-1]
+        parts.append(f" {attr_name}={value}")
+    parts.append(f"{slash}>")
+    return "".join(parts)
+
+class HtmlMinifier:
+    """
+    File-like wrapper that minifies HTML as it streams through.
+
+    Runs of whitespace collapse to one space, and whitespace next to block
+    elements is dropped. Comments (other than conditional comments) are
+    removed and attribute quotes are dropped where HTML allows. The content
+    of <pre>, <code>, <textarea>, <script> and <style> elements passes
+    through untouched.
+
+    Chunks are batched, and only an incomplete tag at the end of a batch is
+    held back, so the page is never copied as a whole.
+    """
+    BATCH_SIZE = 8192
+
+    def __init__(self, out):
+        self.out = out
+        self._chunks = []
+        self._size = 0
+        # End tag pattern and "</name" of the raw element being passed through
+        self._raw_end = None
+        self._raw_close = None
+        # Whitespace seen but not written yet, as it depends on what follows
+        self._space = False
+        # The last thing written ends where whitespace does not render
+        self._after_block = True
+
+    def write(self, chunk: str):
+        self._chunks.append(chunk)
+        self._size += len(chunk)
+        if self._size >= self.BATCH_SIZE:
+            self._drain(final=False)
+
+    def flush(self):
+        self._drain(final=True)
+
+    def _drain(self, final: bool):
+        text = "".join(self._chunks)
+        self._chunks = []
+        self._size = 0
+        position = 0
+        while position < len(text):
+            if self._raw_end is not None:
+                end = self._raw_end.search(text, position)
+                if end is None:
+                    # Keep back only a tail that may still become the end tag, so a long
+                    # block is written as it arrives rather than held and rejoined
+                    cut = len(text) if final else self._partial_end_tag(text, position)
+                    self.out.write(text[position:cut])
+                    position = cut
+                    break
+                self.out.write(text[position:end.start()])
+                self._raw_end = self._raw_close = None
+                position = end.start()
+            start = text.find("<", position)
+            if start == -1:
+                self._text(text[position:])
+                position = len(text)
+                break
+            self._text(text[position:start])
+            token = _TOKEN_RE.match(text, start)
+            if token is not None:
+                self._token(token.group())
+                position = token.end()
+            elif not final and _TOKEN_START_RE.match(text, start):
+                position = start
+                break
+            else:
+                self._text("<")
+                position = start + 1
+        if position < len(text):
+            self._chunks.append(text[position:])
+            self._size = len(text) - position
+
+    def _partial_end_tag(self, text: str, position: int) -> int:
+        """Where a possible start of the raw element's end tag begins at the end of text, or len(text)"""
+        start = text.rfind("<", position)
+        if start == -1:
+            return len(text)
+        tail = text[start:]
+        head = tail.rstrip(_SPACE).lower()
+        # "</pr" may go on to "</pre", and "</pre  " to "</pre  >"
+        if self._raw_close.startswith(head) and (head == tail or head == self._raw_close):
+            return start
+        return len(text)
+
+    def _text(self, text: str):
+        if not text:
+            return
+        stripped = text.strip(_SPACE)
+        if not stripped:
+            self._space = True
+            return
+        if (self._space or text[0] in _SPACE) and not self._after_block:
+            self.out.write(" ")
+        self.out.write(_SPACE_RE.sub(" ", stripped))
+        self._space = text[-1] in _SPACE
+        self._after_block = False
+
+    def _token(self, token: str):
+        if token.startswith("<!--"):
+            if token.startswith("<!--[if"):
+                self.out.write(token)
+            return
+        if token[1] in "!?":
+            # Doctype or processing instruction
+            self._space = False
+            self._after_block = True
+            self.out.write(token)
+            return
+        match = _TAG_RE.match(token)
+        name = match.group(2).lower() if match else ""
+        block = name in BLOCK_ELEMENTS
+        if self._space and not block and not self._after_block:
+            self.out.write(" ")
+        self._space = False
+        self._after_block = block
+        self.out.write(minify_tag(token))
+        if name in RAW_ELEMENTS and not match.group(1) and not match.group(4):
+            self._raw_end = _RAW_END_RES[name]
+            self._raw_close = f"</{name}"
+
+def minify_html(html: str) -> str:
+    """Minify a complete HTML document; see HtmlMinifier"""
+    out = io.StringIO()
+    minifier = HtmlMinifier(out)
+    minifier.write(html)
+    minifier.flush()
+    return out.getvalue()
@@ -0,0 +1,77 @@
+from concurrent.futures import ProcessPoolExecutor
+
+class PageBuildError(Exception):
+    """Raised after a build in which one or more pages failed to generate"""
+    def __init__(self, failures: list[tuple[str, str]]):
+        self.failures = failures
+        lines = [f"{len(failures)} page(s) failed to generate:"]
+        lines.extend(f"  {path}: {error}" for path, error in failures)
+        super().__init__("\n".join(lines))
+
+# Options shared by every page of a build, sent to each worker process once by _init_worker
+_options = None
+
+def _init_worker(options: tuple):
+    global _options
+    _options = options
+
+def _generate_page_worker(task: tuple) -> tuple[str, str, dict, str]:
+    """Generate one page in a worker process, returning (path, error or None, stage timings or None, write status)"""
+    # Import here to avoid circular imports
+    from main import generate_page
+    from profiling import NO_TIMER, PageTimer
+
+    from_path, dest_path, prefetch = task
+    template_path, basepath, profiled, parse_cache, assets, image_sizes, minify = _options
+    timer = PageTimer() if profiled else NO_TIMER
+    try:
+        status = generate_page(from_path, template_path, dest_path, basepath, timer, parse_cache, assets, image_sizes, minify, prefetch)
+    except Exception as e:
+        return from_path, f"{type(e).__name__}: {e}", getattr(timer, "stages", None), None
+    return from_path, None, getattr(timer, "stages", None), status
+
+def generate_pages_parallel(pages: list[tuple[str, str]], template_path: str, basepath: str, jobs: int, profile=None, parse_cache=None, changes=None, assets=None, image_sizes=None, minify=False, prefetch=None) -> list[tuple[str, str]]:
+    """
+    Generate pages on a process pool.
+
+    Every worker runs the same generate_page as a serial build, so the output
+    is byte-identical. A failing page does not stop the others.
+
+    Args:
+        pages: (markdown path, html path) pairs to generate
+        template_path: Path to the HTML template file
+        basepath: Base path for the site
+        jobs: Number of worker processes
+        profile: Optional BuildProfile; workers time their pages and send the timings back
+        parse_cache: Optional ParseCache shared by all workers through its directory
+        changes: Optional ChangeReport that records how each page's file changed
+        assets: Optional map of static asset path to fingerprinted path
+        image_sizes: Optional map of static image path to (width, height)
+        minify: Whether to minify the generated HTML
+        prefetch: Optional map of markdown path to the URLs that page gets prefetch hints for
+
+    Returns:
+        A list of (markdown path, error message) pairs for the pages that failed
+    """
+    if not pages:
+        return []
+
+    # The maps shared by all pages are pickled once per worker rather than once per page
+    options = (template_path, basepath, profile is not None, parse_cache, assets, image_sizes, minify)
+    tasks = [
+        (from_path, dest_path, prefetch.get(from_path) if prefetch is not None else None)
+        for from_path, dest_path in pages
+    ]
+    dest_paths = dict(pages)
+    # Hand out pages in small batches to keep IPC overhead low without starving workers
+    chunksize = max(1, len(tasks) // (jobs * 4))
+    failures = []
+    with ProcessPoolExecutor(max_workers=jobs, initializer=_init_worker, initargs=(options,)) as executor:
+        for from_path, error, stages, status in executor.map(_generate_page_worker, tasks, chunksize=chunksize):
+            if stages is not None:
+                profile.add(from_path, stages)
+            if status is not None and changes is not None:
+                changes.record(dest_paths[from_path], status)
+            if error is not None:
+                failures.append((from_path, error))
+    return failures
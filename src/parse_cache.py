@@ -0,0 +1,158 @@
+import marshal
+import os
+import shutil
+import sys
+import zlib
+
+from changes import write_atomic
+from htmlnode import HTMLNode
+from leafnode import LeafNode
+from manifest import hash_bytes, hash_file
+from metadata import PageMetadata
+from parentnode import ParentNode
+
+# Bump when the serialized layout below changes
+CACHE_FORMAT = 2
+
+# Every module whose code decides what tree a markdown document parses to,
+# including main.py for parse_page and text_node_to_html_node
+PARSER_MODULES = (
+    "block_parser.py",
+    "blocknode.py",
+    "htmlnode.py",
+    "inline_parser.py",
+    "leafnode.py",
+    "main.py",
+    "markdown_html.py",
+    "metadata.py",
+    "parentnode.py",
+    "textnode.py",
+    "urls.py",
+)
+
+_LEAF, _PARENT, _EMPTY_DIV = 0, 1, 2
+
+def parser_version(src_dir: str = None) -> str:
+    """Digest of the parser code, the cache format and the marshal format of this Python"""
+    if src_dir is None:
+        src_dir = os.path.dirname(os.path.abspath(__file__))
+    parts = [str(CACHE_FORMAT), f"{sys.version_info[0]}.{sys.version_info[1]}"]
+    parts.extend(hash_file(os.path.join(src_dir, name)) for name in PARSER_MODULES)
+    return hash_bytes("\0".join(parts).encode('utf-8'))
+
+def encode_tree(node: HTMLNode) -> tuple:
+    """Flatten a node tree into nested tuples that marshal can store"""
+    # Import here to avoid circular imports
+    from markdown_html import EmptyDivNode, RenderedBlockNode
+
+    if isinstance(node, RenderedBlockNode):
+        return encode_tree(node.node)
+    if isinstance(node, EmptyDivNode):
+        return (_EMPTY_DIV,)
+    if isinstance(node, LeafNode):
+        return (_LEAF, node.tag, node.value, node.props)
+    if isinstance(node, ParentNode):
+        return (_PARENT, node.tag, node.props, tuple(encode_tree(child) for child in node.children))
+    raise TypeError(f"Cannot serialize {type(node).__name__}")
+
+def decode_tree(data: tuple) -> HTMLNode:
+    """Rebuild the node tree produced by encode_tree"""
+    kind = data[0]
+    if kind == _LEAF:
+        return LeafNode(data[1], data[2], data[3])
+    if kind == _PARENT:
+        return ParentNode(data[1], [decode_tree(child) for child in data[3]], data[2])
+    # Import here to avoid circular imports
+    from markdown_html import EmptyDivNode
+    return EmptyDivNode()
+
+class ParseCache:
+    """
+    On-disk cache of parsed markdown documents, keyed by source hash.
+
+    Entries live in a subdirectory named after parser_version(), so a change
+    to the parser code starts a fresh directory and the old one is deleted.
+    Each entry is a zlib-compressed marshal dump of the encoded node tree
+    and the page's metadata.
+    prune() evicts the least recently used entries once the cache grows past
+    max_bytes.
+    """
+    def __init__(self, directory: str, max_bytes: int = 64 * 1024 * 1024, version: str = None):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.version = version or parser_version()
+        self.path = os.path.join(directory, self.version[:16])
+        self.hits = 0
+        self.misses = 0
+
+    def _entry_path(self, source_hash: str) -> str:
+        return os.path.join(self.path, source_hash[:2], source_hash + ".bin")
+
+    def get(self, source_hash: str) -> tuple[HTMLNode, PageMetadata]:
+        """Return the cached (tree, metadata) for a source, or None"""
+        path = self._entry_path(source_hash)
+        try:
+            with open(path, 'rb') as f:
+                data = f.read()
+            tree, metadata = marshal.loads(zlib.decompress(data))
+            entry = (decode_tree(tree), PageMetadata(*metadata))
+        except (OSError, ValueError, EOFError, TypeError, IndexError, zlib.error):
+            self.misses += 1
+            return None
+        # Mark the entry as recently used for prune()
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        self.hits += 1
+        return entry
+
+    def put(self, source_hash: str, node: HTMLNode, metadata: PageMetadata):
+        """Store the tree and metadata for a source; entries that cannot be serialized are skipped"""
+        meta = (metadata.title, metadata.date, metadata.tags, metadata.words, metadata.front_matter)
+        try:
+            data = zlib.compress(marshal.dumps((encode_tree(node), meta)), 1)
+        except (TypeError, ValueError):
+            return
+        path = self._entry_path(source_hash)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # A per-process temporary file, so concurrent workers never see a partial entry
+        write_atomic(path, lambda f: f.write(data), binary=True, unique=True)
+
+    def prune(self) -> int:
+        """
+        Delete entries of other parser versions and evict the least recently
+        used entries beyond max_bytes.
+
+        Returns:
+            The number of entries removed
+        """
+        removed = 0
+        if os.path.isdir(self.directory):
+            for name in os.listdir(self.directory):
+                other = os.path.join(self.directory, name)
+                if other != self.path and os.path.isdir(other):
+                    shutil.rmtree(other, ignore_errors=True)
+
+        entries = []
+        total = 0
+        for dirpath, _, filenames in os.walk(self.path):
+            for name in filenames:
+                path = os.path.join(dirpath, name)
+                try:
+                    stat = os.stat(path)
+                except FileNotFoundError:
+                    continue
+                entries.append((stat.st_mtime_ns, stat.st_size, path))
+                total += stat.st_size
+        entries.sort()
+        for _, size, path in entries:
+            if total <= self.max_bytes:
+                break
+            os.remove(path)
+            total -= size
+            removed += 1
+        return removed
+
+    def stats(self) -> dict:
+        return {"hits": self.hits, "misses": self.misses}
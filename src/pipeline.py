@@ -0,0 +1,128 @@
+import queue
+import threading
+import time
+
+from profiling import NO_TIMER
+
+# Pages allowed to wait between two stages; bounds the memory held by the pipeline
+PIPELINE_DEPTH = 16
+
+# Threads reading sources and, separately, threads writing pages
+IO_THREADS = 2
+
+_DONE = object()
+
+def generate_pages_pipelined(pages: list[tuple[str, str]], template_path: str, basepath: str, depth: int = PIPELINE_DEPTH,
+                             io_threads: int = IO_THREADS, profile=None, parse_cache=None, changes=None, assets=None, image_sizes=None, minify=False, prefetch=None) -> list[tuple[str, str]]:
+    """
+    Generate pages with reading and writing overlapped with parsing.
+
+    Reader threads prefetch markdown sources into a bounded queue, this thread
+    parses and renders each page to a string, and writer threads drain the
+    finished pages to disk from a second bounded queue. At most about
+    2 * depth pages are held in memory at once. The output is identical to
+    generate_page.
+
+    Args:
+        pages: (markdown path, html path) pairs to generate
+        template_path: Path to the HTML template file
+        basepath: Base path for the site
+        depth: Capacity of each queue between stages
+        io_threads: Number of reader threads and of writer threads
+        profile: Optional BuildProfile that receives per-stage timings
+        parse_cache: Optional ParseCache of previously parsed documents
+        changes: Optional ChangeReport that records how each page's file changed
+        assets: Optional map of static asset path to fingerprinted path
+        image_sizes: Optional map of static image path to (width, height)
+        minify: Whether to minify the generated HTML
+        prefetch: Optional map of markdown path to the URLs that page gets prefetch hints for
+
+    Returns:
+        A list of (markdown path, error message) pairs for the pages that failed
+    """
+    # Import here to avoid circular imports
+    from main import read_source, render_page, write_output
+    from template import load_template
+
+    if not pages:
+        return []
+
+    sources = queue.Queue(maxsize=depth)
+    rendered = queue.Queue(maxsize=depth)
+    failures = []
+    remaining = iter(pages)
+    remaining_lock = threading.Lock()
+    stop = threading.Event()
+
+    def read_loop():
+        while not stop.is_set():
+            with remaining_lock:
+                page = next(remaining, None)
+            if page is None:
+                break
+            started = time.perf_counter()
+            try:
+                content, error = read_source(page[0]), None
+            except Exception as e:
+                content, error = None, f"{type(e).__name__}: {e}"
+            sources.put((page, content, error, time.perf_counter() - started))
+        sources.put(_DONE)
+
+    def write_loop():
+        while True:
+            item = rendered.get()
+            if item is _DONE:
+                return
+            (from_path, dest_path), html, timer = item
+            try:
+                with timer.stage("write"):
+                    status = write_output(dest_path, html)
+            except Exception as e:
+                failures.append((from_path, f"{type(e).__name__}: {e}"))
+                continue
+            if changes is not None:
+                changes.record(dest_path, status)
+
+    readers = [threading.Thread(target=read_loop, daemon=True) for _ in range(io_threads)]
+    writers = [threading.Thread(target=write_loop, daemon=True) for _ in range(io_threads)]
+    for thread in readers + writers:
+        thread.start()
+
+    try:
+        finished_readers = 0
+        while finished_readers < len(readers):
+            item = sources.get()
+            if item is _DONE:
+                finished_readers += 1
+                continue
+            page, content, error, read_seconds = item
+            from_path, dest_path = page
+            if error is not None:
+                failures.append((from_path, error))
+                continue
+            print(f"Generating page from {from_path} to {dest_path} using {template_path}")
+            timer = profile.page(from_path) if profile is not None else NO_TIMER
+            if timer.enabled:
+                timer.stages["read"] += read_seconds
+            try:
+                with timer.stage("template"):
+                    template = load_template(template_path, basepath, assets)
+                html = render_page(content, template, basepath, timer, parse_cache, image_sizes, minify,
+                                   prefetch.get(from_path) if prefetch is not None else None)
+            except Exception as e:
+                failures.append((from_path, f"{type(e).__name__}: {e}"))
+                continue
+            rendered.put((page, html, timer))
+    finally:
+        # On an early exit, let blocked readers finish instead of waiting on a full queue
+        stop.set()
+        while any(thread.is_alive() for thread in readers):
+            try:
+                sources.get(timeout=0.01)
+            except queue.Empty:
+                pass
+        for _ in writers:
+            rendered.put(_DONE)
+        for thread in writers:
+            thread.join()
+    return failures
@@ -0,0 +1,142 @@
+import contextlib
+import json
+import math
+import os
+import time
+
+# The stages of generating one page, in pipeline order
+STAGES = ("read", "blocks", "inline", "render", "template", "write")
+
+_NULL_CONTEXT = contextlib.nullcontext()
+
+class NullTimer:
+    """Stand-in for PageTimer when profiling is off; every stage is a no-op"""
+    enabled = False
+
+    def stage(self, name: str):
+        return _NULL_CONTEXT
+
+NO_TIMER = NullTimer()
+
+class PageTimer:
+    """Accumulates the time one page spends in each build stage"""
+    enabled = True
+
+    def __init__(self):
+        self.stages = dict.fromkeys(STAGES, 0.0)
+
+    @contextlib.contextmanager
+    def stage(self, name: str):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.stages[name] += time.perf_counter() - started
+
+def percentile(sorted_values: list[float], fraction: float) -> float:
+    """Nearest-rank percentile of an already sorted list (0.0 for an empty list)"""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(fraction * len(sorted_values)))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+def _summarize(values: list[float]) -> dict:
+    """Total, mean, percentiles and max of a list of durations, in milliseconds"""
+    values = sorted(values)
+    total = sum(values)
+    return {
+        "total": round(total * 1000, 3),
+        "mean": round(total * 1000 / len(values), 3) if values else 0.0,
+        "p50": round(percentile(values, 0.50) * 1000, 3),
+        "p90": round(percentile(values, 0.90) * 1000, 3),
+        "p99": round(percentile(values, 0.99) * 1000, 3),
+        "max": round(values[-1] * 1000, 3) if values else 0.0,
+    }
+
+class BuildProfile:
+    """
+    Per-page stage timings and whole-build phase timings for one build.
+
+    Pages are timed with a PageTimer from page(), or added from a worker
+    process with add(). Phases such as static syncing are timed with phase(),
+    and counters holds any cache statistics worth reporting alongside.
+    """
+    def __init__(self):
+        self.pages = {}
+        self.phases = {}
+        self.counters = {}
+
+    def page(self, path: str) -> PageTimer:
+        timer = PageTimer()
+        self.pages[path] = timer.stages
+        return timer
+
+    def add(self, path: str, stages: dict):
+        self.pages[path] = stages
+
+    @contextlib.contextmanager
+    def phase(self, name: str):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phases[name] = self.phases.get(name, 0.0) + time.perf_counter() - started
+
+    def report(self, top: int = 10) -> dict:
+        """
+        Aggregate the timings.
+
+        Args:
+            top: Number of slowest pages to list
+
+        Returns:
+            A JSON-serializable dict; all durations are in milliseconds
+        """
+        totals = {path: sum(stages.values()) for path, stages in self.pages.items()}
+        slowest = sorted(totals, key=totals.get, reverse=True)[:top]
+        return {
+            "unit": "ms",
+            "pages": len(self.pages),
+            "phases": {name: round(seconds * 1000, 3) for name, seconds in self.phases.items()},
+            "counters": self.counters,
+            "stages": {stage: _summarize([stages.get(stage, 0.0) for stages in self.pages.values()]) for stage in STAGES},
+            "page_total": _summarize(list(totals.values())),
+            "slowest": [
+                {
+                    "path": path,
+                    "total": round(totals[path] * 1000, 3),
+                    "stages": {stage: round(seconds * 1000, 3) for stage, seconds in self.pages[path].items()},
+                }
+                for path in slowest
+            ],
+        }
+
+    def save(self, path: str, top: int = 10) -> dict:
+        """Write the report as JSON to path and return it"""
+        report = self.report(top)
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+            f.write("\n")
+        return report
+
+def format_report(report: dict) -> str:
+    """A short human-readable table of a report from BuildProfile.report()"""
+    lines = [f"Profiled {report['pages']} page(s)"]
+    for name, ms in report["phases"].items():
+        lines.append(f"  {name:<10} {ms:10.1f} ms")
+    lines.append(f"  {'stage':<10} {'total':>10} {'p50':>9} {'p90':>9} {'p99':>9} {'max':>9}")
+    for stage, summary in list(report["stages"].items()) + [("page", report["page_total"])]:
+        lines.append(
+            f"  {stage:<10} {summary['total']:10.1f} {summary['p50']:9.2f} {summary['p90']:9.2f} "
+            f"{summary['p99']:9.2f} {summary['max']:9.2f}"
+        )
+    for name, counters in report.get("counters", {}).items():
+        lines.append(f"  {name}: " + ", ".join(f"{key} {value}" for key, value in counters.items()))
+    if report["slowest"]:
+        lines.append("  Slowest pages:")
+        for page in report["slowest"]:
+            lines.append(f"  {page['total']:10.2f} ms  {page['path']}")
+    return "\n".join(lines)
@@ -0,0 +1,206 @@
+import os
+import shutil
+
+from changes import ADDED, CHANGED, UNCHANGED, write_atomic, write_if_changed
+from manifest import hash_file
+
+# Files at least this large are copied with in-kernel zero-copy primitives
+ZERO_COPY_THRESHOLD = 1 << 20
+
+class SyncReport:
+    """Lists of destination paths touched by a sync, by outcome"""
+    def __init__(self):
+        self.copied = []
+        self.unchanged = []
+        self.removed = []
+
+    def __repr__(self):
+        return f"SyncReport({len(self.copied)} copied, {len(self.unchanged)} unchanged, {len(self.removed)} removed)"
+
+def _walk_files(root: str):
+    """Yield the paths of all files below root, relative to root"""
+    stack = [""]
+    while stack:
+        rel_dir = stack.pop()
+        with os.scandir(os.path.join(root, rel_dir)) as entries:
+            for entry in entries:
+                rel_path = os.path.join(rel_dir, entry.name)
+                if entry.is_dir(follow_symlinks=False):
+                    stack.append(rel_path)
+                elif entry.is_file():
+                    yield rel_path
+
+def _is_unchanged(src_stat: os.stat_result, src_path: str, dest_path: str, use_hash: bool) -> bool:
+    """Decide whether dest_path already holds the contents of src_path"""
+    try:
+        dest_stat = os.stat(dest_path)
+    except FileNotFoundError:
+        return False
+    if (src_stat.st_dev, src_stat.st_ino) == (dest_stat.st_dev, dest_stat.st_ino):
+        return True
+    if src_stat.st_size != dest_stat.st_size:
+        return False
+    if src_stat.st_mtime_ns == dest_stat.st_mtime_ns:
+        return True
+    if use_hash and hash_file(src_path) == hash_file(dest_path):
+        # Same bytes, just a different timestamp: adopt the source mtime instead of copying
+        os.utime(dest_path, ns=(dest_stat.st_atime_ns, src_stat.st_mtime_ns))
+        return True
+    return False
+
+def _zero_copy(src_file, dest_file, size: int):
+    """Copy size bytes between open files without moving them through user space"""
+    src_fd, dest_fd = src_file.fileno(), dest_file.fileno()
+    offset = 0
+    if hasattr(os, "copy_file_range"):
+        try:
+            while offset < size:
+                sent = os.copy_file_range(src_fd, dest_fd, size - offset)
+                if sent == 0:
+                    break
+                offset += sent
+            return
+        except OSError:
+            # Not supported across these filesystems; continue with sendfile
+            pass
+    while offset < size:
+        sent = os.sendfile(dest_fd, src_fd, offset, size - offset)
+        if sent == 0:
+            break
+        offset += sent
+
+def copy_file(src_path: str, dest_path: str, size: int = None):
+    """
+    Copy a file's contents and mtime to dest_path, replacing it atomically.
+
+    Large files use os.copy_file_range or os.sendfile where available.
+    """
+    if size is None:
+        size = os.path.getsize(src_path)
+    def copy(dest_file):
+        with open(src_path, 'rb') as src_file:
+            if size >= ZERO_COPY_THRESHOLD and hasattr(os, "sendfile"):
+                _zero_copy(src_file, dest_file, size)
+            else:
+                shutil.copyfileobj(src_file, dest_file)
+
+    def replace(tmp_path, dest_path):
+        shutil.copystat(src_path, tmp_path)
+        os.replace(tmp_path, dest_path)
+    write_atomic(dest_path, copy, binary=True, replace=replace)
+
+def _link_file(src_path: str, dest_path: str):
+    """Hard-link src_path to dest_path, falling back to a copy across filesystems"""
+    tmp_path = dest_path + ".tmp"
+    try:
+        if os.path.lexists(tmp_path):
+            os.remove(tmp_path)
+        os.link(src_path, tmp_path)
+    except OSError:
+        copy_file(src_path, dest_path)
+        return
+    os.replace(tmp_path, dest_path)
+
+def sync_directory(src_dir: str, dest_dir: str, previous: dict = None, use_hash: bool = False, hardlink: bool = False, changes=None, rename=None, transform=None) -> tuple[SyncReport, dict]:
+    """
+    Make dest_dir contain the files of src_dir, copying only what changed.
+
+    A file is considered unchanged when the destination has the same size and
+    mtime (or, with use_hash, the same content). Files that were synced
+    previously but no longer exist in src_dir are removed; anything else in
+    dest_dir, such as generated pages, is left alone.
+
+    Args:
+        src_dir: Path to the static directory
+        dest_dir: Path to the output directory
+        previous: Mapping of destination path to source path from the last sync
+        use_hash: Compare file contents when size matches but mtime differs
+        hardlink: Hard-link files instead of copying them
+        changes: Optional ChangeReport that records every asset as added, changed, unchanged or removed
+        rename: Optional function mapping a file's path relative to src_dir to its path relative to dest_dir
+        transform: Optional function returning the bytes to write for a file's path relative to
+            src_dir, or None to copy the file as it is
+
+    Returns:
+        The SyncReport, and the mapping of destination path to source path to persist
+    """
+    report = SyncReport()
+    synced = {}
+    os.makedirs(dest_dir, exist_ok=True)
+
+    if os.path.exists(src_dir):
+        created_dirs = set()
+        for rel_path in _walk_files(src_dir):
+            src_path = os.path.join(src_dir, rel_path)
+            dest_path = os.path.join(dest_dir, rename(rel_path) if rename is not None else rel_path)
+            synced[dest_path] = src_path
+
+            data = transform(rel_path) if transform is not None else None
+            if data is not None:
+                parent = os.path.dirname(dest_path)
+                if parent not in created_dirs:
+                    os.makedirs(parent, exist_ok=True)
+                    created_dirs.add(parent)
+                status = write_if_changed(dest_path, data)
+                (report.unchanged if status == UNCHANGED else report.copied).append(dest_path)
+                if changes is not None:
+                    changes.record(dest_path, status, len(data))
+                continue
+
+            src_stat = os.stat(src_path)
+            if _is_unchanged(src_stat, src_path, dest_path, use_hash):
+                report.unchanged.append(dest_path)
+                if changes is not None:
+                    changes.record(dest_path, UNCHANGED, src_stat.st_size)
+                continue
+            if changes is not None:
+                status = CHANGED if os.path.lexists(dest_path) else ADDED
+
+            parent = os.path.dirname(dest_path)
+            if parent not in created_dirs:
+                os.makedirs(parent, exist_ok=True)
+                created_dirs.add(parent)
+            if hardlink:
+                _link_file(src_path, dest_path)
+            else:
+                copy_file(src_path, dest_path, src_stat.st_size)
+            report.copied.append(dest_path)
+            if changes is not None:
+                changes.record(dest_path, status, src_stat.st_size)
+
+    for dest_path in sorted(set(previous or {}) - set(synced)):
+        if os.path.exists(dest_path):
+            if changes is not None:
+                changes.remove(dest_path)
+            else:
+                os.remove(dest_path)
+        report.removed.append(dest_path)
+
+    return report, synced
+
+def sync_static_to_public(src_path="static", dest_path="docs", manifest=None, use_hash=False, hardlink=False, changes=None, rename=None, transform=None) -> SyncReport:
+    """
+    Incrementally sync static assets into the output directory.
+
+    Args:
+        src_path: Path to the static directory
+        dest_path: Path to the output directory
+        manifest: Optional BuildManifest used to remember which files are static assets
+        use_hash: Compare file contents when size matches but mtime differs
+        hardlink: Hard-link assets instead of copying them
+        changes: Optional ChangeReport that records what happened to every asset
+        rename: Optional function giving each asset's relative path in the output (e.g. fingerprinted names)
+        transform: Optional function giving the processed bytes of an asset (e.g. minified CSS), or None
+    """
+    print(f"Syncing '{src_path}' to '{dest_path}'")
+    previous = manifest.assets if manifest is not None else None
+    report, synced = sync_directory(src_path, dest_path, previous, use_hash, hardlink, changes, rename, transform)
+    if manifest is not None:
+        manifest.assets = synced
+
+    for path in report.copied:
+        print(f"Copied file: {path}")
+    for path in report.removed:
+        print(f"Removed stale file: {path}")
+    print(f"Finished syncing: {len(report.copied)} copied, {len(report.unchanged)} unchanged, {len(report.removed)} removed")
+    return report
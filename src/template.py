@@ -0,0 +1,113 @@
+import os
+import re
+
+_PLACEHOLDER_RE = re.compile(r"\{\{ (\w+) \}\}")
+
+# A complete root-relative href/src value, split into path and any query or fragment
+_ROOT_URL_RE = re.compile(r'(href|src)="/([^"?#]*)([^"]*)"')
+
+def rewrite_root_urls(html: str, basepath: str, assets: dict = None) -> str:
+    """
+    Prefix root-relative href and src attributes with the site basepath.
+
+    Args:
+        html: The HTML to rewrite
+        basepath: Base path for the site (e.g., "/" or "/blog/")
+        assets: Optional map of asset path (without the leading "/") to its
+            fingerprinted path; matching references are pointed at the latter
+    """
+    if assets:
+        def replace(match):
+            path = match.group(2)
+            return f'{match.group(1)}="{basepath}{assets.get(path, path)}{match.group(3)}"'
+        return _ROOT_URL_RE.sub(replace, html)
+    if basepath == "/":
+        return html
+    html = html.replace('href="/', f'href="{basepath}')
+    return html.replace('src="/', f'src="{basepath}')
+
+class CompiledTemplate:
+    """
+    A page template split into static segments and named slots.
+
+    Writing a page streams the pieces with every slot filled in, so the cost of
+    a page is the cost of copying its content rather than of rescanning the
+    document.
+    assets is the asset map the template's own links were compiled with, for
+    resolving the URLs in the page content the same way.
+    """
+    def __init__(self, pieces: list[str], slots: dict[str, list[int]], assets: dict = None):
+        self.pieces = pieces
+        self.slots = slots
+        self.assets = assets
+        self._slot_at = {position: name for name, positions in slots.items() for position in positions}
+
+    def write(self, out, values: dict):
+        """
+        Stream the rendered template into a file-like object.
+
+        A slot value may be a string, or a callable that writes the value to
+        out itself, so large content never has to exist as one string.
+        """
+        for position, piece in enumerate(self.pieces):
+            name = self._slot_at.get(position)
+            if name is None:
+                out.write(piece)
+                continue
+            value = values[name]
+            if callable(value):
+                value(out)
+            else:
+                out.write(value)
+
+    def __repr__(self):
+        return f"CompiledTemplate({len(self.pieces)} pieces, slots={sorted(self.slots)})"
+
+def compile_template(template: str, basepath: str = "/", slot_names=("Title", "Content"), assets: dict = None) -> CompiledTemplate:
+    """
+    Compile template text into static segments and slots.
+
+    The template's own root-relative links are rewritten for basepath here,
+    once, instead of on every rendered page.
+
+    Args:
+        template: The template text
+        basepath: Base path for the site (e.g., "/" or "/blog/")
+        slot_names: Placeholders that become slots; any others are kept as text
+        assets: Optional map of asset path to fingerprinted path (see rewrite_root_urls)
+    """
+    pieces = []
+    slots = {}
+    text = ""
+    position = 0
+    for match in _PLACEHOLDER_RE.finditer(template):
+        name = match.group(1)
+        if name not in slot_names:
+            continue
+        text += template[position:match.start()]
+        pieces.append(rewrite_root_urls(text, basepath, assets))
+        slots.setdefault(name, []).append(len(pieces))
+        pieces.append("")
+        text = ""
+        position = match.end()
+    pieces.append(rewrite_root_urls(text + template[position:], basepath, assets))
+    return CompiledTemplate(pieces, slots, assets)
+
+_template_cache = {}
+
+def load_template(template_path: str, basepath: str = "/", assets: dict = None) -> CompiledTemplate:
+    """
+    Return the compiled template for a file, compiling it at most once per change.
+
+    The cache is keyed by path, basepath, asset map, size and mtime, so an
+    edited template is picked up without restarting a long-running build.
+    """
+    stat = os.stat(template_path)
+    key = (os.path.abspath(template_path), basepath, id(assets), stat.st_size, stat.st_mtime_ns)
+    compiled = _template_cache.get(key)
+    if compiled is None or compiled.assets is not assets:
+        with open(template_path, 'r', encoding='utf-8') as f:
+            compiled = compile_template(f.read(), basepath, assets=assets)
+        _template_cache.clear()
+        _template_cache[key] = compiled
+    return compiled
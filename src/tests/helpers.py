@@ -0,0 +1,42 @@
+import os
+import tempfile
+import unittest
+
+# A template that links a stylesheet, as the site's own does
+TEMPLATE = '<html><head><title>{{ Title }}</title><link href="/index.css"></head><body>{{ Content }}</body></html>'
+
+
+def write_file(path, data):
+    """Write text or bytes to path, creating its directory first, and return the path"""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    if isinstance(data, bytes):
+        with open(path, 'wb') as f:
+            f.write(data)
+    else:
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(data)
+    return path
+
+
+def read_tree(root):
+    """Map the path of every file below root, relative to root, to its bytes"""
+    files = {}
+    for dirpath, _, filenames in os.walk(root):
+        for name in filenames:
+            path = os.path.join(dirpath, name)
+            with open(path, 'rb') as f:
+                files[os.path.relpath(path, root)] = f.read()
+    return files
+
+
+class TempDirTestCase(unittest.TestCase):
+    """A test case with a fresh temporary directory, self.root, removed after every test"""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.root = self.tmp.name
+
+    def _write(self, relpath, data):
+        """Write text or bytes to a path relative to self.root and return its full path"""
+        return write_file(os.path.join(self.root, relpath), data)
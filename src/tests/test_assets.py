@@ -0,0 +1,64 @@
+import json
+import os
+import unittest
+
+from assets import (
+    ASSET_MANIFEST_NAME, HEADERS_NAME, IMMUTABLE_CACHE_CONTROL, asset_renamer, build_asset_map,
+    fingerprinted_name, remove_asset_metadata, write_asset_manifest, write_headers,
+)
+from helpers import TempDirTestCase
+from main import generate_pages_recursive
+from manifest import hash_file
+from static_sync import sync_directory
+
+
+class TestAssetFingerprinting(TempDirTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.static = os.path.join(self.root, "static")
+        self.docs = os.path.join(self.root, "docs")
+        self._write("static/index.css", "body {}")
+        self._write("static/images/a.png", "png")
+        self._write("template.html", '<link href="/index.css"><title>{{ Title }}</title>{{ Content }}')
+        self._write("content/index.md", "# Home\n\n![a](/images/a.png) and [blog](/blog)")
+
+    def test_fingerprinted_name(self):
+        self.assertEqual(fingerprinted_name("images/a.png", "0123456789abcdef"), "images/a.0123456789.png")
+
+    def test_asset_map_follows_content(self):
+        assets = build_asset_map(self.static)
+        digest = hash_file(os.path.join(self.static, "index.css"))
+        self.assertEqual(assets["index.css"], fingerprinted_name("index.css", digest))
+        self._write("static/index.css", "body { margin: 0 }")
+        self.assertNotEqual(build_asset_map(self.static)["index.css"], assets["index.css"])
+        self.assertEqual(build_asset_map(self.static)["images/a.png"], assets["images/a.png"])
+
+    def test_fingerprinted_build(self):
+        assets = build_asset_map(self.static)
+        sync_directory(self.static, self.docs, rename=asset_renamer(assets))
+        generate_pages_recursive(os.path.join(self.root, "content"), os.path.join(self.root, "template.html"), self.docs, "/site/", assets=assets)
+        write_asset_manifest(self.docs, assets)
+        write_headers(self.docs, assets, "/site/")
+
+        for hashed in assets.values():
+            self.assertTrue(os.path.exists(os.path.join(self.docs, hashed)))
+        self.assertFalse(os.path.exists(os.path.join(self.docs, "index.css")))
+        with open(os.path.join(self.docs, "index.html"), 'r', encoding='utf-8') as f:
+            page = f.read()
+        self.assertIn(f'href="/site/{assets["index.css"]}"', page)
+        self.assertIn(f'src="/site/{assets["images/a.png"]}"', page)
+        self.assertIn('href="/site/blog"', page)
+        with open(os.path.join(self.docs, ASSET_MANIFEST_NAME), 'r', encoding='utf-8') as f:
+            self.assertEqual(json.load(f), assets)
+        with open(os.path.join(self.docs, HEADERS_NAME), 'r', encoding='utf-8') as f:
+            headers = f.read()
+        self.assertIn(f"/site/{assets['index.css']}\n  Cache-Control: {IMMUTABLE_CACHE_CONTROL}\n", headers)
+
+        remove_asset_metadata(self.docs, {})
+        self.assertFalse(os.path.exists(os.path.join(self.docs, ASSET_MANIFEST_NAME)))
+        self.assertFalse(os.path.exists(os.path.join(self.docs, HEADERS_NAME)))
+
+
+if __name__ == "__main__":
+    unittest.main()
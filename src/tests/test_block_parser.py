@@ -0,0 +1,97 @@
+import unittest
+
+from block_parser import parse_blocks
+from blocknode import Block, BlockType
+from main import block_to_block_type
+from markdown_utils import markdown_to_blocks
+
+
+class TestParseBlocks(unittest.TestCase):
+
+    def test_typed_blocks_with_line_ranges(self):
+        """Test that blocks carry their type, line range and content"""
+        md = "# Title\n\nSome **text**\non two lines\n\n- one\n- two\n"
+        self.assertEqual(parse_blocks(md), [
+            Block(BlockType.HEADING, 1, 1, "# Title"),
+            Block(BlockType.PARAGRAPH, 3, 4, "Some **text**\non two lines"),
+            Block(BlockType.UNORDERED_LIST, 6, 7, "- one\n- two"),
+        ])
+
+    def test_matches_markdown_to_blocks(self):
+        """Test agreement with markdown_to_blocks plus block_to_block_type"""
+        md = """
+# Main Title
+
+This is a paragraph with **bold** and _italic_ text.
+## Subtitle mixed in
+
+- List item one
+- List item two
+
+```
+def hello():
+    print("Hello")
+```
+
+> This is a quote
+>
+> with multiple lines
+
+1. Numbered item
+2. Another numbered item
+
+####### not a heading
+"""
+        expected = [(block_to_block_type(block), block) for block in markdown_to_blocks(md)]
+        self.assertEqual([(block.type, block.content) for block in parse_blocks(md)], expected)
+
+    def test_code_block_keeps_blank_lines(self):
+        """Test that a fenced block runs to its closing fence across blank lines"""
+        md = "```\ndef f():\n\n    return 1\n```\n\nafter"
+        self.assertEqual(parse_blocks(md), [
+            Block(BlockType.CODE, 1, 5, "```\ndef f():\n\n    return 1\n```"),
+            Block(BlockType.PARAGRAPH, 7, 7, "after"),
+        ])
+
+    def test_unclosed_fence_falls_back_to_paragraph(self):
+        """Test that an opening fence without a closing fence is treated like before"""
+        md = "```python\nprint(1)"
+        self.assertEqual(parse_blocks(md), [Block(BlockType.PARAGRAPH, 1, 2, "```python\nprint(1)")])
+
+    def test_one_line_fence_opens_nothing(self):
+        """Test that a fence closed on its own line does not swallow the blocks after it"""
+        md = "``` x ```\nmore\n\ntext\n\n```\ncode\n```"
+        self.assertEqual(parse_blocks(md), [
+            Block(BlockType.PARAGRAPH, 1, 2, "``` x ```\nmore"),
+            Block(BlockType.PARAGRAPH, 4, 4, "text"),
+            Block(BlockType.CODE, 6, 8, "```\ncode\n```"),
+        ])
+        expected = [(block_to_block_type(block), block) for block in markdown_to_blocks(md)]
+        self.assertEqual([(block.type, block.content) for block in parse_blocks(md)], expected)
+
+    def test_fence_closed_within_its_group_keeps_the_group(self):
+        """Test that a fence closed before the next blank line groups the lines like markdown_to_blocks"""
+        for md in ("```\ncode\n```\n  indented after", "```py\n ```\n```\ntext", " ```\n```  \n#nope"):
+            with self.subTest(md=md):
+                expected = [(block_to_block_type(block), block) for block in markdown_to_blocks(md)]
+                self.assertEqual([(block.type, block.content) for block in parse_blocks(md)], expected)
+        self.assertEqual(parse_blocks("```\ncode\n```\n  indented after"), [
+            Block(BlockType.PARAGRAPH, 1, 4, "```\ncode\n```\nindented after"),
+        ])
+
+    def test_fence_across_blank_lines_ends_at_its_closing_line(self):
+        """Test that lines after the closing fence of a block spanning blank lines start a new block"""
+        md = "```\na\n\nb\n```\nafter\n- not a list"
+        self.assertEqual(parse_blocks(md), [
+            Block(BlockType.CODE, 1, 5, "```\na\n\nb\n```"),
+            Block(BlockType.PARAGRAPH, 6, 7, "after\n- not a list"),
+        ])
+
+    def test_empty_and_whitespace(self):
+        """Test documents without blocks"""
+        self.assertEqual(parse_blocks(""), [])
+        self.assertEqual(parse_blocks("  \n\t\n  "), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
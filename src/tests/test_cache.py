@@ -0,0 +1,49 @@
+import unittest
+
+from cache import LRUCache
+
+
+class TestLRUCache(unittest.TestCase):
+
+    def test_get_and_counters(self):
+        cache = LRUCache(max_entries=2)
+        cache.put("a", 1)
+        self.assertEqual(cache.get("a"), 1)
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual((cache.hits, cache.misses), (1, 1))
+
+    def test_evicts_least_recently_used(self):
+        cache = LRUCache(max_entries=2)
+        cache.put("a", 1)
+        cache.put("b", 2)
+        cache.get("a")
+        cache.put("c", 3)
+        self.assertIn("a", cache)
+        self.assertNotIn("b", cache)
+        self.assertEqual(cache.evictions, 1)
+
+    def test_size_bound(self):
+        cache = LRUCache(max_bytes=10)
+        cache.put("a", "12345")
+        cache.put("b", "12345")
+        cache.put("c", "1")
+        self.assertNotIn("a", cache)
+        self.assertEqual(cache.total_bytes, 6)
+
+    def test_oversized_value_is_not_cached(self):
+        cache = LRUCache(max_bytes=4)
+        cache.put("a", "12")
+        cache.put("big", "123456")
+        self.assertIn("a", cache)
+        self.assertNotIn("big", cache)
+
+    def test_replacing_a_key_updates_size(self):
+        cache = LRUCache(max_bytes=10)
+        cache.put("a", "12345")
+        cache.put("a", "12")
+        self.assertEqual(cache.total_bytes, 2)
+        self.assertEqual(len(cache), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,98 @@
+import os
+import unittest
+
+from changes import ADDED, CHANGED, REMOVED, UNCHANGED, ChangeReport, replace_if_changed, write_atomic, write_if_changed
+from helpers import TempDirTestCase
+from main import generate_pages_recursive
+from static_sync import sync_directory
+
+TEMPLATE = "<title>{{ Title }}</title>{{ Content }}"
+
+
+class TestWriteIfChanged(TempDirTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.path = os.path.join(self.tmp.name, "page.html")
+
+    def test_statuses_and_mtime(self):
+        self.assertEqual(write_if_changed(self.path, b"<p>a</p>"), ADDED)
+        os.utime(self.path, ns=(1, 1))
+        self.assertEqual(write_if_changed(self.path, b"<p>a</p>"), UNCHANGED)
+        self.assertEqual(os.stat(self.path).st_mtime_ns, 1)
+        self.assertEqual(write_if_changed(self.path, b"<p>b</p>"), CHANGED)
+        with open(self.path, 'rb') as f:
+            self.assertEqual(f.read(), b"<p>b</p>")
+        self.assertFalse(os.path.exists(self.path + ".tmp"))
+
+    def test_replace_if_changed(self):
+        write_if_changed(self.path, b"same")
+        os.utime(self.path, ns=(1, 1))
+        tmp_path = self.path + ".tmp"
+        for data, expected in ((b"same", UNCHANGED), (b"diff", CHANGED), (b"longer", CHANGED)):
+            with open(tmp_path, 'wb') as f:
+                f.write(data)
+            self.assertEqual(replace_if_changed(tmp_path, self.path), expected)
+            self.assertFalse(os.path.exists(tmp_path))
+        self.assertEqual(os.path.getsize(self.path), 6)
+
+    def test_failed_open_keeps_original_error(self):
+        with self.assertRaises(FileNotFoundError) as raised:
+            write_if_changed(os.path.join(self.tmp.name, "missing", "page.html"), b"x")
+        # Not the error of removing a temporary file that was never created
+        self.assertIsNone(raised.exception.__context__)
+
+
+    def test_write_atomic_failure_keeps_original(self):
+        """Test that a write that fails part way leaves the old file and no temporary file"""
+        write_if_changed(self.path, b"old")
+
+        def write(f):
+            f.write("partial")
+            raise ValueError("render failed")
+        for unique in (False, True):
+            with self.assertRaisesRegex(ValueError, "render failed"):
+                write_atomic(self.path, write, unique=unique)
+        with open(self.path, 'rb') as f:
+            self.assertEqual(f.read(), b"old")
+        self.assertEqual(os.listdir(self.tmp.name), ["page.html"])
+        self.assertEqual(write_atomic(self.path, lambda f: f.write("new"), replace=replace_if_changed), CHANGED)
+
+class TestChangeReport(TempDirTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.content = os.path.join(self.root, "content")
+        self.static = os.path.join(self.root, "static")
+        self.docs = os.path.join(self.root, "docs")
+        self.template = os.path.join(self.root, "template.html")
+        self._write("template.html", TEMPLATE)
+        self._write("content/index.md", "# Home")
+        self._write("content/about/index.md", "# About")
+        self._write("static/index.css", "body {}")
+
+    def _build(self, previous_assets=None):
+        changes = ChangeReport()
+        _, synced = sync_directory(self.static, self.docs, previous_assets, changes=changes)
+        generate_pages_recursive(self.content, self.template, self.docs, changes=changes)
+        return changes, synced
+
+    def test_rebuild_reports_changes_and_keeps_identical_files(self):
+        first, synced = self._build()
+        self.assertEqual(first.summary()[ADDED]["files"], 3)
+        index = os.path.join(self.docs, "index.html")
+        os.utime(index, ns=(1, 1))
+
+        self._write("content/about/index.md", "# About us")
+        os.remove(os.path.join(self.static, "index.css"))
+        second, _ = self._build(synced)
+        self.assertEqual(list(second.files[UNCHANGED]), [index])
+        self.assertEqual(os.stat(index).st_mtime_ns, 1)
+        self.assertEqual(list(second.files[CHANGED]), [os.path.join(self.docs, "about", "index.html")])
+        self.assertEqual(second.files[REMOVED], {os.path.join(self.docs, "index.css"): 7})
+        self.assertEqual(second.summary()[REMOVED], {"files": 1, "bytes": 7})
+        self.assertIn("1 removed (7 bytes)", str(second))
+
+
+if __name__ == "__main__":
+    unittest.main()
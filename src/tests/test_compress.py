@@ -0,0 +1,51 @@
+import gzip
+import os
+import unittest
+
+from changes import ADDED, CHANGED, REMOVED, ChangeReport
+from compress import available_encodings, precompress_directory
+from helpers import TempDirTestCase
+
+
+class TestPrecompress(TempDirTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.encodings = {".gz": available_encodings()[".gz"]}
+
+    def _run(self, changes=None):
+        return precompress_directory(self.root, min_size=100, workers=2, changes=changes, encodings=self.encodings)
+
+    def test_compresses_text_files_over_threshold(self):
+        page = self._write("blog/index.html", b"<p>hello</p>" * 50)
+        self._write("small.css", b"body {}")
+        self._write("image.png", b"\x89PNG" * 100)
+        self._write("archive.tar.gz", b"not a variant")
+        self.assertEqual(self._run(), {"compressed": 1, "unchanged": 0, "removed": 0})
+        with gzip.open(page + ".gz", 'rb') as f:
+            self.assertEqual(f.read(), b"<p>hello</p>" * 50)
+        self.assertFalse(os.path.exists(os.path.join(self.root, "small.css.gz")))
+        self.assertFalse(os.path.exists(os.path.join(self.root, "image.png.gz")))
+        self.assertTrue(os.path.exists(os.path.join(self.root, "archive.tar.gz")))
+
+    def test_only_recompresses_changed_outputs(self):
+        page = self._write("index.html", b"<p>one</p>" * 50)
+        other = self._write("about.html", b"<p>two</p>" * 50)
+        self._run()
+        self.assertEqual(self._run(), {"compressed": 0, "unchanged": 2, "removed": 0})
+
+        self._write("index.html", b"<p>new</p>" * 60)
+        os.utime(page, ns=(10 ** 18, 10 ** 18))
+        changes = ChangeReport()
+        self.assertEqual(self._run(changes), {"compressed": 1, "unchanged": 1, "removed": 0})
+        self.assertEqual(list(changes.files[CHANGED]), [page + ".gz"])
+
+        os.remove(other)
+        changes = ChangeReport()
+        self.assertEqual(self._run(changes)["removed"], 1)
+        self.assertEqual(list(changes.files[REMOVED]), [other + ".gz"])
+        self.assertEqual(changes.files[ADDED], {})
+
+
+if __name__ == "__main__":
+    unittest.main()
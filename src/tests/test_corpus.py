@@ -0,0 +1,49 @@
+import os
+import tempfile
+import unittest
+
+from benchmarks.corpus import CorpusOptions, generate_corpus, parse_mix
+from benchmarks.run import compare
+
+
+class TestCorpus(unittest.TestCase):
+
+    def _read_all(self, root):
+        contents = {}
+        for path in sorted(generate_corpus(root, self.options)):
+            with open(path, 'r', encoding='utf-8') as f:
+                contents[os.path.relpath(path, root)] = f.read()
+        return contents
+
+    def test_same_seed_same_corpus(self):
+        self.options = CorpusOptions(pages=5, blocks_per_page=6, seed=3)
+        with tempfile.TemporaryDirectory() as a, tempfile.TemporaryDirectory() as b:
+            self.assertEqual(self._read_all(a), self._read_all(b))
+
+    def test_knobs(self):
+        self.options = CorpusOptions(pages=4, depth=0, blocks_per_page=3, block_mix={"code": 1}, code_lines=2)
+        with tempfile.TemporaryDirectory() as root:
+            contents = self._read_all(root)
+            self.assertEqual(len(contents), 4)
+            self.assertTrue(os.path.exists(os.path.join(root, "template.html")))
+            for markdown in contents.values():
+                self.assertEqual(markdown.count("```"), 6)
+
+    def test_parse_mix(self):
+        self.assertEqual(parse_mix("paragraph=6,code=2"), {"paragraph": 6.0, "code": 2.0})
+        with self.assertRaises(ValueError):
+            parse_mix("table=1")
+
+
+class TestCompare(unittest.TestCase):
+
+    def test_regressions_beyond_tolerance(self):
+        baseline = {"results": {"fast": {"min": 1.0}, "slow": {"min": 1.0}}}
+        results = {"fast": {"min": 1.05}, "slow": {"min": 1.5}, "new": {"min": 2.0}}
+        comparison = compare(results, baseline, 0.10)
+        self.assertEqual(comparison["regressions"], ["slow"])
+        self.assertEqual(comparison["ratios"], {"fast": 1.05, "slow": 1.5})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,93 @@
+import os
+import unittest
+
+from css import CssCache, css_transform, inline_stylesheets, minify_css, rebase_css_urls
+from helpers import TempDirTestCase
+from static_sync import sync_directory
+
+
+class TestMinifyCss(unittest.TestCase):
+
+    def test_whitespace_and_comments(self):
+        css = "/* header */\nbody {\n  margin: 0 auto;\n  color: #fff;\n}\n\nh1,\nh2 > a {\n  color: red !important;\n}\n"
+        self.assertEqual(minify_css(css), "body{margin:0 auto;color:#fff}h1,h2>a{color:red!important}")
+
+    def test_significant_spaces_are_kept(self):
+        css = "@media screen and (max-width: 600px) { a :hover { width: calc(1px + 2px); } }"
+        self.assertEqual(minify_css(css), "@media screen and (max-width:600px){a :hover{width:calc(1px + 2px)}}")
+
+    def test_strings_and_license_comments_are_kept(self):
+        css = '/*! MIT */ a::before { content: "a  /* b */  c"; }'
+        self.assertEqual(minify_css(css), '/*! MIT */a::before{content:"a  /* b */  c"}')
+
+    def test_comment_separates_tokens(self):
+        self.assertEqual(minify_css("a{margin:0/**/auto}"), "a{margin:0 auto}")
+
+    def test_rebase_urls(self):
+        css = 'a{background:url(img/a.png)}b{background:url("/b.png?v=1")}c{background:url(data:x)}d{background:url(https://x/y.png)}'
+        self.assertEqual(
+            rebase_css_urls(css, "css/site.css", "/site/", {"css/img/a.png": "css/img/a.0123.png"}),
+            'a{background:url("/site/css/img/a.0123.png")}b{background:url("/site/b.png?v=1")}'
+            'c{background:url(data:x)}d{background:url(https://x/y.png)}',
+        )
+
+
+class TestCssStage(TempDirTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.static = os.path.join(self.root, "static")
+        self._write("static/index.css", "body {\n  color: red;\n}\n")
+        self._write("static/big.css", "a { color: blue; }\n" * 100)
+        self.cache = CssCache(os.path.join(self.root, "cache"))
+
+    def test_cache_by_input_hash(self):
+        self.assertEqual(self.cache.minify(b"a { color: red; }"), b"a{color:red}")
+        self.assertEqual(self.cache.minify(b"a { color: red; }"), b"a{color:red}")
+        self.assertEqual((self.cache.hits, self.cache.misses), (1, 1))
+
+        # A new build reads the entry from disk and drops the ones it did not use
+        cache = CssCache(self.cache.directory)
+        cache.minify(b"b {}")
+        cache.prune()
+        self.assertEqual(len(os.listdir(self.cache.directory)), 1)
+        self.assertEqual(CssCache(self.cache.directory).minify(b"b {}"), b"b{}")
+
+    def test_inline_small_stylesheet(self):
+        template = '<head><link href="/index.css" rel="stylesheet" /><link rel="icon" href="/favicon.ico"></head>'
+        self.assertEqual(
+            inline_stylesheets(template, self.static, cache=self.cache),
+            '<head><style>body{color:red}</style><link rel="icon" href="/favicon.ico"></head>',
+        )
+
+    def test_large_stylesheet_with_critical_css(self):
+        template = '<link rel="stylesheet" href="/big.css"><link rel="stylesheet" href="/missing.css">'
+        html = inline_stylesheets(template, self.static, cache=self.cache, max_bytes=100, critical="a{color:blue}")
+        self.assertEqual(
+            html,
+            '<style>a{color:blue}</style>'
+            '<link rel="preload" href="/big.css" as="style" onload="this.onload=null;this.rel=\'stylesheet\'">'
+            '<noscript><link rel="stylesheet" href="/big.css"></noscript>'
+            '<link rel="stylesheet" href="/missing.css">',
+        )
+
+    def test_large_stylesheet_without_critical_css_stays_blocking(self):
+        template = '<link rel="stylesheet" href="/big.css">'
+        self.assertEqual(inline_stylesheets(template, self.static, max_bytes=100), template)
+
+    def test_sync_writes_minified_stylesheets(self):
+        dest = os.path.join(self.root, "docs")
+        self._write("static/notes.txt", "  kept  ")
+        report, _ = sync_directory(self.static, dest, transform=css_transform(self.static, self.cache))
+        self.assertEqual(len(report.copied), 3)
+        with open(os.path.join(dest, "index.css")) as f:
+            self.assertEqual(f.read(), "body{color:red}")
+        with open(os.path.join(dest, "notes.txt")) as f:
+            self.assertEqual(f.read(), "  kept  ")
+
+        report, _ = sync_directory(self.static, dest, transform=css_transform(self.static, self.cache))
+        self.assertEqual(len(report.unchanged), 3)
+
+
+if __name__ == "__main__":
+    unittest.main()
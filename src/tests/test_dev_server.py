@@ -0,0 +1,92 @@
+import os
+import threading
+import unittest
+from unittest import mock
+from urllib.request import urlopen
+
+from dev_server import DevServer, DevSite
+from helpers import TempDirTestCase
+from main import write_page
+from template import load_template
+
+
+class TestDevSite(TempDirTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self._write("template.html", '<title>{{ Title }}</title><link href="/index.css">{{ Content }}')
+        self._write("content/index.md", "# Home\n\n![pic](/images/a.png)")
+        self._write("content/blog/tom/index.md", "# Tom\n\nBombadil")
+        self._write("content/about.md", "# About\n\nUs")
+        self._write("static/index.css", "body {}")
+        self.site = DevSite(
+            os.path.join(self.root, "content"),
+            os.path.join(self.root, "static"),
+            os.path.join(self.root, "template.html"),
+            "/site/",
+        )
+
+    def test_resolve(self):
+        """Test the mapping from request paths to sources"""
+        content = os.path.join(self.root, "content")
+        tom = os.path.join(content, "blog", "tom", "index.md")
+        self.assertEqual(self.site.resolve("/site/"), ("page", os.path.join(content, "index.md")))
+        self.assertEqual(self.site.resolve("/site/blog/tom"), ("page", tom))
+        self.assertEqual(self.site.resolve("/site/blog/tom/index.html"), ("page", tom))
+        self.assertEqual(self.site.resolve("/site/about.html"), ("page", os.path.join(content, "about.md")))
+        self.assertEqual(self.site.resolve("/site/index.css"), ("static", os.path.join(self.root, "static", "index.css")))
+        self.assertEqual(self.site.resolve("/site/missing"), (None, None))
+        self.assertEqual(self.site.resolve("/other/"), (None, None))
+        self.assertEqual(self.site.resolve("/site/../../etc/passwd"), (None, None))
+
+    def test_render_applies_basepath_and_caches(self):
+        """Test that pages render once and are served from the cache until they change"""
+        md_path = os.path.join(self.root, "content", "index.md")
+        body = self.site.render(md_path).decode('utf-8')
+        self.assertIn('<link href="/site/index.css">', body)
+        self.assertIn('<img src="/site/images/a.png" alt="pic">', body)
+        self.assertIs(self.site.render(md_path), self.site.render(md_path))
+        self.assertEqual(self.site.cache.hits, 2)
+
+        self._write("content/index.md", "# Home\n\nChanged")
+        stat = os.stat(md_path)
+        os.utime(md_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+        self.assertIn(b"<p>Changed</p>", self.site.render(md_path))
+
+    def test_template_edit_renders_pages_again(self):
+        """Test that an edited template invalidates cached pages even if the compiled template's id is reused"""
+        md_path = os.path.join(self.root, "content", "index.md")
+        template_path = os.path.join(self.root, "template.html")
+        self.site.render(md_path)
+        self._write("template.html", "<h2>{{ Title }}</h2>{{ Content }}")
+        stat = os.stat(template_path)
+        os.utime(template_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+        self.assertIn(b"<h2>Home</h2>", self.site.render(md_path))
+
+        compiled = load_template(template_path, "/site/")
+        os.utime(template_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 2 * 10**9))
+        with mock.patch("dev_server.load_template", return_value=compiled), mock.patch("main.write_page", wraps=write_page) as render:
+            self.site.render(md_path)
+        self.assertEqual(render.call_count, 1)
+
+    def test_http_requests(self):
+        """Test pages, static files and 404s over a real socket"""
+        server = DevServer(("localhost", 0), self.site)
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+        try:
+            base = f"http://localhost:{server.server_address[1]}"
+            with urlopen(f"{base}/site/blog/tom/") as response:
+                self.assertIn(b"<p>Bombadil</p>", response.read())
+                self.assertEqual(response.headers["Content-Type"], "text/html; charset=utf-8")
+            with urlopen(f"{base}/site/index.css") as response:
+                self.assertEqual(response.read(), b"body {}")
+            with self.assertRaises(Exception):
+                urlopen(f"{base}/site/nope")
+        finally:
+            server.shutdown()
+            server.server_close()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,112 @@
+import os
+import tempfile
+import unittest
+
+from changes import ADDED, UNCHANGED
+from feeds import FeedState, channel_link, feed_digest, feed_entries, sitemap_entries, write_feed, write_sitemaps
+from helpers import TempDirTestCase
+from metadata import PageMetadata
+
+
+def _pages():
+    # Newest first, as PageIndex.pages returns them
+    return [
+        PageMetadata("Majesty", "2024-03-01", url="/blog/majesty/"),
+        PageMetadata("Tom & Bombadil", "2024-02-01T12:00:00", url="/blog/tom/"),
+        PageMetadata("Blog", None, url="/blog/"),
+        PageMetadata("Home", None, url="/"),
+    ]
+
+
+class TestSitemap(TempDirTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.docs = self.tmp.name
+
+    def _read(self, name):
+        with open(os.path.join(self.docs, name)) as f:
+            return f.read()
+
+    def test_entries(self):
+        self.assertEqual(sitemap_entries(_pages(), "https://example.com/", "/site/"), [
+            ("https://example.com/site/", None),
+            ("https://example.com/site/blog/", None),
+            ("https://example.com/site/blog/majesty/", "2024-03-01"),
+            ("https://example.com/site/blog/tom/", "2024-02-01"),
+        ])
+
+    def test_single_sitemap(self):
+        entries = sitemap_entries(_pages(), "https://example.com", "/")
+        written = write_sitemaps(self.docs, entries, "https://example.com", "/")
+        self.assertEqual(written, {os.path.join(self.docs, "sitemap.xml"): ADDED})
+        sitemap = self._read("sitemap.xml")
+        self.assertIn("<url><loc>https://example.com/blog/majesty/</loc><lastmod>2024-03-01</lastmod></url>\n", sitemap)
+        self.assertTrue(sitemap.endswith("</urlset>\n"))
+        self.assertEqual(list(write_sitemaps(self.docs, entries, "https://example.com", "/").values()), [UNCHANGED])
+
+    def test_split_past_max_urls(self):
+        entries = sitemap_entries(_pages(), "https://example.com", "/")
+        written = write_sitemaps(self.docs, entries, "https://example.com", "/", max_urls=3)
+        self.assertEqual(sorted(os.path.basename(path) for path in written), ["sitemap-1.xml", "sitemap-2.xml", "sitemap.xml"])
+        self.assertIn("<sitemap><loc>https://example.com/sitemap-2.xml</loc></sitemap>", self._read("sitemap.xml"))
+        self.assertEqual(self._read("sitemap-2.xml").count("<url>"), 1)
+
+
+class TestFeed(unittest.TestCase):
+
+    def test_entries(self):
+        self.assertEqual([page.url for page in feed_entries(_pages())], ["/blog/majesty/", "/blog/tom/"])
+        self.assertEqual([page.url for page in feed_entries(_pages(), limit=1)], ["/blog/majesty/"])
+
+    def test_write_feed(self):
+        with tempfile.TemporaryDirectory() as docs:
+            path = os.path.join(docs, "feed.xml")
+            self.assertEqual(write_feed(path, feed_entries(_pages()), "https://example.com", "/site/", "Fans", channel_link(_pages())), ADDED)
+            with open(path) as f:
+                feed = f.read()
+        self.assertIn('<atom:link href="https://example.com/site/feed.xml" rel="self"', feed)
+        self.assertIn("<link>https://example.com/site/blog/</link>", feed)
+        self.assertIn(
+            "<item><title>Tom &amp; Bombadil</title><link>https://example.com/site/blog/tom/</link>"
+            "<guid>https://example.com/site/blog/tom/</guid><pubDate>Thu, 01 Feb 2024 12:00:00 +0000</pubDate></item>",
+            feed,
+        )
+
+    def test_channel_link_is_a_page_of_the_site(self):
+        self.assertEqual(channel_link(_pages()), "/blog/")
+        # Without a blog index page the channel links to the home page, not a missing /blog/
+        self.assertEqual(channel_link([page for page in _pages() if page.url != "/blog/"]), "/")
+
+    def test_digest_follows_listed_metadata(self):
+        pages = feed_entries(_pages())
+        self.assertEqual(feed_digest(pages), feed_digest(feed_entries(_pages())))
+        pages[0].title = "Renamed"
+        self.assertNotEqual(feed_digest(pages), feed_digest(feed_entries(_pages())))
+
+
+class TestFeedState(unittest.TestCase):
+
+    def test_current_and_stale_outputs(self):
+        with tempfile.TemporaryDirectory() as root:
+            path = os.path.join(root, "feeds.json")
+            sitemap = os.path.join(root, "sitemap.xml")
+            part = os.path.join(root, "sitemap-1.xml")
+            for output in (sitemap, part):
+                open(output, 'w').close()
+            state = FeedState(path)
+            self.assertFalse(state.is_current("sitemap", "a"))
+            state.record("sitemap", "a", [sitemap, part])
+            state.save()
+
+            state = FeedState(path)
+            self.assertTrue(state.is_current("sitemap", "a"))
+            self.assertFalse(state.is_current("sitemap", "b"))
+            self.assertEqual(state.record("sitemap", "b", [sitemap]), [part])
+            self.assertEqual(state.forget("sitemap"), [sitemap])
+            os.remove(sitemap)
+            self.assertFalse(FeedState(path).is_current("sitemap", "a"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,111 @@
+import os
+import struct
+import tempfile
+import unittest
+
+from images import ImageAttributes, ImageSizeCache, image_size, scan_image_sizes
+from leafnode import LeafNode
+from main import generate_pages_recursive, render_page
+from parentnode import ParentNode
+from template import compile_template
+from urls import UrlResolver
+
+
+def png(width, height):
+    return b"\x89PNG\r\n\x1a\n" + struct.pack(">I", 13) + b"IHDR" + struct.pack(">II", width, height) + b"\x08\x06\x00\x00\x00"
+
+def gif(width, height):
+    return b"GIF89a" + struct.pack("<HH", width, height) + b"\x00\x00\x00"
+
+def webp_vp8x(width, height):
+    payload = b"\x00" * 4 + (width - 1).to_bytes(3, "little") + (height - 1).to_bytes(3, "little")
+    return b"RIFF" + struct.pack("<I", 4 + 8 + len(payload)) + b"WEBP" + b"VP8X" + struct.pack("<I", len(payload)) + payload
+
+def jpeg(width, height):
+    app0 = b"\xff\xe0" + struct.pack(">H", 16) + b"JFIF\x00" + b"\x00" * 9
+    sof = b"\xff\xc0" + struct.pack(">HBHHB", 11, 8, height, width, 1) + b"\x01\x11\x00"
+    return b"\xff\xd8" + app0 + sof + b"\xff\xd9"
+
+
+class TestImageSize(unittest.TestCase):
+
+    def test_formats(self):
+        self.assertEqual(image_size(png(640, 480)), (640, 480))
+        self.assertEqual(image_size(gif(32, 16)), (32, 16))
+        self.assertEqual(image_size(webp_vp8x(1920, 1080)), (1920, 1080))
+        self.assertEqual(image_size(jpeg(800, 600)), (800, 600))
+
+    def test_unknown_or_truncated(self):
+        self.assertIsNone(image_size(b"not an image"))
+        self.assertIsNone(image_size(png(640, 480)[:20]))
+        self.assertIsNone(image_size(jpeg(800, 600)[:22]))
+
+    def test_scan_and_cache(self):
+        with tempfile.TemporaryDirectory() as root:
+            static = os.path.join(root, "static")
+            os.makedirs(os.path.join(static, "images"))
+            with open(os.path.join(static, "images", "a.png"), 'wb') as f:
+                f.write(png(10, 20))
+            with open(os.path.join(static, "index.css"), 'w') as f:
+                f.write("body {}")
+            cache_path = os.path.join(root, "sizes.json")
+            cache = ImageSizeCache(cache_path)
+            self.assertEqual(scan_image_sizes(static, cache), {"images/a.png": (10, 20)})
+            cache.save()
+
+            reloaded = ImageSizeCache(cache_path)
+            self.assertEqual(scan_image_sizes(static, reloaded), {"images/a.png": (10, 20)})
+            self.assertEqual(len(reloaded.sizes), 1)
+
+
+class TestImageAttributes(unittest.TestCase):
+    sizes = {"/images/a.png": (10, 20)}
+
+    def _render(self, node, eager=0):
+        return node.to_html(ImageAttributes(UrlResolver(), self.sizes, eager))
+
+    def test_first_image_stays_eager(self):
+        node = ParentNode("p", [LeafNode("img", "", {"src": "/images/a.png", "alt": "a"}), LeafNode("img", "", {"src": "/images/b.png", "alt": "b"})])
+        self.assertEqual(
+            self._render(node, eager=1),
+            '<p><img src="/images/a.png" alt="a" width="10" height="20" decoding="async">'
+            '<img src="/images/b.png" alt="b" loading="lazy" decoding="async"></p>',
+        )
+
+    def test_existing_attributes_are_kept(self):
+        node = LeafNode("img", "", {"src": "/images/a.png", "width": "5", "loading": "eager"})
+        self.assertEqual(self._render(node), '<img src="/images/a.png" width="5" loading="eager" decoding="async">')
+
+    def test_relative_and_external_sources_get_no_size(self):
+        for src in ("images/a.png", "https://example.com/images/a.png"):
+            self.assertEqual(self._render(LeafNode("img", "", {"src": src})), f'<img src="{src}" loading="lazy" decoding="async">')
+
+    def test_img_text_in_code_is_left_alone(self):
+        """Test that literal <img text in code is neither rewritten nor counted as an image"""
+        template = compile_template("{{ Content }}")
+        markdown = '# Code\n\n```\n<img src="/images/a.png">\n```\n\nInline `<img src="/images/a.png">` too\n\n![a](/images/a.png)'
+        html = render_page(markdown, template, "/", image_sizes={"images/a.png": (10, 20)})
+        self.assertIn('<pre><code><img src="/images/a.png">\n</code></pre>', html)
+        self.assertIn('<code><img src="/images/a.png"></code>', html)
+        self.assertIn('<img src="/images/a.png" alt="a" width="10" height="20" decoding="async">', html)
+
+    def test_generated_pages(self):
+        with tempfile.TemporaryDirectory() as root:
+            os.makedirs(os.path.join(root, "content"))
+            with open(os.path.join(root, "content", "index.md"), 'w') as f:
+                f.write("# Home\n\n![a](/images/a.png)\n\n![b](/images/a.png)")
+            template = os.path.join(root, "template.html")
+            with open(template, 'w') as f:
+                f.write('<title>{{ Title }}</title><img src="/logo.png">{{ Content }}')
+            docs = os.path.join(root, "docs")
+            generate_pages_recursive(os.path.join(root, "content"), template, docs, "/site/", image_sizes={"images/a.png": (10, 20)})
+            with open(os.path.join(docs, "index.html")) as f:
+                html = f.read()
+            self.assertIn('<img src="/site/images/a.png" alt="a" width="10" height="20" decoding="async">', html)
+            self.assertIn('<img src="/site/images/a.png" alt="b" width="10" height="20" loading="lazy" decoding="async">', html)
+            # The template's own markup is left alone
+            self.assertIn('<img src="/site/logo.png"><div>', html)
+
+
+if __name__ == "__main__":
+    unittest.main()
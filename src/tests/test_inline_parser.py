@@ -0,0 +1,86 @@
+import unittest
+
+from inline_parser import parse_inline, parse_inline_html
+from main import text_node_to_html_node
+from textnode import TextNode, TextType
+
+
+class TestParseInline(unittest.TestCase):
+
+    def test_matches_split_pipeline(self):
+        """Test the flat node stream produced by the old split_nodes_* pipeline"""
+        text = "This is **text** with an _italic_ word and a `code block` and an ![obi wan image](https://i.imgur.com/fJRm4Vk.jpeg) and a [link](https://boot.dev)"
+        expected = [
+            TextNode("This is ", TextType.TEXT),
+            TextNode("text", TextType.BOLD),
+            TextNode(" with an ", TextType.TEXT),
+            TextNode("italic", TextType.ITALIC),
+            TextNode(" word and a ", TextType.TEXT),
+            TextNode("code block", TextType.CODE),
+            TextNode(" and an ", TextType.TEXT),
+            TextNode("obi wan image", TextType.IMAGE, "https://i.imgur.com/fJRm4Vk.jpeg"),
+            TextNode(" and a ", TextType.TEXT),
+            TextNode("link", TextType.LINK, "https://boot.dev"),
+        ]
+        self.assertEqual(parse_inline(text), expected)
+
+    def test_plain_text(self):
+        """Test text without markup"""
+        self.assertEqual(parse_inline("Just words."), [TextNode("Just words.", TextType.TEXT)])
+        self.assertEqual(parse_inline(""), [])
+
+    def test_nested_emphasis(self):
+        """Test italic inside bold"""
+        nodes = parse_inline("a **bold _and italic_ text** b")
+        self.assertEqual(nodes, [
+            TextNode("a ", TextType.TEXT),
+            TextNode("bold _and italic_ text", TextType.BOLD, children=[
+                TextNode("bold ", TextType.TEXT),
+                TextNode("and italic", TextType.ITALIC),
+                TextNode(" text", TextType.TEXT),
+            ]),
+            TextNode(" b", TextType.TEXT),
+        ])
+
+    def test_link_inside_emphasis(self):
+        """Test that a link inside bold is rendered inside the bold tag"""
+        nodes = parse_inline("**see [docs](/docs)**")
+        html = "".join(text_node_to_html_node(node).to_html() for node in nodes)
+        self.assertEqual(html, '<b>see <a href="/docs">docs</a></b>')
+
+    def test_code_spans_are_literal(self):
+        """Test that delimiters inside code are not parsed"""
+        self.assertEqual(parse_inline("`a_b **c**`"), [TextNode("a_b **c**", TextType.CODE)])
+
+    def test_unmatched_delimiters_are_text(self):
+        """Test that unmatched delimiters are kept as plain text instead of raising"""
+        self.assertEqual(parse_inline("2 ** 3 and snake_case"), [TextNode("2 ** 3 and snake_case", TextType.TEXT)])
+
+    def test_empty_code_span_is_text(self):
+        """Test that an empty code span keeps its backticks, also inside emphasis"""
+        self.assertEqual(parse_inline("_``_"), [TextNode("``", TextType.ITALIC)])
+        self.assertEqual(parse_inline("a `` b"), [TextNode("a `` b", TextType.TEXT)])
+        self.assertEqual("".join(node.to_html() for node in parse_inline_html("**``**")), "<b>``</b>")
+
+    def test_crossed_delimiters(self):
+        """Test that an inner span left open is dissolved when the outer span closes"""
+        self.assertEqual(parse_inline("**a _b** c"), [
+            TextNode("a _b", TextType.BOLD),
+            TextNode(" c", TextType.TEXT),
+        ])
+
+    def test_direct_html_nodes_match_text_node_conversion(self):
+        """Test that skipping the TextNode layer yields the same HTML nodes"""
+        samples = [
+            "plain text",
+            "This is **text** with an _italic_ word and a `code block` and an ![image](/a.png) and a [link](/b)",
+            "a **bold _and italic_ text** with **[a link](/x)** inside",
+            "unmatched ** and _ delimiters",
+        ]
+        for text in samples:
+            with self.subTest(text=text):
+                expected = [text_node_to_html_node(node) for node in parse_inline(text)]
+                self.assertEqual(parse_inline_html(text), expected)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -14,6 +14,18 @@ class TestLeafNode(unittest.TestCase):
   def test_leaf_to_html_p_with_children(self):
     node = LeafNode("p", "Hello, world!", {"id": "text"})
     self.assertEqual(node.to_html(), "<p id=\"text\">Hello, world!</p>")
+    
+  def test_leaves_share_empty_children(self):
+    first = LeafNode("b", "one")
+    second = LeafNode("i", "two")
+    self.assertEqual(first.children, ())
+    self.assertIs(first.children, second.children)
+
+  def test_nodes_have_no_instance_dict(self):
+    node = LeafNode("p", "text")
+    self.assertFalse(hasattr(node, "__dict__"))
+    with self.assertRaises(AttributeError):
+      node.extra = 1
 
 if __name__ == "__main__":
   unittest.main()
\ No newline at end of file
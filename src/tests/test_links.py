@@ -0,0 +1,77 @@
+import os
+import unittest
+
+from helpers import TempDirTestCase
+from links import IMAGE, LINK, LinkIndex, collect_links, target_key
+from main import collect_pages, generate_pages_recursive, parse_page
+from markdown_html import markdown_to_html_node
+
+
+class TestTargetKey(unittest.TestCase):
+
+    def test_forms_of_one_page_share_a_key(self):
+        for url in ("/blog/tom", "/blog/tom/", "/blog/tom/index.html", "/blog/tom/index.md#top", "tom/", "tom/index.md"):
+            self.assertEqual(target_key(url, "blog"), "blog/tom", url)
+        self.assertEqual(target_key("/x.html?a=1"), "x")
+        self.assertEqual(target_key("/"), "")
+        self.assertEqual(target_key("../index.md", "blog/tom"), "blog")
+
+    def test_external(self):
+        for url in ("https://example.com/", "//cdn.example.com/a.png", "mailto:a@b.c", "#top", ""):
+            self.assertIsNone(target_key(url))
+
+
+class TestLinkIndex(TempDirTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.content = os.path.join(self.root, "content")
+        self.docs = os.path.join(self.root, "docs")
+        self.static = os.path.join(self.root, "static")
+        self._write("static/images/a.png", "png")
+        self._write("content/index.md", "# Home\n\n[tom](/blog/tom) [majesty](blog/majesty/index.md) ![a](/images/a.png)")
+        self._write("content/blog/tom/index.md", "# Tom\n\n[home](/) [majesty](../majesty/) [gone](/blog/gone) ![b](/images/b.png)")
+        self._write("content/blog/majesty/index.md", "# Majesty\n\n[tom](/blog/tom/) [out](https://example.com)\n\n```\n[not a link](/nowhere)\n```")
+
+    def _index(self):
+        index = LinkIndex(os.path.join(self.root, "links.json"))
+        index.update(collect_pages(self.content, self.docs), self.docs, self.static, lambda markdown: parse_page(markdown)[0])
+        return index
+
+    def test_collect_links(self):
+        node = markdown_to_html_node("[a](/x) and ![b](/y.png)\n\n- [c](z.md)")
+        self.assertEqual(collect_links(node), [(LINK, "/x"), (IMAGE, "/y.png"), (LINK, "z.md")])
+
+    def test_broken_links_and_missing_images(self):
+        index = self._index()
+        tom = os.path.join(self.content, "blog", "tom", "index.md")
+        self.assertEqual(index.broken(), [(tom, LINK, "/blog/gone"), (tom, IMAGE, "/images/b.png")])
+        self.assertEqual(index.inbound["blog/tom"], 2)
+
+    def test_unchanged_pages_are_not_parsed_again(self):
+        self.assertEqual(self._index().parsed, 3)
+        self._index().save()
+        self._write("content/blog/tom/index.md", "# Tom\n\n[home](/)")
+        index = self._index()
+        self.assertEqual(index.parsed, 1)
+        self.assertEqual(index.broken(), [])
+
+    def test_prefetch_hints(self):
+        hints = self._index().prefetch_hints(limit=1)
+        # Each page's hint is written the way that page links to the target
+        self.assertEqual(hints[os.path.join(self.content, "index.md")], ["/blog/tom"])
+        self.assertEqual(hints[os.path.join(self.content, "blog", "majesty", "index.md")], ["/blog/tom/"])
+        self.assertEqual(self._index().prefetch_hints()[os.path.join(self.content, "blog", "tom", "index.md")], ["../majesty/", "/"])
+
+        template = os.path.join(self.root, "template.html")
+        with open(template, 'w') as f:
+            f.write("<title>{{ Title }}</title>{{ Content }}")
+        generate_pages_recursive(self.content, template, self.docs, "/site/", prefetch=hints)
+        with open(os.path.join(self.docs, "index.html")) as f:
+            html = f.read()
+        self.assertIn('<a href="/site/blog/tom">', html)
+        self.assertTrue(html.endswith('</div><link rel="prefetch" href="/site/blog/tom">'))
+
+
+if __name__ == "__main__":
+    unittest.main()
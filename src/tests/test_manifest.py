@@ -0,0 +1,83 @@
+import os
+import unittest
+
+from helpers import TempDirTestCase
+from manifest import BuildManifest, hash_bytes, hash_file
+
+
+class TestBuildManifest(TempDirTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.manifest_path = os.path.join(self.root, ".build", "manifest.json")
+
+    def test_hash_file_matches_hash_bytes(self):
+        """Test that file hashing agrees with hashing the same bytes"""
+        path = self._write("a.md", "# Hello")
+        self.assertEqual(hash_file(path), hash_bytes(b"# Hello"))
+
+    def test_new_source_needs_build(self):
+        """Test that a source missing from the manifest is rebuilt"""
+        manifest = BuildManifest(self.manifest_path, "fp")
+        self.assertTrue(manifest.needs_build("a.md", "h1", "a.html"))
+
+    def test_unchanged_source_is_skipped(self):
+        """Test that a recorded source with the same hash is skipped after a reload"""
+        output = self._write("docs/a.html", "<p>a</p>")
+        manifest = BuildManifest(self.manifest_path, "fp")
+        manifest.record("a.md", "h1", output)
+        manifest.save()
+
+        reloaded = BuildManifest(self.manifest_path, "fp")
+        self.assertFalse(reloaded.needs_build("a.md", "h1", output))
+        self.assertTrue(reloaded.needs_build("a.md", "h2", output))
+
+    def test_fingerprint_change_rebuilds_everything(self):
+        """Test that a template or code change invalidates every page"""
+        output = self._write("docs/a.html", "<p>a</p>")
+        manifest = BuildManifest(self.manifest_path, "fp1")
+        manifest.record("a.md", "h1", output)
+        manifest.save()
+
+        reloaded = BuildManifest(self.manifest_path, "fp2")
+        self.assertTrue(reloaded.needs_build("a.md", "h1", output))
+
+    def test_missing_output_is_rebuilt(self):
+        """Test that a deleted output file is regenerated"""
+        output = os.path.join(self.root, "docs", "a.html")
+        manifest = BuildManifest(self.manifest_path, "fp")
+        manifest.record("a.md", "h1", output)
+        manifest.save()
+
+        reloaded = BuildManifest(self.manifest_path, "fp")
+        self.assertTrue(reloaded.needs_build("a.md", "h1", output))
+
+    def test_remove_stale_deletes_orphaned_outputs(self):
+        """Test that outputs of removed sources are deleted along with empty directories"""
+        docs = os.path.join(self.root, "docs")
+        kept = self._write("docs/a.html", "<p>a</p>")
+        gone = self._write("docs/blog/old/index.html", "<p>old</p>")
+        manifest = BuildManifest(self.manifest_path, "fp")
+        manifest.record("a.md", "h1", kept)
+        manifest.record("blog/old/index.md", "h2", gone)
+        manifest.save()
+
+        reloaded = BuildManifest(self.manifest_path, "fp")
+        reloaded.needs_build("a.md", "h1", kept)
+        removed = reloaded.remove_stale(docs)
+
+        self.assertEqual(removed, [gone])
+        self.assertFalse(os.path.exists(gone))
+        self.assertFalse(os.path.exists(os.path.join(docs, "blog")))
+        self.assertTrue(os.path.exists(kept))
+        self.assertNotIn("blog/old/index.md", reloaded.pages)
+
+    def test_corrupt_manifest_is_ignored(self):
+        """Test that an unreadable manifest falls back to a full build"""
+        self._write(".build/manifest.json", "{not json")
+        manifest = BuildManifest(self.manifest_path, "fp")
+        self.assertEqual(manifest.pages, {})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,5 +1,7 @@
 import unittest
-from markdown_html import markdown_to_html_node
+from block_parser import parse_blocks
+from cache import LRUCache
+from markdown_html import blocks_to_html_node, markdown_to_html_node
 
 
 class TestMarkdownToHTML(unittest.TestCase):
@@ -170,5 +172,35 @@ This one has an ![image](https://example.com/image.png) in it.
         self.assertIn('<img src="https://example.com/image.png" alt="image">', html)
 
 
+class TestBlockCache(unittest.TestCase):
+    
+    def test_repeated_blocks_hit_the_cache(self):
+        """Test that a block shared by two pages is rendered once and reused"""
+        shared = "> Opinions are my own.\n> Not my employer's."
+        first = f"# One\n\nIntro with **bold**.\n\n{shared}"
+        second = f"# Two\n\n{shared}\n\n- a\n- b"
+        cache = LRUCache(max_bytes=1 << 20)
+        
+        html_first = blocks_to_html_node(parse_blocks(first), cache).to_html()
+        self.assertEqual((cache.hits, cache.misses), (0, 3))
+        html_second = blocks_to_html_node(parse_blocks(second), cache).to_html()
+        self.assertEqual((cache.hits, cache.misses), (1, 5))
+        
+        self.assertEqual(html_first, markdown_to_html_node(first).to_html())
+        self.assertEqual(html_second, markdown_to_html_node(second).to_html())
+    
+    def test_cached_tree_equals_uncached_tree(self):
+        md = "# Title\n\nSome _text_ and `code`."
+        cache = LRUCache()
+        blocks_to_html_node(parse_blocks(md), cache)
+        self.assertEqual(blocks_to_html_node(parse_blocks(md), cache), markdown_to_html_node(md))
+    
+    def test_size_bound_evicts(self):
+        cache = LRUCache(max_bytes=40)
+        blocks_to_html_node(parse_blocks("first paragraph here\n\nsecond paragraph here"), cache)
+        self.assertEqual(len(cache), 1)
+        self.assertEqual(cache.evictions, 1)
+
+
 if __name__ == "__main__":
     unittest.main() 
\ No newline at end of file
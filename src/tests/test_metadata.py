@@ -0,0 +1,129 @@
+import os
+import unittest
+
+from helpers import TempDirTestCase
+from main import collect_pages, render_page
+from manifest import hash_file
+from metadata import PageIndex, PageMetadata, normalize_date, read_metadata, split_front_matter
+from template import compile_template
+
+
+class TestFrontMatter(unittest.TestCase):
+
+    def test_split(self):
+        markdown = '---\ntitle: "Tom: a mistake"\ndate: 2024-03-01\ntags: [tolkien, essays]\n---\n# Tom\n\nText'
+        front_matter, body = split_front_matter(markdown)
+        self.assertEqual(front_matter, {"title": "Tom: a mistake", "date": "2024-03-01", "tags": ["tolkien", "essays"]})
+        self.assertEqual(body, "# Tom\n\nText")
+
+    def test_block_lists(self):
+        front_matter, _ = split_front_matter("---\n# comment\ntags:\n  - a\n  - 'b'\ndraft:\n---\n")
+        self.assertEqual(front_matter, {"tags": ["a", "b"], "draft": []})
+
+    def test_not_front_matter(self):
+        for markdown in ("# Title\n---\n", "---\nnot a key value line\n---\n# T", "---\ntitle: unclosed\n# T", "----\n"):
+            self.assertEqual(split_front_matter(markdown), ({}, markdown))
+
+
+class TestMetadata(unittest.TestCase):
+
+    def test_from_blocks(self):
+        metadata = read_metadata("---\ndate: 2024-01-02\ntags: b, a, b\n---\nIntro\n\n# The Title\n\n[two words](/not/counted)\n\n```\nnot counted\n```")
+        self.assertEqual(metadata, PageMetadata("The Title", "2024-01-02", ["b", "a"], 5))
+
+    def test_front_matter_title_wins(self):
+        self.assertEqual(read_metadata("---\ntitle: Other\n---\n# Title").title, "Other")
+        self.assertIsNone(read_metadata("## Only h2").title)
+
+    def test_list_title_rejected(self):
+        with self.assertRaisesRegex(ValueError, "title must be text"):
+            read_metadata("---\ntitle: [a, b]\n---\n# Title")
+        with self.assertRaisesRegex(ValueError, "date must be text"):
+            read_metadata("---\ndate:\n  - 2024-01-02\n---\n# Title")
+        # An empty value is no title at all
+        self.assertEqual(read_metadata("---\ntitle:\n---\n# Title").title, "Title")
+
+    def test_dates_normalized_to_iso(self):
+        for value, expected in (
+            ("2024-03-01", "2024-03-01"),
+            ("2024-3-1", "2024-03-01"),
+            ("March 1, 2024", "2024-03-01"),
+            ("1 Mar 2024", "2024-03-01"),
+            ("2024/03/01", "2024-03-01"),
+            ("2024-03-01T10:00", "2024-03-01T10:00:00+00:00"),
+            ("2024-03-01T01:00:00+02:00", "2024-02-29T23:00:00+00:00"),
+            ("Fri, 01 Mar 2024 10:00:00 +0000", "2024-03-01T10:00:00+00:00"),
+            ("someday", None),
+            ("", None),
+        ):
+            with self.subTest(value=value):
+                self.assertEqual(normalize_date(value), expected)
+        self.assertEqual(read_metadata("---\ndate: March 1, 2024\n---\n# T").date, "2024-03-01")
+
+    def test_heading_in_code_block_is_not_title(self):
+        self.assertEqual(read_metadata("```\n# Not this\n```\n\n# Title").title, "Title")
+
+    def test_rendered_page(self):
+        template = compile_template("<title>{{ Title }}</title>{{ Content }}")
+        html = render_page("---\ntitle: From front matter\ntags: [x]\n---\nNo heading", template, "/")
+        self.assertEqual(html, "<title>From front matter</title><div><p>No heading</p></div>")
+
+
+class TestPageIndex(TempDirTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.content = os.path.join(self.root, "content")
+        self.docs = os.path.join(self.root, "docs")
+        self.path = os.path.join(self.root, "build", "pages.sqlite")
+        self._write("content/index.md", "# Home")
+        self._write("content/blog/tom/index.md", "---\ndate: 2024-02-01\ntags: [tolkien, essays]\n---\n# Tom\n\nBombadil")
+        self._write("content/blog/majesty.md", "---\ndate: 2024-03-01\ntags: [tolkien]\n---\n# Majesty")
+
+    def _index(self):
+        index = PageIndex(self.path)
+        index.update(collect_pages(self.content, self.docs), self.docs)
+        self.addCleanup(index.close)
+        return index
+
+    def test_queries(self):
+        index = self._index()
+        self.assertEqual([page.url for page in index.pages()], ["/blog/majesty.html", "/blog/tom/", "/"])
+        self.assertEqual(index.pages(tag="essays"), [PageMetadata("Tom", "2024-02-01", ["essays", "tolkien"], 2, url="/blog/tom/")])
+        self.assertEqual(index.tags(), [("tolkien", 2), ("essays", 1)])
+
+    def test_dates_sort_by_time_not_text(self):
+        """Test that dates written in other formats than YYYY-MM-DD are listed in date order"""
+        self._write("content/blog/tom/index.md", "---\ndate: February 1, 2024\n---\n# Tom")
+        self._write("content/blog/majesty.md", "---\ndate: 2024/3/1\n---\n# Majesty")
+        self._write("content/blog/late.md", "---\ndate: 2024-02-29T23:30:00-02:00\n---\n# Late")
+        index = self._index()
+        self.assertEqual([page.url for page in index.pages()], ["/blog/late.html", "/blog/majesty.html", "/blog/tom/", "/"])
+        self.assertEqual(index.pages()[0].date, "2024-03-01T01:30:00+00:00")
+
+    def test_shared_source_hashes(self):
+        """Test that sources whose hash the build already knows are not read again"""
+        pages = collect_pages(self.content, self.docs)
+        source_hashes = {from_path: hash_file(from_path) for from_path, _ in pages}
+        index = PageIndex(self.path)
+        self.addCleanup(index.close)
+        index.update(pages, self.docs, source_hashes=source_hashes)
+        self.assertEqual(index.parsed, 3)
+        # Only the hash decides: an edit the build has not hashed yet is not seen
+        self._write("content/index.md", "# Edited")
+        index.update(pages, self.docs, source_hashes=source_hashes)
+        self.assertEqual(index.parsed, 3)
+        self.assertEqual(index.pages()[-1].title, "Home")
+
+    def test_incremental_update(self):
+        self.assertEqual(self._index().parsed, 3)
+        self._write("content/blog/tom/index.md", "# Tom\n\nNo front matter now")
+        os.remove(os.path.join(self.content, "blog", "majesty.md"))
+        index = self._index()
+        self.assertEqual(index.parsed, 1)
+        self.assertEqual(len(index), 2)
+        self.assertEqual(index.tags(), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
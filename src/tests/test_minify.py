@@ -0,0 +1,110 @@
+import io
+import os
+import tempfile
+import unittest
+
+from main import generate_pages_recursive
+from minify import HtmlMinifier, minify_html, minify_tag
+
+
+class TestMinifyTag(unittest.TestCase):
+
+    def test_drops_optional_quotes(self):
+        self.assertEqual(minify_tag('<a href="/blog/tom" class="x">'), '<a href=/blog/tom class=x>')
+
+    def test_keeps_needed_quotes(self):
+        self.assertEqual(minify_tag('<img alt="two words" title="">'), '<img alt="two words" title="">')
+        self.assertEqual(minify_tag('<a title="a=b">'), '<a title="a=b">')
+
+    def test_void_element_slash(self):
+        self.assertEqual(minify_tag('<meta  charset="utf-8" />'), '<meta charset=utf-8>')
+        # Outside void elements the slash matters (e.g. in SVG), and unquoting would swallow it
+        self.assertEqual(minify_tag('<path d="M0" />'), '<path d="M0"/>')
+
+    def test_unparseable_tag_is_kept(self):
+        self.assertEqual(minify_tag('<a "odd">'), '<a "odd">')
+
+
+class TestHtmlMinifier(unittest.TestCase):
+
+    def test_whitespace(self):
+        html = "<ul>\n  <li>one  <b>two</b>\n three </li>\n</ul>"
+        self.assertEqual(minify_html(html), "<ul><li>one <b>two</b> three</li></ul>")
+
+    def test_nbsp_is_not_whitespace(self):
+        self.assertEqual(minify_html("<p>a\u00a0 b</p>"), "<p>a\u00a0 b</p>")
+
+    def test_comments(self):
+        html = "<p>a <!-- note --> b</p><!--[if IE]><p>old</p><![endif]-->"
+        self.assertEqual(minify_html(html), "<p>a b</p><!--[if IE]><p>old</p><![endif]-->")
+
+    def test_pre_and_code_untouched(self):
+        html = '<pre class="x"><code>def f():\n    return  1 < 2\n<!-- kept --></code></pre>\n<p>use <code>a  b</code> here</p>'
+        self.assertEqual(
+            minify_html(html),
+            '<pre class=x><code>def f():\n    return  1 < 2\n<!-- kept --></code></pre><p>use <code>a  b</code> here</p>',
+        )
+
+    def test_stray_angle_bracket(self):
+        self.assertEqual(minify_html("<p>1 < 2  and 3 <4</p>"), "<p>1 < 2 and 3 <4</p>")
+
+    def test_streaming_matches_whole_string(self):
+        html = "".join(
+            f"<div>\n  <p>Item {i}  <a href=\"/p/{i}\">link</a>\n</p>\n"
+            f"<pre><code>  line {i}\n    x</code></pre>\n<!-- {i} --></div>\n"
+            for i in range(30)
+        )
+        expected = minify_html(html)
+        for size in (1, 2, 5, 13, 64):
+            out = io.StringIO()
+            minifier = HtmlMinifier(out)
+            minifier.BATCH_SIZE = size
+            for i in range(0, len(html), size):
+                minifier.write(html[i:i + size])
+            minifier.flush()
+            self.assertEqual(out.getvalue(), expected, size)
+
+    def test_long_code_block_is_not_held_back(self):
+        code = "".join(f"x = a > b  # {i}\n" for i in range(5000))
+        html = f"<pre><code>{code}</code></pre>\n<p>after</p>"
+        out = io.StringIO()
+        minifier = HtmlMinifier(out)
+        for i in range(0, len(html), 1000):
+            minifier.write(html[i:i + 1000])
+            # At most a partial end tag and the current batch stay buffered
+            self.assertLess(minifier._size, minifier.BATCH_SIZE + 1000)
+        minifier.flush()
+        self.assertEqual(out.getvalue(), f"<pre><code>{code}</code></pre><p>after</p>")
+
+    def test_end_tag_split_across_batches(self):
+        html = "<pre>a  b</pr" + "e  >  <p> c </p>"
+        for split in range(len(html)):
+            out = io.StringIO()
+            minifier = HtmlMinifier(out)
+            minifier.BATCH_SIZE = 1
+            minifier.write(html[:split])
+            minifier.write(html[split:])
+            minifier.flush()
+            self.assertEqual(out.getvalue(), "<pre>a  b</pre><p>c</p>", split)
+
+    def test_generated_pages(self):
+        with tempfile.TemporaryDirectory() as root:
+            os.makedirs(os.path.join(root, "content"))
+            with open(os.path.join(root, "content", "index.md"), 'w') as f:
+                f.write("# Home\n\nSome   text [link](/blog)\n\n```\n  indented\n```")
+            template = os.path.join(root, "template.html")
+            with open(template, 'w') as f:
+                f.write('<html>\n  <head>\n    <title>{{ Title }}</title>\n  </head>\n  <body>\n    {{ Content }}\n  </body>\n</html>\n')
+            docs = os.path.join(root, "docs")
+            generate_pages_recursive(os.path.join(root, "content"), template, docs, "/site/", minify=True)
+            with open(os.path.join(docs, "index.html")) as f:
+                html = f.read()
+            self.assertEqual(
+                html,
+                "<html><head><title>Home</title></head><body><div><h1>Home</h1>"
+                "<p>Some text <a href=/site/blog>link</a></p><pre><code>  indented\n</code></pre></div></body></html>",
+            )
+
+
+if __name__ == "__main__":
+    unittest.main()
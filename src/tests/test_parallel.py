@@ -0,0 +1,46 @@
+import os
+import unittest
+
+from helpers import TEMPLATE, TempDirTestCase, read_tree
+from main import collect_pages, generate_pages_recursive
+from parallel import PageBuildError
+
+
+class TestParallelBuild(TempDirTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.content = os.path.join(self.root, "content")
+        self.template = os.path.join(self.root, "template.html")
+        self._write("template.html", TEMPLATE)
+        for i in range(6):
+            self._write(f"content/blog/post{i}/index.md", f"# Post {i}\n\nSome **bold** and a [link](/blog/post{i + 1}).")
+        self._write("content/index.md", "# Home\n\n![pic](/images/a.png)")
+
+    def test_collect_pages_maps_sources_to_outputs(self):
+        """Test that every markdown file is paired with its html destination"""
+        pages = collect_pages(self.content, "docs")
+        self.assertIn((os.path.join(self.content, "index.md"), os.path.join("docs", "index.html")), pages)
+        self.assertEqual(len(pages), 7)
+
+    def test_parallel_output_matches_serial(self):
+        """Test that a parallel build is byte-identical to a serial build"""
+        serial = os.path.join(self.root, "serial")
+        parallel = os.path.join(self.root, "parallel")
+        generate_pages_recursive(self.content, self.template, serial, "/site/", jobs=1)
+        generate_pages_recursive(self.content, self.template, parallel, "/site/", jobs=3)
+        self.assertEqual(read_tree(serial), read_tree(parallel))
+
+    def test_errors_are_reported_per_page(self):
+        """Test that a broken page is reported without stopping the others"""
+        self._write("content/broken/index.md", "## No title here\n\nJust a paragraph.")
+        dest = os.path.join(self.root, "out")
+        with self.assertRaises(PageBuildError) as context:
+            generate_pages_recursive(self.content, self.template, dest, jobs=2)
+        failed = [path for path, _ in context.exception.failures]
+        self.assertEqual(failed, [os.path.join(self.content, "broken", "index.md")])
+        self.assertTrue(os.path.exists(os.path.join(dest, "index.html")))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,3 +1,5 @@
+import io
+import sys
 import unittest
 
 from leafnode import LeafNode
@@ -17,4 +19,27 @@ class TestParentNode(unittest.TestCase):
 		self.assertEqual(
 				parent_node.to_html(),
 				"<div><span><b>grandchild</b></span></div>",
-		)
\ No newline at end of file
+		)
+
+	def test_to_html_with_props(self):
+		parent_node = ParentNode("div", [LeafNode(None, "text")], {"class": "a", "id": "b"})
+		self.assertEqual(parent_node.to_html(), '<div class="a" id="b">text</div>')
+
+	def test_write_html_streams_same_html(self):
+		parent_node = ParentNode("ul", [ParentNode("li", [LeafNode("b", "one")]), ParentNode("li", [LeafNode(None, "two")])])
+		out = io.StringIO()
+		parent_node.write_html(out)
+		self.assertEqual(out.getvalue(), parent_node.to_html())
+		self.assertEqual(out.getvalue(), "<ul><li><b>one</b></li><li>two</li></ul>")
+
+	def test_deep_tree_does_not_recurse(self):
+		depth = sys.getrecursionlimit() * 2
+		node = LeafNode(None, "x")
+		for _ in range(depth):
+			node = ParentNode("span", [node])
+		html = node.to_html()
+		self.assertEqual(html, "<span>" * depth + "x" + "</span>" * depth)
+
+	def test_missing_children_raises(self):
+		with self.assertRaises(ValueError):
+			ParentNode("div", []).to_html()
\ No newline at end of file
@@ -0,0 +1,108 @@
+import os
+import unittest
+from unittest import mock
+
+from helpers import TempDirTestCase
+from main import generate_page
+from markdown_html import markdown_to_html_node
+from metadata import PageMetadata, read_metadata
+from parse_cache import PARSER_MODULES, ParseCache, decode_tree, encode_tree, parser_version
+
+MARKDOWN = """# Title
+
+Some **bold _nested_ text**, `code` and a [link](/blog/post).
+
+![image](/images/a.png)
+
+- one
+- two
+
+```
+code block
+```
+"""
+
+
+class TestTreeEncoding(unittest.TestCase):
+
+    def test_round_trip(self):
+        node = markdown_to_html_node(MARKDOWN)
+        self.assertEqual(decode_tree(encode_tree(node)), node)
+        self.assertEqual(decode_tree(encode_tree(node)).to_html(), node.to_html())
+
+    def test_empty_document(self):
+        node = markdown_to_html_node("")
+        self.assertEqual(decode_tree(encode_tree(node)).to_html(), "<div></div>")
+
+
+class TestParseCache(TempDirTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.directory = os.path.join(self.tmp.name, "cache")
+
+    def test_get_put_and_counters(self):
+        cache = ParseCache(self.directory)
+        self.assertIsNone(cache.get("ab" * 32))
+        cache.put("ab" * 32, markdown_to_html_node(MARKDOWN), read_metadata(MARKDOWN))
+        self.assertEqual(cache.get("ab" * 32), (markdown_to_html_node(MARKDOWN), PageMetadata("Title", None, [], 12)))
+        self.assertEqual(cache.stats(), {"hits": 1, "misses": 1})
+
+    def test_parser_change_invalidates(self):
+        """Test that entries of another parser version are never read and are pruned"""
+        old = ParseCache(self.directory, version="0" * 64)
+        old.put("ab" * 32, markdown_to_html_node(MARKDOWN), read_metadata(MARKDOWN))
+        new = ParseCache(self.directory)
+        self.assertEqual(new.version, parser_version())
+        self.assertIsNone(new.get("ab" * 32))
+        new.prune()
+        self.assertFalse(os.path.exists(old.path))
+
+    def test_version_covers_the_whole_parse_path(self):
+        """Test that editing main.py or urls.py, not only the parser modules, changes the version"""
+        src_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        for name in PARSER_MODULES:
+            with open(os.path.join(src_dir, name), 'rb') as f:
+                self._write(os.path.join("src", name), f.read())
+        version = parser_version(os.path.join(self.root, "src"))
+        for name in ("main.py", "urls.py"):
+            with self.subTest(name=name):
+                with open(os.path.join(self.root, "src", name), 'a', encoding='utf-8') as f:
+                    f.write("\n# changed\n")
+                changed = parser_version(os.path.join(self.root, "src"))
+                self.assertNotEqual(changed, version)
+                version = changed
+
+    def test_prune_evicts_least_recently_used(self):
+        cache = ParseCache(self.directory)
+        for key, markdown in (("aa", "# A"), ("bb", "# B"), ("cc", "# C")):
+            cache.put(key * 32, markdown_to_html_node(markdown), read_metadata(markdown))
+        cache.max_bytes = sum(os.path.getsize(cache._entry_path(key * 32)) for key in ("aa", "bb", "cc")) - 1
+        os.utime(cache._entry_path("aa" * 32), ns=(1, 1))
+        os.utime(cache._entry_path("bb" * 32), ns=(2, 2))
+        self.assertEqual(cache.prune(), 1)
+        self.assertFalse(os.path.exists(cache._entry_path("aa" * 32)))
+        self.assertTrue(os.path.exists(cache._entry_path("cc" * 32)))
+
+    def test_warm_build_skips_parsing(self):
+        """Test that a second build of the same source doesn't parse it and writes the same page"""
+        source = os.path.join(self.tmp.name, "index.md")
+        template = os.path.join(self.tmp.name, "template.html")
+        with open(source, 'w', encoding='utf-8') as f:
+            f.write(MARKDOWN)
+        with open(template, 'w', encoding='utf-8') as f:
+            f.write("<title>{{ Title }}</title>{{ Content }}")
+        cold = os.path.join(self.tmp.name, "cold.html")
+        warm = os.path.join(self.tmp.name, "warm.html")
+
+        generate_page(source, template, cold, "/site/", parse_cache=ParseCache(self.directory))
+        cache = ParseCache(self.directory)
+        with mock.patch("block_parser.parse_blocks", side_effect=AssertionError("parsed")):
+            generate_page(source, template, warm, "/site/", parse_cache=cache)
+        self.assertEqual(cache.hits, 1)
+        with open(cold, 'rb') as a, open(warm, 'rb') as b:
+            self.assertEqual(a.read(), b.read())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,64 @@
+import os
+import threading
+import unittest
+from unittest import mock
+
+from helpers import TEMPLATE, TempDirTestCase, read_tree
+from main import generate_pages_recursive
+from pipeline import generate_pages_pipelined
+from profiling import STAGES, BuildProfile
+
+
+class TestPipelinedBuild(TempDirTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.content = os.path.join(self.root, "content")
+        self.template = os.path.join(self.root, "template.html")
+        self._write("template.html", TEMPLATE)
+        self.pages = []
+        for i in range(20):
+            path = self._write(f"content/post{i}/index.md", f"# Post {i}\n\nSome **bold** and a [link](/post{i + 1}).")
+            self.pages.append((path, os.path.join(self.root, "out", f"post{i}", "index.html")))
+
+    def test_output_matches_serial(self):
+        serial = os.path.join(self.root, "serial")
+        pipelined = os.path.join(self.root, "pipelined")
+        generate_pages_recursive(self.content, self.template, serial, "/site/")
+        generate_pages_recursive(self.content, self.template, pipelined, "/site/", pipeline_depth=2, io_threads=3)
+        self.assertEqual(read_tree(serial), read_tree(pipelined))
+
+    def test_failures_do_not_stop_other_pages(self):
+        with open(self.pages[3][0], 'w', encoding='utf-8') as f:
+            f.write("no title here")
+        os.remove(self.pages[5][0])
+        failures = generate_pages_pipelined(self.pages, self.template, "/", depth=1)
+        self.assertEqual(sorted(path for path, _ in failures), sorted([self.pages[3][0], self.pages[5][0]]))
+        self.assertEqual(sum(os.path.exists(dest) for _, dest in self.pages), 18)
+
+    def test_profile_records_every_stage(self):
+        profile = BuildProfile()
+        generate_pages_pipelined(self.pages, self.template, "/", profile=profile)
+        self.assertEqual(len(profile.pages), 20)
+        for stages in profile.pages.values():
+            self.assertEqual(set(stages), set(STAGES))
+            self.assertGreater(stages["read"], 0)
+            self.assertGreater(stages["write"], 0)
+
+    def test_interrupt_stops_all_threads(self):
+        """Test that an error in the parsing thread leaves no reader or writer blocked"""
+        calls = []
+        def render(*args):
+            calls.append(args)
+            if len(calls) == 3:
+                raise KeyboardInterrupt
+            return "<html></html>"
+        before = threading.active_count()
+        with mock.patch("main.render_page", side_effect=render):
+            with self.assertRaises(KeyboardInterrupt):
+                generate_pages_pipelined(self.pages, self.template, "/", depth=1)
+        self.assertEqual(threading.active_count(), before)
+
+
+if __name__ == "__main__":
+    unittest.main()
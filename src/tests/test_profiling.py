@@ -0,0 +1,72 @@
+import json
+import os
+import unittest
+
+from helpers import TEMPLATE, TempDirTestCase, read_tree
+from main import generate_pages_recursive
+from profiling import STAGES, BuildProfile, format_report, percentile
+
+
+class TestPercentile(unittest.TestCase):
+
+    def test_nearest_rank(self):
+        values = [float(i) for i in range(1, 101)]
+        self.assertEqual(percentile(values, 0.5), 50.0)
+        self.assertEqual(percentile(values, 0.99), 99.0)
+        self.assertEqual(percentile(values, 1.0), 100.0)
+        self.assertEqual(percentile([7.0], 0.9), 7.0)
+        self.assertEqual(percentile([], 0.5), 0.0)
+
+
+class TestBuildProfile(unittest.TestCase):
+
+    def test_report_totals_and_slowest(self):
+        profile = BuildProfile()
+        profile.add("a.md", {"read": 0.001, "inline": 0.002})
+        profile.add("b.md", {"read": 0.003, "inline": 0.010})
+        profile.add("c.md", {"read": 0.002, "inline": 0.001})
+        report = profile.report(top=2)
+        self.assertEqual(report["pages"], 3)
+        self.assertEqual(report["stages"]["read"]["total"], 6.0)
+        self.assertEqual(report["stages"]["inline"]["max"], 10.0)
+        self.assertEqual(report["stages"]["render"]["total"], 0.0)
+        self.assertEqual([page["path"] for page in report["slowest"]], ["b.md", "a.md"])
+        self.assertIn("b.md", format_report(report))
+
+
+class TestProfiledBuild(TempDirTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.content = os.path.join(self.root, "content")
+        self.template = os.path.join(self.root, "template.html")
+        self._write("template.html", TEMPLATE)
+        for i in range(4):
+            self._write(f"content/post{i}/index.md", f"# Post {i}\n\nSome **bold** and a [link](/post{i + 1}).")
+
+    def _build(self, name, jobs, profile):
+        dest = os.path.join(self.root, name)
+        generate_pages_recursive(self.content, self.template, dest, "/site/", jobs=jobs, profile=profile)
+        return read_tree(dest)
+
+    def test_profiled_output_is_identical(self):
+        """Test that buffering stages for timing does not change the pages"""
+        profile = BuildProfile()
+        self.assertEqual(self._build("plain", 1, None), self._build("profiled", 1, profile))
+        self.assertEqual(len(profile.pages), 4)
+        for stages in profile.pages.values():
+            self.assertEqual(set(stages), set(STAGES))
+            self.assertTrue(all(seconds > 0 for seconds in stages.values()))
+
+    def test_parallel_workers_report_timings(self):
+        profile = BuildProfile()
+        self._build("parallel", 2, profile)
+        self.assertEqual(len(profile.pages), 4)
+        report_path = os.path.join(self.root, "profile", "report.json")
+        profile.save(report_path)
+        with open(report_path, 'r', encoding='utf-8') as f:
+            self.assertEqual(json.load(f)["pages"], 4)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,87 @@
+import os
+import unittest
+from unittest import mock
+
+import static_sync
+from helpers import TempDirTestCase
+from static_sync import copy_file, sync_directory
+
+
+class TestSyncDirectory(TempDirTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.src = os.path.join(self.root, "static")
+        self.dest = os.path.join(self.root, "docs")
+
+    def _read(self, path):
+        with open(path, 'rb') as f:
+            return f.read()
+
+    def test_copies_new_files(self):
+        """Test that a first sync copies the whole tree"""
+        self._write("static/index.css", b"body {}")
+        self._write("static/images/a.png", b"\x89PNG")
+        report, synced = sync_directory(self.src, self.dest)
+        self.assertEqual(len(report.copied), 2)
+        self.assertEqual(self._read(os.path.join(self.dest, "images", "a.png")), b"\x89PNG")
+        self.assertIn(os.path.join(self.dest, "index.css"), synced)
+
+    def test_unchanged_files_are_skipped(self):
+        """Test that a second sync copies nothing"""
+        self._write("static/index.css", b"body {}")
+        sync_directory(self.src, self.dest)
+        report, _ = sync_directory(self.src, self.dest)
+        self.assertEqual(report.copied, [])
+        self.assertEqual(report.unchanged, [os.path.join(self.dest, "index.css")])
+
+    def test_changed_files_are_copied(self):
+        """Test that a modified file is copied again"""
+        path = self._write("static/index.css", b"body {}")
+        sync_directory(self.src, self.dest)
+        with open(path, 'wb') as f:
+            f.write(b"body { color: red; }")
+        report, _ = sync_directory(self.src, self.dest)
+        self.assertEqual(report.copied, [os.path.join(self.dest, "index.css")])
+        self.assertEqual(self._read(os.path.join(self.dest, "index.css")), b"body { color: red; }")
+
+    def test_hash_mode_skips_touched_files(self):
+        """Test that a touched but identical file is not copied in hash mode"""
+        path = self._write("static/index.css", b"body {}")
+        sync_directory(self.src, self.dest)
+        os.utime(path, ns=(0, 10**18))
+        report, _ = sync_directory(self.src, self.dest, use_hash=True)
+        self.assertEqual(report.copied, [])
+        self.assertEqual(os.stat(os.path.join(self.dest, "index.css")).st_mtime_ns, 10**18)
+
+    def test_stale_assets_are_removed_but_pages_kept(self):
+        """Test that only previously synced files are removed"""
+        self._write("static/old.png", b"old")
+        page = self._write("docs/index.html", b"<html></html>")
+        _, synced = sync_directory(self.src, self.dest)
+        os.remove(os.path.join(self.src, "old.png"))
+        report, synced = sync_directory(self.src, self.dest, synced)
+        self.assertEqual(report.removed, [os.path.join(self.dest, "old.png")])
+        self.assertFalse(os.path.exists(os.path.join(self.dest, "old.png")))
+        self.assertTrue(os.path.exists(page))
+        self.assertEqual(synced, {})
+
+    def test_hardlink_mode(self):
+        """Test that hardlink mode shares the inode with the source"""
+        src_path = self._write("static/a.png", b"data")
+        sync_directory(self.src, self.dest, hardlink=True)
+        dest_path = os.path.join(self.dest, "a.png")
+        self.assertTrue(os.path.samefile(src_path, dest_path))
+
+    def test_large_files_use_zero_copy(self):
+        """Test that files above the threshold go through the kernel copy path"""
+        data = os.urandom(4096)
+        src_path = self._write("static/big.bin", data)
+        dest_path = os.path.join(self.root, "big.bin")
+        with mock.patch.object(static_sync, "ZERO_COPY_THRESHOLD", 1024):
+            copy_file(src_path, dest_path)
+        self.assertEqual(self._read(dest_path), data)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,79 @@
+import io
+import os
+import tempfile
+import unittest
+
+from template import compile_template, load_template, rewrite_root_urls
+
+
+def _render(template, values):
+    out = io.StringIO()
+    template.write(out, values)
+    return out.getvalue()
+
+
+class TestCompileTemplate(unittest.TestCase):
+
+    def test_render_fills_slots(self):
+        """Test that slots are replaced by their values"""
+        template = compile_template("<title>{{ Title }}</title><article>{{ Content }}</article>")
+        html = _render(template, {"Title": "Hi", "Content": "<p>body</p>"})
+        self.assertEqual(html, "<title>Hi</title><article><p>body</p></article>")
+
+    def test_repeated_slot(self):
+        """Test that a placeholder used twice is filled in both places"""
+        template = compile_template("<title>{{ Title }}</title><h1>{{ Title }}</h1>")
+        self.assertEqual(_render(template, {"Title": "T"}), "<title>T</title><h1>T</h1>")
+
+    def test_unknown_placeholder_is_kept(self):
+        """Test that placeholders that are not slots stay as text"""
+        template = compile_template("{{ Other }} {{ Title }}")
+        self.assertEqual(_render(template, {"Title": "T"}), "{{ Other }} T")
+
+    def test_basepath_applied_at_compile_time(self):
+        """Test that the template's own links are rewritten once for the basepath"""
+        template = compile_template('<link href="/index.css"><script src="/app.js"></script>{{ Content }}', "/site/")
+        self.assertEqual(template.pieces[0], '<link href="/site/index.css"><script src="/site/app.js"></script>')
+        # Slot values are inserted untouched
+        self.assertEqual(_render(template, {"Content": 'href="/x"'}), '<link href="/site/index.css"><script src="/site/app.js"></script>href="/x"')
+
+    def test_matches_string_replace(self):
+        """Test that rendering equals the replace-based substitution it replaces"""
+        text = '<head><title>{{ Title }}</title><link href="/index.css" /></head><body>{{ Content }}</body>'
+        content = '<p><a href="/blog">x</a><img src="/a.png" alt="a"></p>'
+        expected = text.replace("{{ Title }}", "T").replace("{{ Content }}", content)
+        expected = expected.replace('href="/', 'href="/b/').replace('src="/', 'src="/b/')
+        rendered = _render(compile_template(text, "/b/"), {"Title": "T", "Content": rewrite_root_urls(content, "/b/")})
+        self.assertEqual(rendered, expected)
+
+    def test_load_template_caches_until_file_changes(self):
+        """Test that a template file is compiled once and recompiled after an edit"""
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "template.html")
+            with open(path, 'w', encoding='utf-8') as f:
+                f.write("<p>{{ Content }}</p>")
+            first = load_template(path)
+            self.assertIs(load_template(path), first)
+
+            with open(path, 'w', encoding='utf-8') as f:
+                f.write("<div>{{ Content }}</div>")
+            os.utime(path, ns=(0, os.stat(path).st_mtime_ns + 10**9))
+            self.assertEqual(_render(load_template(path), {"Content": "x"}), "<div>x</div>")
+
+    def test_write_streams_callable_slots(self):
+        """Test that a callable slot value writes its content directly"""
+        template = compile_template("<title>{{ Title }}</title><main>{{ Content }}</main>")
+        out = io.StringIO()
+        template.write(out, {"Title": "T", "Content": lambda stream: stream.write("<p>body</p>")})
+        self.assertEqual(out.getvalue(), "<title>T</title><main><p>body</p></main>")
+
+
+class TestTemplateAssets(unittest.TestCase):
+
+    def test_template_links_use_asset_map(self):
+        template = compile_template('<link href="/index.css">{{ Content }}', "/", assets={"index.css": "index.0123456789.css"})
+        self.assertEqual(_render(template, {"Content": ""}), '<link href="/index.0123456789.css">')
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,94 @@
+import os
+import tempfile
+import unittest
+
+from cache import LRUCache
+from block_parser import parse_blocks
+from leafnode import LeafNode
+from main import generate_pages_recursive
+from markdown_html import blocks_to_html_node
+from urls import UrlResolver, get_resolver, page_url
+
+
+class TestPageUrl(unittest.TestCase):
+
+    def test_markdown_links(self):
+        self.assertEqual(page_url("tom.md"), "tom.html")
+        self.assertEqual(page_url("../majesty/index.md"), "../majesty/")
+        self.assertEqual(page_url("index.md"), "./")
+        self.assertEqual(page_url("/index.md"), "/")
+        self.assertEqual(page_url("/blog/tom/index.md"), "/blog/tom/")
+
+    def test_other_paths(self):
+        self.assertEqual(page_url("/images/a.png"), "/images/a.png")
+        self.assertEqual(page_url("notes.mdx"), "notes.mdx")
+
+
+class TestUrlResolver(unittest.TestCase):
+
+    def test_resolve(self):
+        urls = UrlResolver("/site/", {"images/a.png": "images/a.0123456789.png"})
+        self.assertEqual(urls.resolve("/blog/tom"), "/site/blog/tom")
+        self.assertEqual(urls.resolve("/images/a.png"), "/site/images/a.0123456789.png")
+        self.assertEqual(urls.resolve("/blog/tom/index.md#top"), "/site/blog/tom/#top")
+        self.assertEqual(urls.resolve("other.md?x=1"), "other.html?x=1")
+        self.assertEqual(urls.resolve("images/a.png"), "images/a.png")
+        for url in ("https://example.com/a.md", "//cdn.example.com/a.png", "mailto:a@b.c", "#top", ""):
+            self.assertEqual(urls.resolve(url), url)
+
+    def test_resolve_props(self):
+        urls = UrlResolver("/site/")
+        props = {"alt": "/not/a/url"}
+        self.assertIs(urls.resolve_props(props), props)
+        self.assertEqual(urls.resolve_props({"src": "/a.png", "alt": "/a"}), {"src": "/site/a.png", "alt": "/a"})
+        self.assertEqual(LeafNode("a", "x", {"href": "/b"}).to_html(urls), '<a href="/site/b">x</a>')
+
+    def test_by_url(self):
+        urls = UrlResolver("/site/")
+        sizes = {"images/a.png": (1, 2)}
+        self.assertEqual(urls.by_url(sizes), {"/site/images/a.png": (1, 2)})
+        self.assertIs(urls.by_url(sizes), urls.by_url(sizes))
+
+    def test_get_resolver_is_shared(self):
+        assets = {}
+        self.assertIs(get_resolver("/site/", assets), get_resolver("/site/", assets))
+        self.assertIsNot(get_resolver("/site/", assets), get_resolver("/other/", assets))
+
+    def test_cached_blocks_follow_the_resolver(self):
+        cache = LRUCache()
+        blocks = parse_blocks("[a](/x)")
+        one, two = UrlResolver("/one/"), UrlResolver("/two/")
+        first = blocks_to_html_node(blocks, cache, one).to_html(one)
+        second = blocks_to_html_node(blocks, cache, two).to_html(two)
+        self.assertEqual(first, '<div><p><a href="/one/x">a</a></p></div>')
+        self.assertEqual(second, '<div><p><a href="/two/x">a</a></p></div>')
+
+
+class TestGeneratedLinks(unittest.TestCase):
+
+    def test_pages(self):
+        with tempfile.TemporaryDirectory() as root:
+            content = os.path.join(root, "content")
+            os.makedirs(os.path.join(content, "blog"))
+            with open(os.path.join(content, "index.md"), 'w') as f:
+                f.write('# Home\n\n[tom](blog/tom.md) and [blog](/blog/index.md)\n\n```\n<a href="/raw">code</a>\n```')
+            with open(os.path.join(content, "blog", "tom.md"), 'w') as f:
+                f.write("# Tom\n\n[home](../index.md)")
+            template = os.path.join(root, "template.html")
+            with open(template, 'w') as f:
+                f.write('<link href="/index.css"><title>{{ Title }}</title>{{ Content }}')
+            docs = os.path.join(root, "docs")
+            generate_pages_recursive(content, template, docs, "/site/")
+
+            with open(os.path.join(docs, "index.html")) as f:
+                html = f.read()
+            self.assertIn('<link href="/site/index.css">', html)
+            self.assertIn('<a href="blog/tom.html">tom</a> and <a href="/site/blog/">blog</a>', html)
+            # Text in code blocks is not touched, even when it looks like an attribute
+            self.assertIn('<code><a href="/raw">code</a>\n</code>', html)
+            with open(os.path.join(docs, "blog", "tom.html")) as f:
+                self.assertIn('<a href="../">home</a>', f.read())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,146 @@
+import contextlib
+import gzip
+import io
+import os
+import unittest
+
+from compress import available_encodings
+from helpers import TempDirTestCase
+from main import page_fingerprint_extra, parse_args
+from manifest import BuildManifest, build_fingerprint, hash_file
+from test_images import png
+from watch import Watcher, diff_snapshots
+
+
+class TestDiffSnapshots(unittest.TestCase):
+
+    def test_changed_and_removed(self):
+        old = {"a": (1, 1), "b": (1, 1), "c": (1, 1)}
+        new = {"a": (1, 1), "b": (2, 1), "d": (1, 1)}
+        self.assertEqual(diff_snapshots(old, new), (["b", "d"], ["c"]))
+
+
+class TestWatchArguments(unittest.TestCase):
+
+    def test_site_wide_outputs_are_rejected(self):
+        """Test that options whose outputs the watcher never refreshes are refused with --watch"""
+        for option in (["--prefetch", "2"], ["--page-index"], ["--sitemap", "--site-url", "https://example.com"], ["--feed", "--site-url", "https://example.com"]):
+            with self.subTest(option=option), contextlib.redirect_stderr(io.StringIO()):
+                with self.assertRaises(SystemExit):
+                    parse_args(["--watch", *option])
+        self.assertTrue(parse_args(["--watch"]).watch)
+
+
+class TestWatcher(TempDirTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.content = os.path.join(self.root, "content")
+        self.static = os.path.join(self.root, "static")
+        self.template = os.path.join(self.root, "template.html")
+        self.docs = os.path.join(self.root, "docs")
+        self._write("template.html", "<title>{{ Title }}</title>{{ Content }}")
+        self._write("content/index.md", "# Home\n\nWelcome")
+        self._write("content/blog/post/index.md", "# Post\n\nHello")
+        self._write("static/index.css", "body {}")
+        self.manifest_path = os.path.join(self.root, ".build", "manifest.json")
+        self.watcher = Watcher(self.content, self.static, self.template, self.docs, self.manifest_path)
+
+    def _write(self, relpath, data):
+        path = super()._write(relpath, data)
+        # Make sure the poll sees a new mtime even on coarse-grained filesystems
+        stat = os.stat(path)
+        os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+        return path
+
+    def _read(self, relpath):
+        with open(os.path.join(self.root, relpath), encoding='utf-8') as f:
+            return f.read()
+
+    def test_no_change_no_rebuild(self):
+        """Test that an idle poll does nothing"""
+        self.assertIsNone(self.watcher.poll())
+
+    def test_content_edit_rebuilds_only_that_page(self):
+        """Test that editing one markdown file regenerates just that page"""
+        self._write("content/blog/post/index.md", "# Post\n\nEdited")
+        report = self.watcher.poll()
+        self.assertEqual(report["pages"], 1)
+        self.assertIn("<p>Edited</p>", self._read("docs/blog/post/index.html"))
+        self.assertFalse(os.path.exists(os.path.join(self.docs, "index.html")))
+        self.assertGreaterEqual(report["ms"], 0)
+
+    def test_template_edit_rebuilds_every_page(self):
+        """Test that editing the template regenerates all pages"""
+        self._write("template.html", "<h1>{{ Title }}</h1>{{ Content }}")
+        report = self.watcher.poll()
+        self.assertEqual(report["pages"], 2)
+        self.assertTrue(self._read("docs/index.html").startswith("<h1>Home</h1>"))
+
+    def test_static_changes_are_synced(self):
+        """Test that asset edits are copied and deleted assets removed"""
+        self._write("static/images/a.png", "png")
+        self.assertEqual(self.watcher.poll()["assets"], 1)
+        self.assertEqual(self._read("docs/images/a.png"), "png")
+
+        os.remove(os.path.join(self.static, "images", "a.png"))
+        self.assertEqual(self.watcher.poll()["removed_assets"], 1)
+        self.assertFalse(os.path.exists(os.path.join(self.docs, "images", "a.png")))
+
+    def test_deleted_page_is_removed(self):
+        """Test that deleting a markdown file removes its output"""
+        self._write("content/blog/post/index.md", "# Post\n\nEdited")
+        self.watcher.poll()
+        os.remove(os.path.join(self.content, "blog", "post", "index.md"))
+        self.assertEqual(self.watcher.poll()["removed_pages"], 1)
+        self.assertFalse(os.path.exists(os.path.join(self.docs, "blog", "post", "index.html")))
+
+    def test_rebuilds_use_the_build_options(self):
+        """Test that watched rebuilds are minified and recorded under the build's fingerprint"""
+        watcher = Watcher(self.content, self.static, self.template, self.docs, self.manifest_path, minify=True)
+        path = self._write("content/index.md", "# Home\n\nEdited   text")
+        watcher.poll()
+        self.assertEqual(self._read("docs/index.html"), "<title>Home</title><div><h1>Home</h1><p>Edited text</p></div>")
+
+        # A build with the same options finds the page up to date
+        manifest = BuildManifest(self.manifest_path, build_fingerprint(self.template, "/", *page_fingerprint_extra(minify=True)))
+        self.assertFalse(manifest.needs_build(path, hash_file(path), os.path.join(self.docs, "index.html")))
+
+    def test_image_dimensions_follow_image_edits(self):
+        """Test that rebuilt pages get image sizes, and a resized image rebuilds every page"""
+        image = os.path.join(self.static, "a.png")
+        with open(image, 'wb') as f:
+            f.write(png(10, 20))
+        sizes_path = os.path.join(self.root, ".build", "image-sizes.json")
+        watcher = Watcher(self.content, self.static, self.template, self.docs, self.manifest_path, image_sizes_path=sizes_path)
+        self._write("content/index.md", "# Home\n\n![a](/a.png)")
+        watcher.poll()
+        self.assertIn('<img src="/a.png" alt="a" width="10" height="20" decoding="async">', self._read("docs/index.html"))
+
+        with open(image, 'wb') as f:
+            f.write(png(30, 40))
+        os.utime(image, ns=(0, os.stat(image).st_mtime_ns + 10**9))
+        self.assertEqual(watcher.poll()["pages"], 2)
+        self.assertIn('width="30" height="40"', self._read("docs/index.html"))
+        fingerprint = build_fingerprint(self.template, "/", *page_fingerprint_extra(image_sizes={"a.png": (30, 40)}))
+        self.assertEqual(watcher.manifest.fingerprint, fingerprint)
+
+    def test_precompressed_variants_follow_rebuilds(self):
+        """Test that rebuilt outputs get fresh variants and removed ones lose theirs"""
+        watcher = Watcher(
+            self.content, self.static, self.template, self.docs, self.manifest_path,
+            encodings={".gz": available_encodings()[".gz"]}, compress_min_bytes=1,
+        )
+        self._write("content/blog/post/index.md", "# Post\n\nEdited")
+        watcher.poll()
+        variant = os.path.join(self.docs, "blog", "post", "index.html.gz")
+        with gzip.open(variant, 'rt', encoding='utf-8') as f:
+            self.assertIn("<p>Edited</p>", f.read())
+
+        os.remove(os.path.join(self.content, "blog", "post", "index.md"))
+        watcher.poll()
+        self.assertFalse(os.path.exists(variant))
+
+
+if __name__ == "__main__":
+    unittest.main()
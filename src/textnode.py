@@ -9,13 +9,19 @@ class TextType(Enum):
   IMAGE = "image"
   
 class TextNode:
-  def __init__(self, text: str, text_type: TextType, url: str = None):
+  __slots__ = ("text", "type", "url", "children")
+
+  def __init__(self, text: str, text_type: TextType, url: str = None, children: list = None):
     self.text = text
     self.type = text_type
     self.url = url
+    # Parsed contents of a bold or italic span that contains other inline markup
+    self.children = children
 
   def __repr__(self):
+    if self.children:
+      return f"TextNode({self.text}, {self.type.value}, {self.url}, {self.children})"
     return f"TextNode({self.text}, {self.type.value}, {self.url})"
 
   def __eq__(self, other):
-    return self.text == other.text and self.type == other.type and self.url == other.url
\ No newline at end of file
+    return self.text == other.text and self.type == other.type and self.url == other.url and self.children == other.children
\ No newline at end of file
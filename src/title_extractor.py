@@ -1,9 +1,10 @@
-import re
-
 def extract_title(markdown: str) -> str:
     """
     Extract the h1 header from markdown text.
     
+    The title is taken from the parsed blocks, the same way page generation
+    takes it, so a "# " line inside a code block is not a title.
+    
     Args:
         markdown: The markdown text to extract the title from
         
@@ -13,14 +14,10 @@ def extract_title(markdown: str) -> str:
     Raises:
         Exception: If no h1 header is found
     """
-    lines = markdown.split('\n')
-    
-    for line in lines:
-        # Check if line starts with exactly one # followed by a space
-        if re.match(r'^# .+', line):
-            # Extract title by removing the # and any leading/trailing whitespace
-            title = line[1:].strip()
-            return title
+    # Import here to avoid circular imports
+    from metadata import read_metadata
     
-    # If we get here, no h1 header was found
-    raise Exception("No h1 header found in markdown") 
\ No newline at end of file
+    title = read_metadata(markdown).title
+    if title is None:
+        raise Exception("No h1 header found in markdown")
+    return title
@@ -0,0 +1,87 @@
+import posixpath
+import re
+
+# Attributes whose values are URLs, resolved whenever a node's props are rendered
+URL_ATTRIBUTES = ("href", "src")
+
+# URLs with a scheme, protocol-relative URLs and bare fragments are left alone
+_ABSOLUTE_URL_RE = re.compile(r"(?:[A-Za-z][A-Za-z0-9+.-]*:|//|#)")
+
+# A URL split into its path and any query or fragment
+_SPLIT_RE = re.compile(r"([^?#]*)(.*)", re.S)
+
+def page_url(path: str) -> str:
+    """
+    Map a link to a markdown source onto the URL of the page generated from it.
+
+    foo.md becomes foo.html, and index.md the URL of its directory; any other
+    path is returned unchanged.
+    """
+    if not path.endswith(".md"):
+        return path
+    directory, name = posixpath.split(path)
+    if name != "index.md":
+        return path[:-len(".md")] + ".html"
+    if not directory:
+        return "./"
+    return directory if directory.endswith("/") else directory + "/"
+
+class UrlResolver:
+    """
+    Resolves the href and src values of rendered nodes for one build.
+
+    Root-relative URLs get the basepath (and fingerprinted asset names), and
+    links to markdown sources point at the generated pages. Relative links
+    keep working as they are, since the output mirrors the content layout.
+    Every URL is resolved once and then looked up.
+    """
+    def __init__(self, basepath: str = "/", assets: dict = None):
+        self.basepath = basepath
+        self.assets = assets
+        self._resolved = {}
+        self._by_url = None
+
+    def resolve(self, url: str) -> str:
+        resolved = self._resolved.get(url)
+        if resolved is None:
+            resolved = self._resolved[url] = self._resolve(url)
+        return resolved
+
+    def _resolve(self, url: str) -> str:
+        if not url or _ABSOLUTE_URL_RE.match(url):
+            return url
+        path, rest = _SPLIT_RE.match(url).groups()
+        path = page_url(path)
+        if not path.startswith("/"):
+            return path + rest
+        path = path[1:]
+        if self.assets:
+            path = self.assets.get(path, path)
+        return f"{self.basepath}{path}{rest}"
+
+    def resolve_props(self, props: dict, tag: str = None) -> dict:
+        """Return props (of a node with the given tag) with every URL attribute resolved"""
+        if not any(key in props for key in URL_ATTRIBUTES):
+            return props
+        return {key: self.resolve(value) if key in URL_ATTRIBUTES else value for key, value in props.items()}
+
+    def by_url(self, mapping: dict) -> dict:
+        """Re-key a map of static file paths (e.g. image sizes) by the URLs pages reference them with"""
+        if self._by_url is None or self._by_url[0] is not mapping:
+            self._by_url = (mapping, {self.resolve("/" + path): value for path, value in mapping.items()})
+        return self._by_url[1]
+
+    def __repr__(self):
+        return f"UrlResolver({self.basepath!r}, {len(self._resolved)} resolved)"
+
+_resolvers = {}
+
+def get_resolver(basepath: str = "/", assets: dict = None) -> UrlResolver:
+    """Return the shared resolver for a basepath and asset map, so its memo lasts the whole build"""
+    key = (basepath, id(assets))
+    resolver = _resolvers.get(key)
+    if resolver is None or resolver.assets is not assets:
+        resolver = UrlResolver(basepath, assets)
+        _resolvers.clear()
+        _resolvers[key] = resolver
+    return resolver
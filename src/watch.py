@@ -0,0 +1,191 @@
+import os
+import time
+
+from changes import ChangeReport
+from compress import MIN_COMPRESS_SIZE, refresh_variants
+from images import ImageSizeCache, scan_image_sizes
+from manifest import BuildManifest, build_fingerprint, hash_file
+from static_sync import copy_file
+
+def snapshot(paths: list[str]) -> dict[str, tuple[int, int]]:
+    """Map every file below the given files/directories to its (mtime_ns, size)"""
+    state = {}
+    stack = list(paths)
+    while stack:
+        path = stack.pop()
+        try:
+            if os.path.isdir(path):
+                with os.scandir(path) as entries:
+                    for entry in entries:
+                        if entry.is_dir(follow_symlinks=False):
+                            stack.append(entry.path)
+                        elif entry.is_file():
+                            stat = entry.stat()
+                            state[entry.path] = (stat.st_mtime_ns, stat.st_size)
+            else:
+                stat = os.stat(path)
+                state[path] = (stat.st_mtime_ns, stat.st_size)
+        except FileNotFoundError:
+            continue
+    return state
+
+def diff_snapshots(old: dict, new: dict) -> tuple[list[str], list[str]]:
+    """Return (added or modified paths, removed paths) between two snapshots"""
+    changed = sorted(path for path, info in new.items() if old.get(path) != info)
+    removed = sorted(path for path in old if path not in new)
+    return changed, removed
+
+def _is_below(path: str, directory: str) -> bool:
+    return os.path.commonpath([os.path.abspath(path), os.path.abspath(directory)]) == os.path.abspath(directory)
+
+class Watcher:
+    """
+    Polls the site sources and rebuilds only what a change affects.
+
+    A markdown edit regenerates that one page, a static file edit re-copies
+    that one asset, and a template edit (or, with image dimensions, a change
+    to an image's size) regenerates every page. Pages are
+    generated with the same options, and recorded under the same build
+    fingerprint, as the build that started watching, and every output a
+    rebuild writes or removes gets its precompressed variants refreshed.
+    """
+    def __init__(self, content_dir: str, static_dir: str, template_path: str, dest_dir: str, manifest_path: str, basepath: str = "/", jobs: int = 1, minify: bool = False, image_sizes_path: str = None, encodings: dict = None, compress_min_bytes: int = MIN_COMPRESS_SIZE):
+        self.content_dir = content_dir
+        self.static_dir = static_dir
+        self.template_path = template_path
+        self.dest_dir = dest_dir
+        self.basepath = basepath
+        self.jobs = jobs
+        self.minify = minify
+        # Suffix to compress function of the variants to keep up to date, if any
+        self.encodings = encodings
+        self.compress_min_bytes = compress_min_bytes
+        # Dimensions of the images in static_dir, kept up to date as they change
+        self.image_cache = None
+        self.image_sizes = None
+        if image_sizes_path is not None:
+            self.image_cache = ImageSizeCache(image_sizes_path)
+            self.image_sizes = scan_image_sizes(static_dir, self.image_cache)
+        self.manifest = BuildManifest(manifest_path, self._fingerprint())
+        self.state = snapshot(self._watched_paths())
+
+    def _watched_paths(self) -> list[str]:
+        return [self.content_dir, self.static_dir, self.template_path]
+
+    def _fingerprint(self) -> str:
+        # Import here to avoid circular imports
+        from main import page_fingerprint_extra
+        return build_fingerprint(self.template_path, self.basepath, *page_fingerprint_extra(image_sizes=self.image_sizes, minify=self.minify))
+
+    def poll(self) -> dict:
+        """
+        Check the sources once and rebuild whatever changed.
+
+        Returns:
+            Counts of rebuilt pages, removed pages, copied and removed assets,
+            plus the rebuild latency in milliseconds, or None if nothing changed
+        """
+        current = snapshot(self._watched_paths())
+        if current == self.state:
+            return None
+        started = time.perf_counter()
+        changed, removed = diff_snapshots(self.state, current)
+        self.state = current
+        report = self.apply(changed, removed)
+        report["ms"] = (time.perf_counter() - started) * 1000
+        return report
+
+    def apply(self, changed: list[str], removed: list[str]) -> dict:
+        """Rebuild the pages and assets affected by the given source paths"""
+        # Import here to avoid circular imports
+        from main import generate_page, generate_pages_recursive, page_dest_path
+        from parallel import PageBuildError
+
+        report = {"pages": 0, "removed_pages": 0, "assets": 0, "removed_assets": 0, "errors": []}
+        # Every output file written or removed, for refreshing its compressed variants
+        outputs = []
+
+        rebuild_all = self.template_path in changed or self.template_path in removed
+        if rebuild_all and not os.path.exists(self.template_path):
+            report["errors"].append((self.template_path, "template is missing"))
+            return report
+        if self.image_cache is not None and any(_is_below(path, self.static_dir) for path in changed + removed):
+            image_sizes = scan_image_sizes(self.static_dir, self.image_cache)
+            self.image_cache.save()
+            if image_sizes != self.image_sizes:
+                self.image_sizes = image_sizes
+                rebuild_all = True
+
+        if rebuild_all:
+            # Every page depends on the template and the image sizes: rebuild them all against the new fingerprint
+            self.manifest.set_fingerprint(self._fingerprint())
+            rebuilt = ChangeReport()
+            try:
+                report["pages"] = generate_pages_recursive(
+                    self.content_dir, self.template_path, self.dest_dir, self.basepath, self.manifest, self.jobs,
+                    changes=rebuilt, image_sizes=self.image_sizes, minify=self.minify,
+                )
+            except PageBuildError as e:
+                report["errors"].extend(e.failures)
+            for files in rebuilt.files.values():
+                outputs.extend(files)
+            changed = [path for path in changed if path != self.template_path]
+            changed = [path for path in changed if not _is_below(path, self.content_dir)]
+
+        for path in changed:
+            if _is_below(path, self.content_dir):
+                if not path.endswith('.md'):
+                    continue
+                dest_path = page_dest_path(path, self.content_dir, self.dest_dir)
+                try:
+                    generate_page(path, self.template_path, dest_path, self.basepath, image_sizes=self.image_sizes, minify=self.minify)
+                except Exception as e:
+                    report["errors"].append((path, f"{type(e).__name__}: {e}"))
+                    continue
+                self.manifest.record(path, hash_file(path), dest_path)
+                outputs.append(dest_path)
+                report["pages"] += 1
+            elif _is_below(path, self.static_dir):
+                dest_path = os.path.join(self.dest_dir, os.path.relpath(path, self.static_dir))
+                os.makedirs(os.path.dirname(dest_path), exist_ok=True)
+                copy_file(path, dest_path)
+                self.manifest.assets[dest_path] = path
+                outputs.append(dest_path)
+                report["assets"] += 1
+
+        for path in removed:
+            if _is_below(path, self.content_dir):
+                output = self.manifest.forget(path)
+                if output is not None:
+                    outputs.append(output)
+                    report["removed_pages"] += 1
+            elif _is_below(path, self.static_dir):
+                dest_path = os.path.join(self.dest_dir, os.path.relpath(path, self.static_dir))
+                if self.manifest.assets.pop(dest_path, None) is not None and os.path.exists(dest_path):
+                    os.remove(dest_path)
+                    outputs.append(dest_path)
+                    report["removed_assets"] += 1
+
+        if self.encodings is not None:
+            refresh_variants(outputs, self.encodings, self.compress_min_bytes)
+        self.manifest.save()
+        return report
+
+    def run(self, interval: float = 0.05):
+        """Poll until interrupted, printing what each rebuild did and how long it took"""
+        print(f"Watching '{self.content_dir}', '{self.static_dir}' and '{self.template_path}' for changes (Ctrl+C to stop)")
+        try:
+            while True:
+                time.sleep(interval)
+                report = self.poll()
+                if report is None:
+                    continue
+                for path, error in report["errors"]:
+                    print(f"Failed to rebuild {path}: {error}")
+                print(
+                    f"Rebuilt {report['pages']} page(s), removed {report['removed_pages']}, "
+                    f"copied {report['assets']} asset(s), removed {report['removed_assets']} "
+                    f"in {report['ms']:.1f} ms"
+                )
+        except KeyboardInterrupt:
+            print("Stopped watching")